@@ -0,0 +1,169 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from executor import QueueFullError
+
+
+@dataclass
+class _Request:
+    item: Any
+    future: Future
+    enqueued_at: float
+
+
+class MicroBatcher:
+    """Group concurrent classification requests into batched forward passes.
+
+    Callers ``submit`` single items and get a Future back. A background thread
+    takes the first pending item, then keeps collecting until either
+    ``max_batch_size`` items are queued or ``max_wait_ms`` has elapsed, runs
+    ``predict_batch`` once on the whole batch and resolves every caller's
+    future with its own result.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        max_queue_size: int = 0,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.max_queue_size = max_queue_size
+
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+        # Metrics
+        self._batches = 0
+        self._items = 0
+        self._failed_batches = 0
+        self._rejected = 0
+        self._last_batch_size = 0
+        self._batch_sizes: Counter = Counter()
+        self._queue_wait_total = 0.0
+        self._inference_total = 0.0
+
+    def submit(self, item: Any) -> Future:
+        """Queue a single item and return a Future resolved with its result."""
+        self._ensure_started()
+        if self.max_queue_size and self._queue.qsize() >= self.max_queue_size:
+            with self._lock:
+                self._rejected += 1
+            raise QueueFullError("Inference queue is full")
+        future: Future = Future()
+        self._queue.put(_Request(item=item, future=future, enqueued_at=time.monotonic()))
+        return future
+
+    async def classify(self, item: Any) -> Any:
+        """Awaitable wrapper around ``submit`` for use from async route handlers."""
+        return await asyncio.wrap_future(self.submit(item))
+
+    def queue_depth(self) -> int:
+        """Number of requests waiting to be picked up by the batching thread."""
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth and batch-size metrics."""
+        with self._lock:
+            batches = self._batches
+            items = self._items
+            return {
+                "queue_depth": self.queue_depth(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches_total": batches,
+                "items_total": items,
+                "failed_batches_total": self._failed_batches,
+                "rejected_total": self._rejected,
+                "last_batch_size": self._last_batch_size,
+                "avg_batch_size": (items / batches) if batches else 0.0,
+                "avg_queue_wait_ms": (self._queue_wait_total / items * 1000.0)
+                if items
+                else 0.0,
+                "avg_batch_inference_ms": (self._inference_total / batches * 1000.0)
+                if batches
+                else 0.0,
+                "batch_size_histogram": {
+                    str(size): count for size, count in sorted(self._batch_sizes.items())
+                },
+            }
+
+    def _ensure_started(self) -> None:
+        # Threads do not survive fork(), so a worker process forked after the
+        # batcher was created must start its own drain thread.
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            if self._pid != pid:
+                self._queue = queue.Queue()
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name="inference-batcher", daemon=True
+            )
+            self._thread.start()
+
+    def _collect(self) -> List[_Request]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            # Drop requests whose callers have already gone away
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch: List[_Request]) -> None:
+        started = time.monotonic()
+        try:
+            results = self.predict_batch([r.item for r in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"predict_batch returned {len(results)} results for {len(batch)} inputs"
+                )
+        except Exception as exc:
+            with self._lock:
+                self._failed_batches += 1
+            for r in batch:
+                r.future.set_exception(exc)
+            return
+
+        finished = time.monotonic()
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._last_batch_size = len(batch)
+            self._batch_sizes[len(batch)] += 1
+            self._queue_wait_total += sum(started - r.enqueued_at for r in batch)
+            self._inference_total += finished - started
+
+        for r, result in zip(batch, results):
+            r.future.set_result(result)
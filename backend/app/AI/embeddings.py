@@ -0,0 +1,68 @@
+"""Capture image embeddings from the classifier's own forward pass.
+
+A forward pre-hook on the classification head records its input: the
+pooled penultimate-layer features the logits are computed from. Every
+batched inference therefore also yields one embedding per image, without
+a second forward pass.
+
+Embeddings are L2-normalised and stored as float16, so cosine similarity
+is a plain dot product and a vector takes two bytes per dimension.
+"""
+
+from typing import Any, List, Optional
+
+import numpy as np
+
+# Attribute holding the classification head on transformers image models
+# (ViT, ConvNeXt, Swin, ... use "classifier")
+HEAD_ATTRIBUTES = ("classifier", "head", "fc")
+
+
+def normalize(vectors: Any) -> np.ndarray:
+    """Flatten to (n, dim), L2-normalise each row and cast to float16."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = vectors.reshape(len(vectors), -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float16)
+
+
+class EmbeddingCapture:
+    """Record the input of a model's classification head on every forward pass.
+
+    Not thread-safe: the pipeline must only be called from one thread at a
+    time, which the micro-batcher guarantees.
+    """
+
+    def __init__(self, head: Any):
+        self._batches: List[np.ndarray] = []
+        self._handle = head.register_forward_pre_hook(self._record)
+
+    def _record(self, module: Any, inputs: Any) -> None:
+        self._batches.append(inputs[0].detach().float().cpu().numpy())
+
+    def take_embeddings(self) -> Optional[np.ndarray]:
+        """Return (and forget) the embeddings of the forward passes since the last call."""
+        batches, self._batches = self._batches, []
+        if not batches:
+            return None
+        return normalize(np.concatenate(batches))
+
+    def remove(self) -> None:
+        self._handle.remove()
+
+
+def embedding_source(pipe: Any) -> Optional[Any]:
+    """Return an object whose ``take_embeddings()`` yields the last call's embeddings.
+
+    Pipelines may provide ``take_embeddings`` themselves (the benchmark
+    stub does); transformers pipelines get a hook on their model's head.
+    Returns None when the backend exposes no features (e.g. ONNX).
+    """
+    if callable(getattr(pipe, "take_embeddings", None)):
+        return pipe
+    model = getattr(pipe, "model", None)
+    for name in HEAD_ATTRIBUTES:
+        head = getattr(model, name, None)
+        if callable(getattr(head, "register_forward_pre_hook", None)):
+            return EmbeddingCapture(head)
+    return None
@@ -0,0 +1,143 @@
+"""Training examples collected from user feedback.
+
+Streams (image, correct_label) pairs out of pictures joined with feedbacks
+for AI/train.py. Rows come from a server-side cursor in bounded batches
+and images are read one at a time from the blob store, so neither table
+is ever held in memory.
+
+Feedback ids are the watermark for incremental fine-tuning: each run
+trains on feedback with since < id <= until and records ``until`` next to
+the checkpoint it saves.
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from sqlalchemy import case, func, select
+
+WATERMARK_FILE = "feedback_watermark.json"
+
+
+def read_watermark(model_dir: Path) -> int:
+    """Return the last feedback id the checkpoint in model_dir was trained on (0 if none)."""
+    path = model_dir / WATERMARK_FILE
+    if not path.exists():
+        return 0
+    return int(json.loads(path.read_text())["feedback_id"])
+
+
+def write_watermark(model_dir: Path, feedback_id: int, examples: int) -> None:
+    """Record that the checkpoint in model_dir has seen feedback up to feedback_id."""
+    (model_dir / WATERMARK_FILE).write_text(
+        json.dumps(
+            {
+                "feedback_id": feedback_id,
+                "examples": examples,
+                "trained_at": datetime.now(timezone.utc).isoformat(),
+            },
+            indent=2,
+        )
+    )
+
+
+def latest_feedback_id() -> int:
+    """Highest feedback id currently in the database (0 if there is none)."""
+    from database.core import SessionLocal
+    from entities.table import Feedback
+
+    with SessionLocal() as db:
+        return db.scalar(select(func.max(Feedback.id))) or 0
+
+
+def iter_feedback_examples(
+    since: int,
+    until: int,
+    label_names: Sequence[str],
+    batch_size: int = 256,
+) -> Iterator[Dict[str, Any]]:
+    """Yield ``{"image": {"bytes": ...}, "label": id}`` for feedback in (since, until].
+
+    Only the newest feedback per picture in the window is used. Corrections
+    whose label is not one of label_names, and pictures whose image is gone
+    from the blob store, are skipped.
+
+    Args:
+        since: exclusive lower bound on feedbacks.id (the previous watermark)
+        until: inclusive upper bound on feedbacks.id, fixed before streaming
+            so the result does not change while it is being read
+        label_names: the model's labels, in id order
+        batch_size: rows fetched per round trip of the server-side cursor
+    """
+    # Imported here so train.py only needs DATABASE_URL when feedback is used
+    from database.core import SessionLocal
+    from entities.table import Feedback, Picture
+    from storage import get_blob_store
+
+    label2id = {name: i for i, name in enumerate(label_names)}
+    store = get_blob_store()
+
+    newest = (
+        select(func.max(Feedback.id))
+        .where(Feedback.id > since, Feedback.id <= until)
+        .group_by(Feedback.picture_id)
+    )
+    stmt = (
+        select(
+            Feedback.correct_label,
+            Picture.image_key,
+            # Inline bytes are only transferred for rows not yet migrated
+            case((Picture.image_key.is_(None), Picture.image)),
+        )
+        .join(Picture, Feedback.picture_id == Picture.id)
+        .where(Feedback.id.in_(newest))
+        .order_by(Feedback.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    skipped = 0
+    with SessionLocal() as db:
+        for correct_label, image_key, inline in db.execute(stmt):
+            label = label2id.get(correct_label)
+            if label is None:
+                skipped += 1
+                continue
+            if image_key is not None:
+                try:
+                    content: Optional[bytes] = store.get(image_key)
+                except KeyError:
+                    content = None
+            else:
+                content = inline
+            if content is None:
+                skipped += 1
+                continue
+            yield {"image": {"bytes": content, "path": None}, "label": label}
+    if skipped:
+        print(f"[FEEDBACK] Skipped {skipped} rows (unknown label or missing image)")
+
+
+def feedback_dataset(
+    since: int, until: int, label_names: Sequence[str], batch_size: int = 256
+):
+    """Build a datasets.Dataset of the feedback in (since, until].
+
+    The generator is written to an Arrow file by ``Dataset.from_generator``
+    as it streams, and the bounds are part of its fingerprint, so a repeated
+    run over the same window reuses that file.
+    """
+    from datasets import ClassLabel, Dataset, Features, Image
+
+    features = Features({"image": Image(), "label": ClassLabel(names=list(label_names))})
+    return Dataset.from_generator(
+        iter_feedback_examples,
+        features=features,
+        gen_kwargs={
+            "since": since,
+            "until": until,
+            # A tuple, since list arguments would be split across shards
+            "label_names": tuple(label_names),
+            "batch_size": batch_size,
+        },
+    )
@@ -0,0 +1,156 @@
+"""ONNX Runtime inference backend for the fine-tuned classifier.
+
+Export (and optionally INT8-quantize) the model in AI/model with:
+
+    python -m AI.onnx_backend [--quantize]
+
+``OnnxClassificationPipeline`` mirrors the call signature and output shape of
+the transformers image-classification pipeline, so it can be returned from
+``get_pipe()`` when ``INFERENCE_BACKEND=onnx``.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+MODEL_DIR = Path(__file__).resolve().parent / "model"
+ONNX_FILENAME = "model.onnx"
+ONNX_INT8_FILENAME = "model.int8.onnx"
+
+
+def onnx_path(model_dir: Path = MODEL_DIR, quantized: bool = False) -> Path:
+    """Location of the exported (or quantized) ONNX graph for ``model_dir``."""
+    return model_dir / "onnx" / (ONNX_INT8_FILENAME if quantized else ONNX_FILENAME)
+
+
+def export_onnx(model_dir: Path = MODEL_DIR, quantize: bool = False) -> Path:
+    """Export the PyTorch checkpoint in ``model_dir`` to ONNX.
+
+    Args:
+        model_dir: directory holding the fine-tuned transformers checkpoint
+        quantize: also write an INT8 dynamic-quantized copy of the graph
+
+    Returns:
+        Path of the graph matching ``quantize``.
+    """
+    import torch
+    from transformers import AutoModelForImageClassification
+
+    fp32_path = onnx_path(model_dir)
+    fp32_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if not fp32_path.exists():
+        model = AutoModelForImageClassification.from_pretrained(str(model_dir))
+        model.eval()
+        size = model.config.image_size
+        dummy = torch.zeros(1, model.config.num_channels, size, size)
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (dummy,),
+                str(fp32_path),
+                input_names=["pixel_values"],
+                output_names=["logits"],
+                dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}},
+                opset_version=17,
+            )
+
+    if not quantize:
+        return fp32_path
+
+    int8_path = onnx_path(model_dir, quantized=True)
+    if not int8_path.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            model_input=str(fp32_path),
+            model_output=str(int8_path),
+            weight_type=QuantType.QInt8,
+        )
+    return int8_path
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class OnnxClassificationPipeline:
+    """Drop-in replacement for the transformers image-classification pipeline.
+
+    Returns a list of ``{"label", "score"}`` dicts for a single image and a
+    list of such lists for a list of images, sorted by descending score.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path = MODEL_DIR,
+        quantized: bool = False,
+        intra_op_threads: int = 0,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoImageProcessor
+
+        graph = onnx_path(model_dir, quantized=quantized)
+        if not graph.exists():
+            graph = export_onnx(model_dir, quantize=quantized)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.session = ort.InferenceSession(
+            str(graph), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.processor = AutoImageProcessor.from_pretrained(str(model_dir))
+        config = AutoConfig.from_pretrained(str(model_dir))
+        self.id2label: Dict[int, str] = {int(k): v for k, v in config.id2label.items()}
+
+    def __call__(
+        self,
+        images: Any,
+        batch_size: Optional[int] = None,
+        top_k: int = 5,
+    ) -> List[Any]:
+        single = not isinstance(images, list)
+        batch = [images] if single else images
+        step = batch_size or len(batch) or 1
+
+        results: List[List[Dict[str, Any]]] = []
+        for start in range(0, len(batch), step):
+            chunk = batch[start : start + step]
+            pixel_values = self.processor(images=chunk, return_tensors="np")[
+                "pixel_values"
+            ].astype(np.float32)
+            (logits,) = self.session.run(["logits"], {"pixel_values": pixel_values})
+            results.extend(self._postprocess(_softmax(logits), top_k))
+
+        return results[0] if single else results
+
+    def _postprocess(self, probs: np.ndarray, top_k: int) -> List[List[Dict[str, Any]]]:
+        k = min(top_k, probs.shape[-1])
+        order = np.argsort(-probs, axis=-1)[:, :k]
+        return [
+            [{"label": self.id2label[int(i)], "score": float(row[i])} for i in idx]
+            for row, idx in zip(probs, order)
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export AI/model to ONNX")
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR)
+    parser.add_argument(
+        "--quantize", action="store_true", help="Also write an INT8 dynamic-quantized graph"
+    )
+    args = parser.parse_args()
+
+    path = export_onnx(args.model_dir, quantize=args.quantize)
+    print(f"Saved at file://{path}")
+
+
+if __name__ == "__main__":
+    main()
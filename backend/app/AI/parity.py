@@ -0,0 +1,100 @@
+"""Accuracy/latency parity check between the PyTorch and ONNX backends.
+
+Run from backend/app against a held-out folder laid out as
+``<data-dir>/<label>/<image>``:
+
+    python -m AI.parity --data-dir /path/to/holdout [--quantized]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from PIL import Image
+
+from AI.onnx_backend import onnx_path
+from AI.pipeline import MODEL_DIR, load_pipe
+
+IMG_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp"}
+
+
+def collect_samples(data_dir: Path, limit: int = 0) -> List[Tuple[Path, str]]:
+    """Return (path, label) pairs from class subfolders of data_dir."""
+    samples = [
+        (f, d.name)
+        for d in sorted(p for p in data_dir.iterdir() if p.is_dir())
+        for f in sorted(d.iterdir())
+        if f.is_file() and f.suffix.lower() in IMG_EXTS
+    ]
+    return samples[:limit] if limit else samples
+
+
+def run_backend(pipe: Any, samples: List[Tuple[Path, str]], batch_size: int) -> Dict[str, Any]:
+    """Predict top-1 labels for all samples and time each batch."""
+    predictions: List[str] = []
+    latencies: List[float] = []
+    for start in range(0, len(samples), batch_size):
+        chunk = samples[start : start + batch_size]
+        images = [Image.open(path).convert("RGB") for path, _ in chunk]
+        t0 = time.perf_counter()
+        outputs = pipe(images, batch_size=len(images))
+        latencies.append((time.perf_counter() - t0) / len(images))
+        predictions.extend(out[0]["label"] for out in outputs)
+
+    correct = sum(pred == label for pred, (_, label) in zip(predictions, samples))
+    return {
+        "predictions": predictions,
+        "accuracy": correct / len(samples) if samples else 0.0,
+        "ms_per_image_p50": statistics.median(latencies) * 1000.0 if latencies else 0.0,
+        "ms_per_image_mean": statistics.fmean(latencies) * 1000.0 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PyTorch and ONNX backends")
+    parser.add_argument("--data-dir", type=Path, required=True)
+    parser.add_argument("--quantized", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args()
+
+    samples = collect_samples(args.data_dir, args.limit)
+    if not samples:
+        raise SystemExit(f"No images found under {args.data_dir}")
+
+    reference = run_backend(load_pipe("pytorch"), samples, args.batch_size)
+    candidate = run_backend(
+        load_pipe("onnx", quantized=args.quantized), samples, args.batch_size
+    )
+
+    agreement = sum(
+        a == b for a, b in zip(reference["predictions"], candidate["predictions"])
+    ) / len(samples)
+    weights = [MODEL_DIR / "model.safetensors", MODEL_DIR / "pytorch_model.bin"]
+    graph = onnx_path(MODEL_DIR, quantized=args.quantized)
+
+    report = {
+        "images": len(samples),
+        "onnx_graph": graph.name,
+        "pytorch_accuracy": reference["accuracy"],
+        "onnx_accuracy": candidate["accuracy"],
+        "accuracy_delta": candidate["accuracy"] - reference["accuracy"],
+        "top1_agreement": agreement,
+        "pytorch_ms_per_image_p50": reference["ms_per_image_p50"],
+        "onnx_ms_per_image_p50": candidate["ms_per_image_p50"],
+        "speedup_p50": reference["ms_per_image_p50"] / candidate["ms_per_image_p50"]
+        if candidate["ms_per_image_p50"]
+        else None,
+        "pytorch_weights_mb": next(
+            (w.stat().st_size / 2**20 for w in weights if w.exists()), None
+        ),
+        "onnx_graph_mb": graph.stat().st_size / 2**20 if graph.exists() else None,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,154 @@
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from transformers import pipeline
-from typing import Optional, Any, TypeAlias
+from typing import Optional, Any, Dict, List, TypeAlias
+
+from config import env
+from AI.batching import MicroBatcher
+from metrics import observe_inference_batch
 
 Pipe: TypeAlias = Any
 
 # Singleton holder for the pipeline instance
 _pipe: Optional[Pipe] = None
+_pipe_lock = threading.Lock()
+
+# Source of the embeddings of the last forward pass (see AI/embeddings.py),
+# or None when disabled or unsupported by the backend
+_embeddings: Optional[Any] = None
+
+# Singleton holder for the micro-batching scheduler
+_batcher: Optional[MicroBatcher] = None
+
+# Set once the model has been loaded in this process
+_ready = False
+
+
+MODEL_DIR = Path(__file__).resolve().parent / "model"
+
+
+@dataclass
+class Classification:
+    """Result of classifying one image through the micro-batcher.
+
+    Attributes:
+        predictions: the pipeline's top-k ``{"label", "score"}`` dicts, best first
+        embedding: L2-normalised float16 penultimate-layer features, or None
+            when embeddings are disabled or the backend does not expose them
+    """
+
+    predictions: List[Dict[str, Any]]
+    embedding: Optional[Any] = None
+
+
+def load_pipe(backend: str = "pytorch", quantized: bool = False) -> Pipe:
+    """Build a new image-classification pipeline for the given backend.
+
+    Args:
+        backend: "pytorch" (transformers pipeline), "onnx" (onnxruntime) or
+            "stub" (benchmarks.stub_model, no model needed)
+        quantized: use the INT8 dynamic-quantized graph (onnx backend only)
+
+    Returns:
+        A callable with the transformers image-classification pipeline's
+        input and output shape.
+    """
+    if backend == "pytorch":
+        # Imported here so that importing the app (or any admin command) does
+        # not pay for loading transformers and torch until a model is needed
+        from transformers import pipeline
+
+        return pipeline(
+            task="image-classification",
+            model=str(MODEL_DIR),
+        )
+    if backend == "onnx":
+        from AI.onnx_backend import OnnxClassificationPipeline
+
+        return OnnxClassificationPipeline(
+            model_dir=MODEL_DIR,
+            quantized=quantized,
+            intra_op_threads=env.ONNX_INTRA_OP_THREADS,
+        )
+    if backend == "stub":
+        # Fake model with configurable latency, for benchmarks and load tests
+        from benchmarks.stub_model import StubClassificationPipeline
+
+        return StubClassificationPipeline()
+    raise ValueError(f"Unknown inference backend: {backend!r}")
 
 
 def get_pipe() -> Pipe:
     """Return a singleton image-classification pipeline instance.
 
-    The pipeline loads lazily from the local model directory.
+    The pipeline loads lazily from the local model directory, using the
+    backend selected by INFERENCE_BACKEND.
     """
-    global _pipe
+    global _pipe, _embeddings, _ready
     if _pipe is None:
-        model_dir = Path(__file__).resolve().parent / "model"
-        _pipe = pipeline(
-            task="image-classification",
-            model=str(model_dir),
-        )
+        with _pipe_lock:
+            if _pipe is None:
+                pipe = load_pipe(env.INFERENCE_BACKEND, quantized=env.ONNX_QUANTIZED)
+                if env.EMBEDDINGS_ENABLED:
+                    from AI.embeddings import embedding_source
+
+                    _embeddings = embedding_source(pipe)
+                _pipe = pipe
+    _ready = True
     return _pipe
+
+
+def warmup() -> None:
+    """Load the pipeline (if needed) and run one dummy forward pass.
+
+    The first pass pays for lazy initialisation (kernel selection, thread
+    pools, allocator growth), so doing it at startup keeps that cost off the
+    first real request. It runs in every worker process, after any fork.
+    """
+    from PIL import Image
+
+    size = env.INFERENCE_INPUT_SIZE
+    _predict_batch([Image.new("RGB", (size, size))])
+
+
+def is_ready() -> bool:
+    """Whether the model is loaded in this process.
+
+    With MODEL_WARMUP the server only accepts connections once the warm-up
+    pass is done, so a reachable worker is also warm.
+    """
+    return _ready
+
+
+def _predict_batch(images: List[Any]) -> List[Classification]:
+    """Run one batched forward pass; returns one Classification per image."""
+    pipe = get_pipe()
+    start = time.perf_counter()
+    results = pipe(images, batch_size=len(images))
+    # Recorded by the same forward pass, not computed separately
+    embeddings = _embeddings.take_embeddings() if _embeddings is not None else None
+    observe_inference_batch(len(images), time.perf_counter() - start)
+    if embeddings is None or len(embeddings) != len(images):
+        embeddings = [None] * len(images)
+    return [
+        Classification(predictions=result, embedding=embedding)
+        for result, embedding in zip(results, embeddings)
+    ]
+
+
+def get_batcher() -> MicroBatcher:
+    """Return the singleton micro-batcher wrapping ``get_pipe()``.
+
+    Each result is a Classification: the predictions ``get_pipe()(image)``
+    would return, plus the image's embedding.
+    """
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(
+            predict_batch=_predict_batch,
+            max_batch_size=env.INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms=env.INFERENCE_MAX_WAIT_MS,
+            max_queue_size=env.INFERENCE_MAX_QUEUE,
+        )
+    return _batcher
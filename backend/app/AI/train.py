@@ -1,23 +1,53 @@
+import argparse
+import hashlib
+import json
 import os
+import sys
+import tempfile
+import time
 from pathlib import Path
-from typing import List
+from collections import deque
+from typing import List, Optional
 
 import evaluate
 import kaggle
 import numpy as np
 import torch
-from datasets import load_dataset, ClassLabel, DatasetDict
+from datasets import (
+    load_dataset,
+    load_from_disk,
+    ClassLabel,
+    Dataset,
+    DatasetDict,
+)
 from transformers import (
     TrainingArguments,
     Trainer,
+    TrainerCallback,
     AutoImageProcessor,
     IntervalStrategy,
     AutoModelForImageClassification,
 )
 
+# backend/app holds database/, entities/ and storage/, which feedback
+# training reads; put it on the path when this file is run as a script
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from AI.feedback_data import (  # noqa: E402
+    feedback_dataset,
+    latest_feedback_id,
+    read_watermark,
+    write_watermark,
+)
+
 
 KNOWN_CLASS_NAMES = {"cardboard", "glass", "metal", "paper", "plastic", "trash"}
 IMG_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp"}
+TENSOR_CACHE_DIR = Path(__file__).resolve().parent / "tensor_cache"
+# Bump when build_splits changes what it produces, to invalidate cached splits
+SPLITS_VERSION = 1
 
 
 def ensure_dataset(base_dir: Path) -> None:
@@ -63,21 +93,19 @@ def looks_like_class_root(p: Path) -> bool:
     return hits >= 2
 
 
-def find_class_root(base_dir: Path) -> Path:
-    """Find the directory under base_dir that actually contains class folders."""
-    if looks_like_class_root(base_dir):
-        return base_dir
-    for depth in range(1, 5):
-        for p in base_dir.rglob("*"):
-            if not p.is_dir():
-                continue
-            try:
-                if len(p.relative_to(base_dir).parts) > depth:
-                    continue
-            except Exception:
-                continue
-            if looks_like_class_root(p):
-                return p
+def find_class_root(base_dir: Path, max_depth: int = 4) -> Path:
+    """Find the directory under base_dir that actually contains class folders.
+
+    Walks the tree breadth-first in a single pass, visiting each directory
+    at most once, so the shallowest match wins.
+    """
+    pending = deque([(base_dir, 0)])
+    while pending:
+        p, depth = pending.popleft()
+        if looks_like_class_root(p):
+            return p
+        if depth < max_depth:
+            pending.extend((d, depth + 1) for d in sorted(immediate_subdirs(p)))
     raise FileNotFoundError(f"Could not locate class root under {base_dir}")
 
 
@@ -111,18 +139,198 @@ def data_collator(examples):
     return {"pixel_values": pixel_values, "labels": labels}
 
 
-def build_splits(class_root: Path) -> DatasetDict:
-    """Create train/test: train excludes 'trash'; test = class_root/trash if it has subfolders."""
-    full = load_dataset("imagefolder", data_dir=str(class_root))["train"]
+def tensor_cache_key(processor, dataset: Dataset) -> str:
+    """Key a tensor cache by the processor config and the dataset fingerprint.
+
+    The fingerprint changes whenever the images, labels or split logic do,
+    and the processor config covers resizing and normalisation, so a stale
+    cache is never picked up.
+    """
+    config = json.dumps(processor.to_dict(), sort_keys=True, default=str)
+    digest = hashlib.sha256(config.encode())
+    digest.update(dataset._fingerprint.encode())
+    return digest.hexdigest()[:16]
+
+
+def materialize_pixel_values(
+    dataset: Dataset, processor, cache_dir: Path, batch_size: int = 64
+) -> Path:
+    """Run the processor over dataset once and store the result on disk.
+
+    pixel_values.npy holds a float32 (N, C, H, W) array and labels.npy the
+    matching labels. Both are written to a temporary directory that is
+    renamed into place when complete, so an interrupted run leaves nothing
+    that a later run would mistake for a cache.
+
+    Returns:
+        The cache directory for this dataset and processor.
+    """
+    target = cache_dir / tensor_cache_key(processor, dataset)
+    if (target / "pixel_values.npy").exists():
+        print(f"[CACHE] Reusing {target}")
+        return target
+    if len(dataset) == 0:
+        raise ValueError("Cannot cache an empty dataset")
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f"{target.name}-", dir=cache_dir))
+    start = time.perf_counter()
+    labels = np.empty(len(dataset), dtype=np.int64)
+    pixel_values: Optional[np.memmap] = None
+    offset = 0
+    for batch in dataset.iter(batch_size=batch_size):
+        imgs = [im.convert("RGB") for im in batch["image"]]
+        pv = processor(images=imgs, return_tensors="np")["pixel_values"]
+        if pixel_values is None:
+            pixel_values = np.lib.format.open_memmap(
+                tmp / "pixel_values.npy",
+                mode="w+",
+                dtype=np.float32,
+                shape=(len(dataset), *pv.shape[1:]),
+            )
+        pixel_values[offset : offset + len(pv)] = pv
+        labels[offset : offset + len(pv)] = batch["label"]
+        offset += len(pv)
+    assert pixel_values is not None
+    pixel_values.flush()
+    del pixel_values
+    np.save(tmp / "labels.npy", labels)
+    tmp.rename(target)
+    print(
+        f"[CACHE] Wrote {len(dataset)} examples to {target} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return target
+
+
+class CachedPixelValues(torch.utils.data.Dataset):
+    """Map-style dataset over a directory written by materialize_pixel_values.
+
+    pixel_values.npy is memory-mapped copy-on-write the first time an item
+    is read in each process. DataLoader workers therefore share the OS page
+    cache instead of receiving pickled copies, and every item is a view into
+    the mapping rather than a fresh array.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.labels = np.load(path / "labels.npy")
+        self._pixel_values: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __getitem__(self, i: int):
+        if self._pixel_values is None:
+            self._pixel_values = np.load(self.path / "pixel_values.npy", mmap_mode="c")
+        return {
+            "pixel_values": torch.from_numpy(self._pixel_values[i]),
+            "labels": int(self.labels[i]),
+        }
+
+    def __getstate__(self):
+        # Workers re-open the mapping instead of unpickling its contents
+        state = self.__dict__.copy()
+        state["_pixel_values"] = None
+        return state
+
+
+class EpochTimer(TrainerCallback):
+    """Print the wall time of each training epoch (evaluation excluded)."""
+
+    def __init__(self):
+        self.epoch_seconds: List[float] = []
+        self._start = 0.0
+
+    def on_epoch_begin(self, args, state, control, **kwargs):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, args, state, control, **kwargs):
+        seconds = time.perf_counter() - self._start
+        self.epoch_seconds.append(seconds)
+        print(f"[EPOCH] {len(self.epoch_seconds)} took {seconds:.1f}s")
+
+
+def source_fingerprint(root: Path) -> str:
+    """Hash the relative path, size and mtime of every image under root.
+
+    Only file metadata is read, so this is cheap next to decoding, and any
+    added, removed or replaced image changes the result.
+    """
+    digest = hashlib.sha256(f"splits-v{SPLITS_VERSION}\n".encode())
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if Path(name).suffix.lower() not in IMG_EXTS:
+                continue
+            path = Path(dirpath) / name
+            stat = path.stat()
+            rel = path.relative_to(root).as_posix()
+            digest.update(f"{rel}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def remap_labels(
+    ds: Dataset, mapping: np.ndarray, names: List[str], num_proc: Optional[int]
+) -> Dataset:
+    """Renumber labels through mapping (old id -> new id) and drop those mapped to -1.
+
+    Both passes are batched, run on num_proc processes and only read the
+    label column, so no image is decoded.
+    """
+    ds = ds.filter(
+        lambda labels: (mapping[np.asarray(labels)] >= 0).tolist(),
+        input_columns="label",
+        batched=True,
+        num_proc=num_proc,
+    )
+    features = ds.features.copy()
+    features["label"] = ClassLabel(names=names)
+    return ds.map(
+        lambda labels: {"label": mapping[np.asarray(labels)].tolist()},
+        input_columns="label",
+        batched=True,
+        features=features,
+        num_proc=num_proc,
+    )
+
+
+def build_splits(
+    class_root: Path,
+    num_proc: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
+) -> DatasetDict:
+    """Create train/test: train excludes 'trash'; test = class_root/trash if it has subfolders.
+
+    Args:
+        class_root: directory holding one folder per class
+        num_proc: processes used to load and remap the datasets
+        cache_dir: if given, the result is saved under
+            cache_dir/splits/<source fingerprint> and reused by later runs
+
+    Returns:
+        The train (and, if present, test) splits
+    """
+    if cache_dir is not None:
+        target = cache_dir / "splits" / source_fingerprint(class_root)
+        if (target / "dataset_dict.json").exists():
+            print(f"[SPLITS] Reusing {target}")
+            return load_from_disk(str(target))
+
+    full = load_dataset("imagefolder", data_dir=str(class_root), num_proc=num_proc)[
+        "train"
+    ]
 
     orig_names = full.features["label"].names
-    id2name = {i: n for i, n in enumerate(orig_names)}
     keep_names = [n for n in orig_names if n.lower() != "trash"]
     name_to_new = {name: i for i, name in enumerate(keep_names)}
 
-    train_ds = full.filter(lambda x: id2name[x["label"]].lower() != "trash")
-    train_ds = train_ds.map(lambda ex: {"label": name_to_new[id2name[ex["label"]]]})
-    train_ds = train_ds.cast_column("label", ClassLabel(names=keep_names))
+    train_ds = remap_labels(
+        full,
+        np.array([name_to_new.get(n, -1) for n in orig_names]),
+        keep_names,
+        num_proc,
+    )
 
     trash_dir = class_root / "trash"
     test_ds = None
@@ -130,47 +338,131 @@ def build_splits(class_root: Path) -> DatasetDict:
         subs = immediate_subdirs(trash_dir)
         if len(subs) >= 1:
             test_raw = load_dataset(
-                "imagefolder", data_dir=str(trash_dir), split="train"
+                "imagefolder", data_dir=str(trash_dir), split="train", num_proc=num_proc
             )
             test_names = test_raw.features["label"].names
-            test_ds = test_raw.map(
-                lambda ex: {"label": name_to_new.get(test_names[ex["label"]], -1)}
+            test_ds = remap_labels(
+                test_raw,
+                np.array([name_to_new.get(n, -1) for n in test_names]),
+                keep_names,
+                num_proc,
             )
-            test_ds = test_ds.filter(lambda x: x["label"] != -1)
-            if len(test_ds) > 0:
-                test_ds = test_ds.cast_column("label", ClassLabel(names=keep_names))
-            else:
+            if len(test_ds) == 0:
                 test_ds = None
 
-    return DatasetDict(
+    dataset = DatasetDict(
         {"train": train_ds, **({"test": test_ds} if test_ds is not None else {})}
     )
+    if cache_dir is not None:
+        # Written next to the target and renamed, so a partial save is never reused
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f"{target.name}-", dir=target.parent))
+        dataset.save_to_disk(str(tmp), num_proc=num_proc)
+        tmp.rename(target)
+        print(f"[SPLITS] Saved to {target}")
+        # Return the saved copy so this run and later ones see the same
+        # fingerprints (and hit the same tensor cache)
+        return load_from_disk(str(target))
+    return dataset
 
 
 def main():
-    DATASET_PATH = Path(__file__).resolve().parent / "dataset"
-    ensure_dataset(DATASET_PATH)
-
-    class_root = find_class_root(DATASET_PATH)
-    print(f"[ROOT] {class_root}")
-
-    dataset = build_splits(class_root)
-    print(dataset)
+    parser = argparse.ArgumentParser(description="Fine-tune the garbage classifier")
+    parser.add_argument(
+        "--no-tensor-cache",
+        action="store_true",
+        help="Preprocess images on the fly every epoch instead of caching pixel_values",
+    )
+    parser.add_argument("--cache-dir", type=Path, default=TENSOR_CACHE_DIR)
+    parser.add_argument("--num-workers", type=int, default=2, help="DataLoader workers")
+    parser.add_argument("--prefetch-factor", type=int, default=2)
+    parser.add_argument(
+        "--num-proc",
+        type=int,
+        default=os.cpu_count(),
+        help="Processes used to prepare the dataset splits",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Fine-tune the saved model on user feedback newer than its watermark",
+    )
+    parser.add_argument("--epochs", type=float, default=3.0)
+    parser.add_argument(
+        "--feedback-batch-size",
+        type=int,
+        default=256,
+        help="Feedback rows fetched per database round trip",
+    )
+    args = parser.parse_args()
 
-    processor = AutoImageProcessor.from_pretrained("yangy50/garbage-classification")
-    dataset = dataset.with_transform(make_batched_transform(processor))
+    model_path = Path(__file__).resolve().parent / "model"
+    if args.incremental:
+        # Start from the current checkpoint and train only on feedback that
+        # arrived after the run that produced it
+        since = read_watermark(model_path)
+        until = latest_feedback_id()
+        if until <= since:
+            print(f"[FEEDBACK] No feedback after id {since}, nothing to train on")
+            return
+        processor = AutoImageProcessor.from_pretrained(model_path)
+        model = AutoModelForImageClassification.from_pretrained(model_path)
+        label_names = [model.config.id2label[i] for i in range(model.config.num_labels)]
+        dataset = DatasetDict(
+            {
+                "train": feedback_dataset(
+                    since, until, label_names, args.feedback_batch_size
+                )
+            }
+        )
+        print(f"[FEEDBACK] ids {since + 1}..{until}: {dataset}")
+        if len(dataset["train"]) == 0:
+            write_watermark(model_path, until, 0)
+            return
+    else:
+        DATASET_PATH = Path(__file__).resolve().parent / "dataset"
+        ensure_dataset(DATASET_PATH)
+
+        class_root = find_class_root(DATASET_PATH)
+        print(f"[ROOT] {class_root}")
+
+        dataset = build_splits(class_root, num_proc=args.num_proc, cache_dir=args.cache_dir)
+        print(dataset)
+
+        processor = AutoImageProcessor.from_pretrained("yangy50/garbage-classification")
+        label_names = dataset["train"].features["label"].names
+        id2label = {i: n for i, n in enumerate(label_names)}
+        label2id = {n: i for i, n in id2label.items()}
+
+        model = AutoModelForImageClassification.from_pretrained(
+            "yangy50/garbage-classification",
+            num_labels=len(label_names),
+            id2label=id2label,
+            label2id=label2id,
+            ignore_mismatched_sizes=True,
+        )
+        # A fresh model has seen no feedback; the next incremental run takes all
+        until = 0
 
-    label_names = dataset["train"].features["label"].names
-    id2label = {i: n for i, n in enumerate(label_names)}
-    label2id = {n: i for i, n in id2label.items()}
+    has_test = "test" in dataset
 
-    model = AutoModelForImageClassification.from_pretrained(
-        "yangy50/garbage-classification",
-        num_labels=len(label_names),
-        id2label=id2label,
-        label2id=label2id,
-        ignore_mismatched_sizes=True,
-    )
+    if args.no_tensor_cache:
+        dataset = dataset.with_transform(make_batched_transform(processor))
+        train_ds = dataset["train"]
+        eval_ds = dataset["test"] if has_test else None
+    else:
+        # Decode and preprocess each image once; every epoch (and later runs
+        # with the same data and processor) read the memory-mapped tensors
+        train_ds = CachedPixelValues(
+            materialize_pixel_values(dataset["train"], processor, args.cache_dir)
+        )
+        eval_ds = (
+            CachedPixelValues(
+                materialize_pixel_values(dataset["test"], processor, args.cache_dir)
+            )
+            if has_test
+            else None
+        )
 
     accuracy = evaluate.load("accuracy")
 
@@ -185,13 +477,11 @@ def main():
     os.makedirs("./app/AI/logs", exist_ok=True)
     os.makedirs("./app/AI/model", exist_ok=True)
 
-    has_test = "test" in dataset
-
     training_args = TrainingArguments(
         output_dir="./app/AI/results",
         per_device_train_batch_size=16,
         per_device_eval_batch_size=16,
-        num_train_epochs=3,
+        num_train_epochs=args.epochs,
         eval_strategy=IntervalStrategy.EPOCH if has_test else IntervalStrategy.NO,
         save_strategy=IntervalStrategy.EPOCH,
         logging_dir="./app/AI/logs",
@@ -200,22 +490,32 @@ def main():
         metric_for_best_model="accuracy",
         remove_unused_columns=False,
         dataloader_pin_memory=False,
+        dataloader_num_workers=args.num_workers,
+        dataloader_prefetch_factor=args.prefetch_factor if args.num_workers else None,
+        dataloader_persistent_workers=args.num_workers > 0,
     )
 
+    epoch_timer = EpochTimer()
     trainer = Trainer(
         model=model,
         args=training_args,
-        train_dataset=dataset["train"],
-        eval_dataset=dataset["test"] if has_test else None,
+        train_dataset=train_ds,
+        eval_dataset=eval_ds,
         tokenizer=processor,
         compute_metrics=compute_metrics if has_test else None,
         data_collator=data_collator,
+        callbacks=[epoch_timer],
     )
-    model_path = Path(__file__).resolve().parent / "model"
     trainer.train()
+    mode = "on-the-fly preprocessing" if args.no_tensor_cache else "tensor cache"
+    print(
+        f"[EPOCH] mean {np.mean(epoch_timer.epoch_seconds):.1f}s over "
+        f"{len(epoch_timer.epoch_seconds)} epochs ({mode})"
+    )
     model.save_pretrained(model_path)
     processor.save_pretrained(model_path)
-    print("Saved at file://{model_path}")
+    write_watermark(model_path, until, len(train_ds))
+    print(f"Saved at file://{model_path}")
 
 
 if __name__ == "__main__":
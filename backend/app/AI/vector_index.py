@@ -0,0 +1,437 @@
+"""In-process nearest-neighbour index over picture embeddings.
+
+Vectors are L2-normalised float16 (see AI/embeddings.py), so cosine
+similarity is a dot product. The index has two parts:
+
+- a persisted base, memory-mapped read-only from disk, so loading costs
+  nothing and pages are shared by every process on the host;
+- an in-memory tail of vectors added since the base was written.
+
+The base is searched brute force (a float32 matmul per block of rows) until
+it holds ``ivf_min_vectors``. From then on ``save`` trains an inverted file
+(IVF): spherical k-means centroids, with the base rows stored grouped by
+nearest centroid so each list is one contiguous slice. A query then scans
+only the ``nprobe`` lists closest to it, which keeps latency in
+milliseconds at millions of vectors. The tail is always brute force; it is
+folded into the base the next time the index is saved.
+
+Every vector carries the id of its picture_embeddings row (``seq``); the
+highest one seen is the watermark from which the index is kept in sync, and
+a seq is never added twice.
+
+Layout on disk::
+
+    <path>/CURRENT            name of the live version directory
+    <path>/v000042/meta.json
+    <path>/v000042/vectors.npy  (n, dim) float16
+    <path>/v000042/ids.npy      (n, 16) uint8, picture UUID bytes
+    <path>/v000042/seqs.npy     (n,) int64
+    <path>/v000042/centroids.npy, offsets.npy  (IVF only)
+
+``save`` writes a new version directory and then swaps CURRENT, so readers
+never see a half-written index.
+"""
+
+import json
+import math
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+# Rows multiplied per matmul when scanning; bounds the float32 scratch memory
+SEARCH_BLOCK_ROWS = 65_536
+# k-means settings used when (re)training the IVF centroids
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+# Versions kept on disk besides the live one, for readers still mapping them
+KEEP_VERSIONS = 1
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid of every row, computed block-wise."""
+    out = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+        block = np.asarray(vectors[start : start + SEARCH_BLOCK_ROWS], np.float32)
+        out[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def train_centroids(
+    sample: np.ndarray, nlist: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Spherical k-means over ``sample``; returns (nlist, dim) unit float32 centroids."""
+    sample = np.asarray(sample, np.float32)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = ~sums.any(axis=1)
+        # Restart empty lists from random points rather than losing them
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+    return centroids.astype(np.float32)
+
+
+def _take(base: np.ndarray, tail: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Rows at ``positions`` of base and tail viewed as one array."""
+    out = np.empty((len(positions),) + base.shape[1:], base.dtype)
+    from_base = positions < len(base)
+    out[from_base] = base[positions[from_base]]
+    out[~from_base] = tail[positions[~from_base] - len(base)]
+    return out
+
+
+class VectorIndex:
+    """Cosine-similarity index mapping float16 vectors to picture UUIDs.
+
+    ``add`` and ``search`` may be called from different threads.
+    """
+
+    def __init__(
+        self,
+        dim: Optional[int] = None,
+        nprobe: int = 16,
+        ivf_min_vectors: int = 50_000,
+    ):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.ivf_min_vectors = ivf_min_vectors
+        self.version: Optional[str] = None
+        self.watermark = 0
+        # Persisted base (memory-mapped when loaded from disk)
+        self._vectors = np.empty((0, dim or 0), np.float16)
+        self._ids = np.empty((0, 16), np.uint8)
+        self._seqs = np.empty(0, np.int64)
+        self._centroids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._trained_on = 0
+        # In-memory tail; buffers grow by doubling, rows [:_tail_len] are valid
+        self._tail_vectors = np.empty((0, dim or 0), np.float16)
+        self._tail_ids = np.empty((0, 16), np.uint8)
+        self._tail_seqs = np.empty(0, np.int64)
+        self._tail_len = 0
+        # Seqs of the base, sorted on first membership check, and of the tail
+        self._sorted_seqs: Optional[np.ndarray] = None
+        self._tail_seq_set: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._vectors) + self._tail_len
+
+    @property
+    def is_ivf(self) -> bool:
+        return self._centroids is not None
+
+    def missing(self, seqs: Iterable[int]) -> List[int]:
+        """The seqs among ``seqs`` that are not indexed yet."""
+        with self._lock:
+            return self._missing(seqs)
+
+    def _missing(self, seqs: Iterable[int]) -> List[int]:
+        if self._sorted_seqs is None:
+            self._sorted_seqs = np.sort(np.asarray(self._seqs))
+        seqs = [seq for seq in seqs if seq not in self._tail_seq_set]
+        if not seqs or not len(self._sorted_seqs):
+            return seqs
+        positions = np.searchsorted(self._sorted_seqs, seqs)
+        found = self._sorted_seqs[np.minimum(positions, len(self._sorted_seqs) - 1)]
+        return [seq for seq, match in zip(seqs, found) if seq != match]
+
+    def add(
+        self,
+        seqs: Sequence[int],
+        ids: Sequence[uuid.UUID],
+        vectors: np.ndarray,
+    ) -> int:
+        """Add vectors to the tail, skipping seqs that are already indexed.
+
+        Seqs may arrive in any order, e.g. rows whose transaction committed
+        after a later one had already been indexed.
+
+        Args:
+            seqs: picture_embeddings ids of the rows
+            ids: picture UUID of each row
+            vectors: (n, dim) L2-normalised vectors
+
+        Returns:
+            The number of vectors actually added.
+        """
+        vectors = np.asarray(vectors, np.float16).reshape(len(seqs), -1)
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._vectors = self._vectors.reshape(0, self.dim)
+                self._tail_vectors = self._tail_vectors.reshape(0, self.dim)
+            if len(seqs) and vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding has {vectors.shape[1]} dimensions, index has {self.dim}"
+                )
+            missing = set(self._missing(seqs))
+            keep = []
+            for i, seq in enumerate(seqs):
+                if seq in missing:
+                    keep.append(i)
+                    missing.discard(seq)  # First occurrence only
+            if not keep:
+                return 0
+            count = len(keep)
+            self._reserve(self._tail_len + count)
+            end = self._tail_len + count
+            self._tail_vectors[self._tail_len : end] = vectors[keep]
+            self._tail_ids[self._tail_len : end] = np.frombuffer(
+                b"".join(ids[i].bytes for i in keep), np.uint8
+            ).reshape(count, 16)
+            self._tail_seqs[self._tail_len : end] = [seqs[i] for i in keep]
+            self._tail_len = end
+
+            self._tail_seq_set.update(seqs[i] for i in keep)
+            self.watermark = max(self.watermark, max(seqs[i] for i in keep))
+            return count
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._tail_seqs)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 1024)
+        for name, shape, dtype in (
+            ("_tail_vectors", (capacity, self.dim), np.float16),
+            ("_tail_ids", (capacity, 16), np.uint8),
+            ("_tail_seqs", (capacity,), np.int64),
+        ):
+            grown = np.empty(shape, dtype)
+            grown[: self._tail_len] = getattr(self, name)[: self._tail_len]
+            # Searches holding the old buffer keep reading valid rows
+            setattr(self, name, grown)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        exclude: Iterable[uuid.UUID] = (),
+    ) -> List[Tuple[uuid.UUID, float]]:
+        """Return up to k (picture UUID, cosine similarity) pairs, most similar first.
+
+        Args:
+            query: vector of the index's dimension (normalised here)
+            k: number of results
+            exclude: pictures never to return, e.g. the query picture itself
+        """
+        with self._lock:
+            tail = (
+                self._tail_vectors[: self._tail_len],
+                self._tail_ids[: self._tail_len],
+            )
+        if self.dim is None or len(self) == 0:
+            return []
+        query = np.asarray(query, np.float32).reshape(-1)
+        if query.shape[0] != self.dim:
+            raise ValueError(f"Query has {query.shape[0]} dimensions, index has {self.dim}")
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        excluded = {picture_id.bytes for picture_id in exclude}
+        # Headroom for excluded ids and pictures indexed twice (re-embedded)
+        wanted = k + len(excluded) + 8
+        candidates: List[Tuple[np.ndarray, np.ndarray]] = []
+        for vectors, ids in self._base_slices(query) + [tail]:
+            for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+                block = np.asarray(vectors[start : start + SEARCH_BLOCK_ROWS], np.float32)
+                scores = block @ query
+                top = _top_k(scores, wanted)
+                candidates.append((scores[top], ids[start + top]))
+        if not candidates:
+            return []
+
+        scores = np.concatenate([scores for scores, _ in candidates])
+        ids = np.concatenate([ids for _, ids in candidates])
+        results: List[Tuple[uuid.UUID, float]] = []
+        seen = set(excluded)
+        for position in np.argsort(-scores):
+            key = ids[position].tobytes()
+            if key in seen:
+                continue
+            seen.add(key)
+            # float16 rounding can put a near-identical vector just above 1
+            similarity = min(float(scores[position]), 1.0)
+            results.append((uuid.UUID(bytes=key), similarity))
+            if len(results) == k:
+                break
+        return results
+
+    def _base_slices(self, query: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """The base rows to scan for ``query``: all of them, or its nprobe IVF lists."""
+        if self._centroids is None or self._offsets is None:
+            return [(self._vectors, self._ids)]
+        probe = _top_k(self._centroids @ query, self.nprobe)
+        # Adjacent lists are merged so each run is read with one slice
+        slices = []
+        for list_id in np.sort(probe):
+            start, end = int(self._offsets[list_id]), int(self._offsets[list_id + 1])
+            if start == end:
+                continue
+            if slices and slices[-1][1] == start:
+                slices[-1] = (slices[-1][0], end)
+            else:
+                slices.append((start, end))
+        return [(self._vectors[s:e], self._ids[s:e]) for s, e in slices]
+
+    @classmethod
+    def load(
+        cls, path: str | os.PathLike, nprobe: int = 16, ivf_min_vectors: int = 50_000
+    ) -> "VectorIndex":
+        """Map the live version under ``path``; an empty index if there is none."""
+        index = cls(nprobe=nprobe, ivf_min_vectors=ivf_min_vectors)
+        version = current_version(path)
+        if version is None:
+            return index
+        directory = Path(path) / version
+        meta = json.loads((directory / "meta.json").read_text())
+        index.version = version
+        index.dim = meta["dim"]
+        index.watermark = meta["watermark"]
+        index._trained_on = meta["trained_on"]
+        index._vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+        index._ids = np.load(directory / "ids.npy", mmap_mode="r")
+        index._seqs = np.load(directory / "seqs.npy", mmap_mode="r")
+        index._tail_vectors = index._tail_vectors.reshape(0, index.dim)
+        if (directory / "centroids.npy").exists():
+            index._centroids = np.load(directory / "centroids.npy")
+            index._offsets = np.load(directory / "offsets.npy")
+        return index
+
+    def save(self, path: str | os.PathLike) -> str:
+        """Write base plus tail as a new version under ``path`` and make it live.
+
+        IVF centroids are trained once the index reaches ivf_min_vectors and
+        retrained whenever it has doubled since; otherwise new vectors are
+        assigned to the existing lists.
+
+        Returns:
+            The name of the version directory written.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            tail_len = self._tail_len
+            tail_vectors = self._tail_vectors[:tail_len]
+            tail_ids = self._tail_ids[:tail_len]
+            tail_seqs = self._tail_seqs[:tail_len]
+            watermark = self.watermark
+        base_len = len(self._vectors)
+        n = base_len + tail_len
+        dim = self.dim or 0
+
+        centroids = self._centroids
+        trained_on = self._trained_on
+        if n >= self.ivf_min_vectors and (centroids is None or n >= 2 * trained_on):
+            nlist = max(1, int(math.sqrt(n)))
+            rng = np.random.default_rng(0)
+            sample_size = min(n, nlist * KMEANS_SAMPLE_PER_LIST)
+            sample = _take(
+                self._vectors,
+                tail_vectors,
+                np.sort(rng.choice(n, sample_size, replace=False)),
+            )
+            centroids = train_centroids(sample, nlist, rng)
+            trained_on = n
+            base_lists = _assign(self._vectors, centroids)
+        elif centroids is not None and self._offsets is not None:
+            base_lists = np.repeat(np.arange(len(centroids)), np.diff(self._offsets))
+        else:
+            base_lists = None
+
+        if base_lists is not None:
+            assignment = np.concatenate([base_lists, _assign(tail_vectors, centroids)])
+            # Rows grouped by list, in their previous order within each list
+            order = np.argsort(assignment, kind="stable")
+            offsets = np.concatenate(
+                [[0], np.cumsum(np.bincount(assignment, minlength=len(centroids)))]
+            ).astype(np.int64)
+        else:
+            order = np.arange(n)
+            offsets = None
+
+        version = _next_version(path)
+        tmp = path / f".{version}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        vectors_out = open_memmap(
+            tmp / "vectors.npy", mode="w+", dtype=np.float16, shape=(n, dim)
+        )
+        ids_out = np.empty((n, 16), np.uint8)
+        seqs_out = np.empty(n, np.int64)
+        # Gathered block by block so a large base is never copied into memory
+        for start in range(0, n, SEARCH_BLOCK_ROWS):
+            positions = order[start : start + SEARCH_BLOCK_ROWS]
+            rows = slice(start, start + len(positions))
+            vectors_out[rows] = _take(self._vectors, tail_vectors, positions)
+            ids_out[rows] = _take(self._ids, tail_ids, positions)
+            seqs_out[rows] = _take(self._seqs, tail_seqs, positions)
+        vectors_out.flush()
+        del vectors_out
+        np.save(tmp / "ids.npy", ids_out)
+        np.save(tmp / "seqs.npy", seqs_out)
+        if centroids is not None and offsets is not None:
+            np.save(tmp / "centroids.npy", centroids)
+            np.save(tmp / "offsets.npy", offsets)
+        (tmp / "meta.json").write_text(
+            json.dumps(
+                {
+                    "dim": dim,
+                    "count": n,
+                    "watermark": watermark,
+                    "nlist": 0 if centroids is None else len(centroids),
+                    "trained_on": trained_on,
+                }
+            )
+        )
+        os.replace(tmp, path / version)
+        pointer = path / "CURRENT.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, path / "CURRENT")
+        _prune_versions(path, version)
+        return version
+
+
+def current_version(path: str | os.PathLike) -> Optional[str]:
+    """Name of the live version directory under ``path``, or None if never saved."""
+    try:
+        return (Path(path) / "CURRENT").read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _next_version(path: Path) -> str:
+    numbers = [
+        int(child.name[1:])
+        for child in path.iterdir()
+        if child.is_dir() and child.name.startswith("v") and child.name[1:].isdigit()
+    ]
+    return f"v{max(numbers, default=0) + 1:06d}"
+
+
+def _prune_versions(path: Path, live: str) -> None:
+    old = sorted(
+        child
+        for child in path.iterdir()
+        if child.is_dir()
+        and child.name.startswith("v")
+        and child.name[1:].isdigit()
+        and child.name != live
+    )
+    for child in old[: max(0, len(old) - KEEP_VERSIONS)]:
+        shutil.rmtree(child, ignore_errors=True)
@@ -12,7 +12,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Import your models and database config
 from database.core import Base
-from entities.table import Picture, Feedback  # Import all your models  # noqa: F401
+from entities.table import Picture, Feedback, DailyStats, ClassificationJob, PictureEmbedding  # Import all your models  # noqa: F401
 from config import env as app_env
 
 # this is the Alembic Config object, which provides
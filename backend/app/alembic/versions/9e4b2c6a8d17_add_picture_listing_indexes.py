@@ -0,0 +1,35 @@
+"""Add picture listing indexes
+
+Revision ID: 9e4b2c6a8d17
+Revises: 5a9e3c7d1b8f
+Create Date: 2025-12-09 16:02:18.274913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b2c6a8d17'
+down_revision: Union[str, Sequence[str], None] = '5a9e3c7d1b8f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built CONCURRENTLY so large pictures tables stay writable; that cannot
+    # run inside the migration transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_pictures_created_at_id', 'pictures', ['created_at', 'id'], unique=False, postgresql_include=['label', 'confidence', 'feedback_given', 'filename'], postgresql_concurrently=True)
+        op.create_index('ix_pictures_label_created_at_id', 'pictures', ['label', 'created_at', 'id'], unique=False, postgresql_include=['confidence', 'feedback_given', 'filename'], postgresql_concurrently=True)
+        op.create_index('ix_pictures_feedback_given_created_at_id', 'pictures', ['feedback_given', 'created_at', 'id'], unique=False, postgresql_include=['label', 'confidence', 'filename'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_pictures_feedback_given_created_at_id', table_name='pictures', postgresql_concurrently=True)
+        op.drop_index('ix_pictures_label_created_at_id', table_name='pictures', postgresql_concurrently=True)
+        op.drop_index('ix_pictures_created_at_id', table_name='pictures', postgresql_concurrently=True)
@@ -0,0 +1,30 @@
+"""Add picture embeddings created_at index
+
+Revision ID: a8d3f6b1c9e4
+Revises: f3c8e1a5d7b2
+Create Date: 2026-01-21 11:08:43.905127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d3f6b1c9e4'
+down_revision: Union[str, Sequence[str], None] = 'f3c8e1a5d7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built CONCURRENTLY so uploads keep inserting embeddings meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_picture_embeddings_created_at'), 'picture_embeddings', ['created_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_picture_embeddings_created_at'), table_name='picture_embeddings', postgresql_concurrently=True)
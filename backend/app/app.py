@@ -1,12 +1,65 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from routes.dashboard import dashboard_route
 from routes.picture import picture_route
 from routes.feedback import feedback_route
+from routes.stats import stats_route
+from routes.jobs import jobs_route
+from routes.health import health_route
+from AI.pipeline import get_pipe, warmup
+from config import env
+import metrics
+from service.embeddings import sync_embedding_index
+from service.jobs import JobWorker
+
+logger = logging.getLogger(__name__)
+
+
+def _report_model_load(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Loading the model failed", exc_info=task.exception())
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep the model's load and first-pass cost off the first request; the
+    # server only starts accepting connections once this returns
+    if env.MODEL_WARMUP:
+        await asyncio.to_thread(warmup)
+    else:
+        # Serve right away and load the model in the background; /api/ready
+        # reports 503 until it is loaded
+        app.state.model_load = asyncio.create_task(asyncio.to_thread(get_pipe))
+        app.state.model_load.add_done_callback(_report_model_load)
 
-app = FastAPI()
+    # Map the persisted embedding index and catch up with rows added since
+    # it was written, so the first similarity query does not pay for it
+    if env.EMBEDDINGS_ENABLED:
+        await asyncio.to_thread(sync_embedding_index)
+
+    # Drain async classification jobs in this process unless dedicated
+    # `python -m commands.job_worker` processes do it
+    worker = None
+    if env.JOB_WORKER_IN_PROCESS:
+        # Jobs share this process's connection pool with API requests
+        concurrency = min(
+            env.JOB_WORKER_CONCURRENCY,
+            max((env.DB_POOL_SIZE + env.DB_MAX_OVERFLOW) // 3, 1),
+        )
+        worker = JobWorker(concurrency, env.JOB_POLL_INTERVAL_SECONDS)
+        worker_task = asyncio.create_task(worker.run())
+    yield
+    if worker is not None:
+        worker.stop()
+        await worker_task
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,11 +75,13 @@ async def index():
     return {"message": "Hello, World!"}
 
 
-routes = [picture_route, dashboard_route, feedback_route]
+routes = [picture_route, dashboard_route, feedback_route, stats_route, jobs_route, health_route]
 
 for route in routes:
     app.include_router(prefix="/api", router=route)
 
+metrics.install(app)
+
 if __name__ == "__main__":
     import uvicorn
 
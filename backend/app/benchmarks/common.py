@@ -0,0 +1,22 @@
+import statistics
+from typing import Dict, List
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """Count, mean and p50/p95/p99 (in ms) of a list of durations in seconds."""
+    if not timings:
+        return {"count": 0}
+    ms = sorted(t * 1000.0 for t in timings)
+    if len(ms) >= 2:
+        centiles = statistics.quantiles(ms, n=100, method="inclusive")
+        p50, p95, p99 = centiles[49], centiles[94], centiles[98]
+    else:
+        p50 = p95 = p99 = ms[0]
+    return {
+        "count": len(ms),
+        "ms_mean": statistics.fmean(ms),
+        "ms_p50": p50,
+        "ms_p95": p95,
+        "ms_p99": p99,
+        "ms_max": ms[-1],
+    }
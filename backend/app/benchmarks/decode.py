@@ -0,0 +1,117 @@
+"""Decode-stage benchmark: full decode vs. draft/reduce decode for inference.
+
+Run from backend/app against a folder of (large) images, or synthesize one:
+
+    python -m benchmarks.decode --corpus /path/to/photos
+    python -m benchmarks.decode --synthesize 20 --width 4032 --height 3024
+
+Each mode runs in its own subprocess so the reported peak RSS is not
+polluted by the other mode.
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List
+
+from PIL import Image
+
+from service.image import decode_for_inference
+
+IMG_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp"}
+
+
+def decode_full(content: bytes) -> Image.Image:
+    """The original upload path: decode every pixel, then convert."""
+    return Image.open(BytesIO(content)).convert("RGB")
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def synthesize_corpus(directory: Path, count: int, width: int, height: int) -> None:
+    """Write ``count`` noisy phone-sized JPEGs to ``directory``."""
+    for i in range(count):
+        channels = [Image.effect_noise((width, height), 40 + 10 * c) for c in range(3)]
+        Image.merge("RGB", channels).save(directory / f"synthetic_{i:03d}.jpg", quality=90)
+
+
+def _run_mode(mode: str, paths: List[str], target: int, max_pixels: int, rounds: int, out) -> None:
+    timings: List[float] = []
+    baseline_rss = peak_rss_mb()
+    for _ in range(rounds):
+        for path in paths:
+            content = Path(path).read_bytes()
+            t0 = time.perf_counter()
+            if mode == "full":
+                image = decode_full(content)
+            else:
+                image = decode_for_inference(content, target, max_pixels)
+            timings.append(time.perf_counter() - t0)
+            del image
+    out.send(
+        {
+            "mode": mode,
+            "images": len(timings),
+            "ms_mean": statistics.fmean(timings) * 1000.0,
+            "ms_p50": statistics.median(timings) * 1000.0,
+            "ms_p95": statistics.quantiles(timings, n=20)[-1] * 1000.0
+            if len(timings) >= 2
+            else timings[0] * 1000.0,
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_delta_mb": peak_rss_mb() - baseline_rss,
+        }
+    )
+
+
+def run(paths: List[str], target: int, max_pixels: int, rounds: int) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    results: Dict[str, Any] = {}
+    for mode in ("full", "fast"):
+        receiver, sender = ctx.Pipe(duplex=False)
+        proc = ctx.Process(
+            target=_run_mode, args=(mode, paths, target, max_pixels, rounds, sender)
+        )
+        proc.start()
+        results[mode] = receiver.recv()
+        proc.join()
+    results["speedup_p50"] = results["full"]["ms_p50"] / results["fast"]["ms_p50"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the inference decode stage")
+    parser.add_argument("--corpus", type=Path, help="Folder of images to decode")
+    parser.add_argument("--synthesize", type=int, default=0, help="Generate N images")
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--target", type=int, default=224)
+    parser.add_argument("--max-pixels", type=int, default=100_000_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus
+        if corpus is None:
+            corpus = Path(tmp)
+            synthesize_corpus(corpus, args.synthesize or 10, args.width, args.height)
+        paths = sorted(
+            str(p) for p in corpus.rglob("*") if p.suffix.lower() in IMG_EXTS
+        )
+        if not paths:
+            raise SystemExit(f"No images found under {corpus}")
+        print(json.dumps(run(paths, args.target, args.max_pixels, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""End-to-end load generator for a running backend.
+
+Start the API (e.g. with INFERENCE_BACKEND=stub against a seeded throwaway
+database), then from backend/app:
+
+    python -m benchmarks.load --url http://localhost:8080/api --concurrency 32 --duration 30
+    python -m benchmarks.load --mix upload=1,dashboard=4 --duplicate-ratio 0.2
+
+Each of ``--concurrency`` workers repeatedly picks a request from the
+weighted mix: POST /picture with a generated JPEG, or GET /dashboard.
+The generated JPEGs are unique unless --duplicate-ratio sends known ones,
+which exercises the classification cache. The report gives throughput,
+latency percentiles and status codes per endpoint, measured after
+--warmup seconds.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+import httpx
+from PIL import Image
+
+from benchmarks.common import summarize
+
+
+def make_jpeg(rng: random.Random, width: int, height: int) -> bytes:
+    """A small random JPEG; the colour makes each one (almost surely) unique."""
+    color = tuple(rng.randrange(256) for _ in range(3))
+    image = Image.new("RGB", (width, height), color)
+    image.putpixel((rng.randrange(width), rng.randrange(height)), (255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.mix = {
+            name: int(weight)
+            for name, weight in (part.split("=") for part in args.mix.split(","))
+        }
+        self.rng = random.Random(args.seed)
+        # A small pool of pre-encoded images for duplicate uploads
+        self.known = [make_jpeg(self.rng, args.width, args.height) for _ in range(8)]
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.measuring = False
+
+    async def request(self, client: httpx.AsyncClient, name: str) -> None:
+        t0 = time.perf_counter()
+        try:
+            if name == "upload":
+                if self.rng.random() < self.args.duplicate_ratio:
+                    content = self.rng.choice(self.known)
+                else:
+                    content = make_jpeg(self.rng, self.args.width, self.args.height)
+                response = await client.post(
+                    "/picture", files={"file": ("load.jpg", content, "image/jpeg")}
+                )
+            elif name == "dashboard":
+                response = await client.get("/dashboard")
+            else:
+                raise ValueError(f"Unknown request type: {name}")
+            status = str(response.status_code)
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        if self.measuring:
+            self.timings[name].append(time.perf_counter() - t0)
+            self.statuses[name][status] += 1
+
+    async def worker(self, client: httpx.AsyncClient, deadline: float) -> None:
+        names, weights = list(self.mix), list(self.mix.values())
+        while time.monotonic() < deadline:
+            await self.request(client, self.rng.choices(names, weights)[0])
+
+    async def run(self) -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=self.args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=self.args.url, limits=limits, timeout=self.args.timeout
+        ) as client:
+            start = time.monotonic()
+            deadline = start + self.args.warmup + self.args.duration
+            workers = [
+                asyncio.create_task(self.worker(client, deadline))
+                for _ in range(self.args.concurrency)
+            ]
+            await asyncio.sleep(self.args.warmup)
+            self.measuring = True
+            measured_from = time.monotonic()
+            await asyncio.gather(*workers)
+            elapsed = time.monotonic() - measured_from
+
+        report: Dict[str, Any] = {
+            "url": self.args.url,
+            "concurrency": self.args.concurrency,
+            "duration_s": elapsed,
+            "total_rps": sum(len(t) for t in self.timings.values()) / elapsed,
+        }
+        for name in self.mix:
+            report[name] = {
+                "rps": len(self.timings[name]) / elapsed,
+                **summarize(self.timings[name]),
+                "statuses": dict(self.statuses[name]),
+            }
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the API at a target concurrency")
+    parser.add_argument("--url", default="http://localhost:8080/api")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds first")
+    parser.add_argument("--mix", default="upload=1,dashboard=1", help="name=weight,...")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(LoadTest(args).run()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Micro-benchmarks for the dashboard and listing queries on a seeded database.
+
+Seed first (see benchmarks/seed.py), then run from backend/app:
+
+    python -m benchmarks.queries --rounds 20
+
+"dashboard_scan" is the original aggregation over pictures and feedbacks. It
+is kept here as the baseline the daily_stats rollup ("dashboard_rollup")
+is compared against. The listing cases walk GET /api/pictures pages via
+keyset cursors.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy import case, func, select
+
+from benchmarks.common import summarize
+from database.core import AsyncSessionLocal
+from entities.table import Feedback, Picture
+from service.dashboard import compute_dashboard
+from service.picture import list_pictures
+
+
+async def dashboard_scan(db) -> Dict[str, Any]:
+    total_pictures = await db.scalar(select(func.count(Picture.id)))
+    total_feedback = await db.scalar(select(func.count(Feedback.id)))
+    day = func.date(Feedback.created_at)
+    rows = await db.execute(
+        select(
+            day,
+            func.sum(case((Feedback.correct_label == Picture.label, 1), else_=0)),
+            func.sum(case((Feedback.correct_label != Picture.label, 1), else_=0)),
+        )
+        .join(Picture, Feedback.picture_id == Picture.id)
+        .group_by(day)
+        .order_by(day)
+    )
+    return {
+        "total_pictures": total_pictures,
+        "total_feedback": total_feedback,
+        "feedback_by_date": rows.all(),
+    }
+
+
+async def walk_pages(db, pages: int, **filters) -> int:
+    cursor, rows = None, 0
+    for _ in range(pages):
+        items, cursor = await list_pictures(db, limit=50, cursor=cursor, **filters)
+        rows += len(items)
+        if cursor is None:
+            break
+    return rows
+
+
+CASES: Dict[str, Callable[[Any], Awaitable[Any]]] = {
+    "dashboard_rollup": compute_dashboard,
+    "dashboard_scan": dashboard_scan,
+    "list_first_page": lambda db: walk_pages(db, 1),
+    "list_100_pages": lambda db: walk_pages(db, 100),
+    "list_label_filter": lambda db: walk_pages(db, 10, label="glass"),
+    "list_feedback_filter": lambda db: walk_pages(db, 10, feedback_given=True),
+}
+
+
+async def run(rounds: int, cases: list[str]) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    async with AsyncSessionLocal() as db:
+        for name in cases:
+            query = CASES[name]
+            await query(db)  # warm caches, not measured
+            timings = []
+            for _ in range(rounds):
+                t0 = time.perf_counter()
+                await query(db)
+                timings.append(time.perf_counter() - t0)
+            report[name] = summarize(timings)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard and listing queries")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--case", action="append", choices=sorted(CASES), dest="cases")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rounds, args.cases or list(CASES))), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Seed a synthetic dataset for benchmarks: pictures, feedbacks and the rollup.
+
+Run from backend/app against a throwaway database:
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.seed --create-schema
+    python -m benchmarks.seed --pictures 1000000 --feedbacks 200000 --days 365
+
+Use --create-schema for a fresh SQLite file; run ``alembic upgrade head``
+first for Postgres. Rows are bulk-inserted in chunks with a fixed random
+seed, so the same arguments always produce the same data. Every picture
+points at one shared blob, so seeding writes no image files per row. The
+daily_stats rollup is rebuilt at the end.
+"""
+
+import argparse
+import io
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from PIL import Image
+from sqlalchemy import insert
+
+from service.daily_stats import rebuild_daily_stats
+from database.core import Base, SessionLocal, engine
+from entities.table import Feedback, Picture
+from storage import get_blob_store
+
+LABELS = ["cardboard", "glass", "metal", "paper", "plastic", "trash"]
+
+
+def _shared_blob() -> tuple[str, int]:
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), (90, 120, 60)).save(buffer, "JPEG", quality=85)
+    data = buffer.getvalue()
+    return get_blob_store().put(data), len(data)
+
+
+def seed(
+    pictures: int, feedbacks: int, days: int, chunk_size: int, rng: random.Random
+) -> None:
+    image_key, image_size = _shared_blob()
+    feedback_ratio = min(feedbacks / pictures, 1.0) if pictures else 0.0
+    now = datetime.now().replace(microsecond=0)
+    window = days * 86400
+    inserted = feedback_inserted = 0
+
+    with SessionLocal() as db:
+        while inserted < pictures:
+            picture_rows, feedback_rows = [], []
+            for _ in range(min(chunk_size, pictures - inserted)):
+                created_at = now - timedelta(seconds=rng.randrange(window))
+                label = rng.choice(LABELS)
+                has_feedback = (
+                    feedback_inserted + len(feedback_rows) < feedbacks
+                    and rng.random() < feedback_ratio
+                )
+                picture_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+                picture_rows.append(
+                    {
+                        "id": picture_id,
+                        "filename": f"seed_{inserted + len(picture_rows)}.jpg",
+                        "label": label,
+                        "confidence": round(rng.uniform(0.3, 0.99), 2),
+                        "feedback_given": has_feedback,
+                        "image_key": image_key,
+                        "stored_format": "jpeg",
+                        "original_size": image_size,
+                        "stored_size": image_size,
+                        "content_hash": f"{rng.getrandbits(256):064x}",
+                        "created_at": created_at,
+                    }
+                )
+                if has_feedback:
+                    correct = rng.random() < 0.8
+                    feedback_rows.append(
+                        {
+                            "picture_id": picture_id,
+                            "message": "seeded",
+                            "correct_label": label if correct else rng.choice(LABELS),
+                            "created_at": created_at
+                            + timedelta(seconds=rng.randrange(3600)),
+                        }
+                    )
+            db.execute(insert(Picture), picture_rows)
+            if feedback_rows:
+                db.execute(insert(Feedback), feedback_rows)
+            db.commit()
+            inserted += len(picture_rows)
+            feedback_inserted += len(feedback_rows)
+            print(f"[SEED] {inserted} pictures, {feedback_inserted} feedbacks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic benchmark dataset")
+    parser.add_argument("--pictures", type=int, default=100_000)
+    parser.add_argument("--feedbacks", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument(
+        "--create-schema",
+        action="store_true",
+        help="Create tables with metadata.create_all (fresh SQLite files)",
+    )
+    args = parser.parse_args()
+
+    if args.create_schema:
+        Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    seed(args.pictures, args.feedbacks, args.days, args.chunk_size, random.Random(args.seed))
+    days = rebuild_daily_stats()
+    print(
+        f"[DONE] seeded in {time.perf_counter() - started:.1f}s, "
+        f"daily_stats rebuilt for {days} days"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Micro-benchmarks for the upload stages: decode, inference and encode.
+
+Run from backend/app, against the stub model or the real one:
+
+    python -m benchmarks.stages --backend stub
+    python -m benchmarks.stages --backend pytorch --corpus /path/to/photos --batch-sizes 1,8,16
+
+The functions are the ones service/upload.py runs for every upload:
+decode_for_inference, the pipeline returned by load_pipe() called per
+batch, and prepare_for_storage with the configured storage policy.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from AI.pipeline import load_pipe
+from benchmarks.common import summarize
+from benchmarks.decode import IMG_EXTS, synthesize_corpus
+from config import env
+from service.image import decode_for_inference, prepare_for_storage
+
+
+def run(
+    contents: List[bytes], backend: str, batch_sizes: List[int], rounds: int
+) -> Dict[str, Any]:
+    decode, encode = [], []
+    images = []
+    for _ in range(rounds):
+        for content in contents:
+            t0 = time.perf_counter()
+            image = decode_for_inference(
+                content, env.INFERENCE_INPUT_SIZE, env.MAX_IMAGE_PIXELS
+            )
+            decode.append(time.perf_counter() - t0)
+            images.append(image)
+
+            t0 = time.perf_counter()
+            prepare_for_storage(
+                content,
+                env.MAX_IMAGE_PIXELS,
+                env.STORAGE_MAX_PASSTHROUGH_BYTES,
+                env.STORAGE_TRANSCODE_FORMAT,
+                env.STORAGE_TRANSCODE_QUALITY,
+            )
+            encode.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    pipe = load_pipe(backend, quantized=env.ONNX_QUANTIZED)
+    report: Dict[str, Any] = {
+        "backend": backend,
+        "model_load_ms": (time.perf_counter() - t0) * 1000.0,
+        "decode": summarize(decode),
+        "encode": summarize(encode),
+        "inference": {},
+    }
+    pipe(images[:1], batch_size=1)  # warm-up pass, not measured
+    for batch_size in batch_sizes:
+        per_batch = []
+        for start in range(0, len(images) - batch_size + 1, batch_size):
+            batch = images[start : start + batch_size]
+            t0 = time.perf_counter()
+            pipe(batch, batch_size=batch_size)
+            per_batch.append(time.perf_counter() - t0)
+        stats = summarize(per_batch)
+        if per_batch:
+            stats["images_per_s"] = batch_size * len(per_batch) / sum(per_batch)
+        report["inference"][f"batch_{batch_size}"] = stats
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark decode, inference and encode")
+    parser.add_argument("--backend", default=env.INFERENCE_BACKEND)
+    parser.add_argument("--corpus", type=Path, help="Folder of images")
+    parser.add_argument("--synthesize", type=int, default=16, help="Generate N images")
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--batch-sizes", default="1,4,16")
+    parser.add_argument("--rounds", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus
+        if corpus is None:
+            corpus = Path(tmp)
+            synthesize_corpus(corpus, args.synthesize, args.width, args.height)
+        contents = [
+            p.read_bytes() for p in sorted(corpus.rglob("*")) if p.suffix.lower() in IMG_EXTS
+        ]
+    if not contents:
+        raise SystemExit(f"No images found under {corpus}")
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    print(json.dumps(run(contents, args.backend, batch_sizes, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Startup benchmark: import time and memory of the app and admin entry points.
+
+Run from backend/app:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --module app --warmup --top 30
+
+Every module is imported in a fresh ``python -X importtime`` subprocess.
+The report gives the wall time to import it and the extra time to warm up
+the model (with --warmup). It also gives the RSS once ready, whether torch
+or transformers got loaded, and the slowest top-level imports by
+cumulative time.
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Entry points whose cold start we care about: the API, alembic's env.py
+# imports, and the maintenance commands
+DEFAULT_MODULES = [
+    "app",
+    "entities.table",
+    "commands.backfill_daily_stats",
+    "commands.job_worker",
+]
+
+HEAVY_MODULES = ["torch", "transformers", "onnxruntime", "numpy"]
+
+# Runs in the child: import the target, optionally warm up, report as JSON
+CHILD = """
+import importlib, json, sys, time
+t0 = time.perf_counter()
+importlib.import_module({module!r})
+imported = time.perf_counter()
+if {warmup!r}:
+    from AI.pipeline import warmup
+    warmup()
+ready = time.perf_counter()
+rss_kb = 0
+try:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+except OSError:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        rss_kb //= 1024
+print(json.dumps({{
+    "import_s": imported - t0,
+    "ready_s": ready - t0,
+    "rss_mb": rss_kb / 1024,
+    "heavy_loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` output into top-level imports (depth 0)."""
+    top_level = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        # Nested imports are indented by two spaces per level, after one space
+        if len(indent) == 1:
+            top_level.append(
+                {
+                    "module": name,
+                    "self_ms": int(self_us) / 1000.0,
+                    "cumulative_ms": int(cumulative_us) / 1000.0,
+                }
+            )
+    return top_level
+
+
+def measure(module: str, warmup: bool, top: int) -> Dict[str, Any]:
+    code = CHILD.format(module=module, warmup=warmup, heavy=HEAVY_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(proc.stderr)
+    result["slowest_imports"] = sorted(
+        imports, key=lambda entry: entry["cumulative_ms"], reverse=True
+    )[:top]
+    return result
+
+
+def run(modules: List[str], warmup: bool, rounds: int, top: int) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    for module in modules:
+        samples = [measure(module, warmup and module == "app", top) for _ in range(rounds)]
+        report[module] = {
+            "import_ms_p50": statistics.median(s["import_s"] for s in samples) * 1000.0,
+            "ready_ms_p50": statistics.median(s["ready_s"] for s in samples) * 1000.0,
+            "rss_mb": statistics.median(s["rss_mb"] for s in samples),
+            "heavy_loaded": samples[-1]["heavy_loaded"],
+            "slowest_imports": samples[-1]["slowest_imports"],
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time and RSS at startup")
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to import (repeatable); defaults to the app and admin commands",
+    )
+    parser.add_argument(
+        "--warmup", action="store_true", help="Also load and warm the model for 'app'"
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            run(args.modules or DEFAULT_MODULES, args.warmup, args.rounds, args.top),
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
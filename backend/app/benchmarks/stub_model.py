@@ -0,0 +1,62 @@
+"""Stand-in for the classifier, for benchmarks and load tests without the model.
+
+Selected with ``INFERENCE_BACKEND=stub``. A batch sleeps for
+``BENCH_STUB_BATCH_MS + BENCH_STUB_ITEM_MS * len(batch)`` milliseconds (read
+from the environment) to imitate a forward pass. It then returns
+deterministic labels with the transformers pipeline's output shape, so the
+batching, DB and HTTP layers see realistic timing and data. Embeddings are
+an 8x8 thumbnail of each image, so near-identical images get near-identical
+vectors as with the real model.
+"""
+
+import os
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+LABELS = ["cardboard", "glass", "metal", "paper", "plastic", "trash"]
+
+
+class StubClassificationPipeline:
+    def __init__(self, batch_ms: float | None = None, item_ms: float | None = None):
+        self.batch_ms = (
+            float(os.environ.get("BENCH_STUB_BATCH_MS", "20"))
+            if batch_ms is None
+            else batch_ms
+        )
+        self.item_ms = (
+            float(os.environ.get("BENCH_STUB_ITEM_MS", "5")) if item_ms is None else item_ms
+        )
+        self._embeddings: Optional[np.ndarray] = None
+
+    def __call__(self, images: Any, batch_size: int | None = None, top_k: int = 5):
+        single = not isinstance(images, list)
+        batch = [images] if single else images
+        time.sleep((self.batch_ms + self.item_ms * len(batch)) / 1000.0)
+        results = [self._predict(image, top_k) for image in batch]
+        self._embeddings = np.stack([self._embed(image) for image in batch])
+        return results[0] if single else results
+
+    def take_embeddings(self) -> Optional[np.ndarray]:
+        """Embeddings of the last call, as AI/embeddings.py captures them."""
+        from AI.embeddings import normalize
+
+        embeddings, self._embeddings = self._embeddings, None
+        return None if embeddings is None else normalize(embeddings)
+
+    def _embed(self, image: Any) -> np.ndarray:
+        pixels = np.asarray(image.convert("RGB").resize((8, 8)), np.float32)
+        return pixels.reshape(-1) - pixels.mean()
+
+    def _predict(self, image: Any, top_k: int) -> List[Dict[str, Any]]:
+        # Derive the label from the pixels so identical images agree
+        seed = zlib.crc32(image.resize((8, 8)).tobytes())
+        first = seed % len(LABELS)
+        order = LABELS[first:] + LABELS[:first]
+        scores = [0.9] + [0.1 / (len(LABELS) - 1)] * (len(LABELS) - 1)
+        return [
+            {"label": label, "score": score}
+            for label, score in zip(order[:top_k], scores[:top_k])
+        ]
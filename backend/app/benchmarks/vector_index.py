@@ -0,0 +1,97 @@
+"""Embedding index benchmark: query latency and recall, brute force vs. IVF.
+
+Run from backend/app; no database or model needed:
+
+    python -m benchmarks.vector_index --vectors 1000000 --dim 768
+    python -m benchmarks.vector_index --vectors 200000 --nprobe 8 16 32
+
+Synthesizes clustered float16 vectors (like embeddings of many shots of
+fewer items), saves them twice, once below and once above the IVF
+threshold, and times ``search`` on the memory-mapped indexes. Recall@k is
+measured against the brute-force results.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List
+
+import numpy as np
+
+from AI.embeddings import normalize
+from AI.vector_index import VectorIndex
+from benchmarks.common import summarize
+
+
+def synthesize(count: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """``count`` unit float16 vectors scattered around ``clusters`` centers."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    out = np.empty((count, dim), np.float16)
+    for start in range(0, count, 100_000):
+        size = min(100_000, count - start)
+        block = centers[rng.integers(0, clusters, size)]
+        block += 0.5 * rng.standard_normal((size, dim), dtype=np.float32)
+        out[start : start + size] = normalize(block)
+    return out
+
+
+def time_queries(
+    index: VectorIndex, queries: np.ndarray, k: int
+) -> tuple[Dict[str, float], List[set]]:
+    index.search(queries[0], k)  # Fault in the centroids and first pages
+    timings, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        matches = index.search(query, k)
+        timings.append(time.perf_counter() - started)
+        results.append({picture_id for picture_id, _ in matches})
+    return summarize(timings), results
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    vectors = synthesize(args.vectors, args.dim, args.clusters)
+    ids = [uuid.uuid4() for _ in range(args.vectors)]
+    rng = np.random.default_rng(1)
+    queries = np.asarray(
+        vectors[rng.integers(0, args.vectors, args.queries)], np.float32
+    )
+    queries += 0.05 * rng.standard_normal(queries.shape, dtype=np.float32)
+
+    results: Dict[str, Any] = {"vectors": args.vectors, "dim": args.dim}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, ivf_min in (("brute_force", args.vectors + 1), ("ivf", 1)):
+            index = VectorIndex(ivf_min_vectors=ivf_min)
+            index.add(list(range(1, args.vectors + 1)), ids, vectors)
+            started = time.perf_counter()
+            index.save(f"{tmp}/{name}")
+            results[f"{name}_save_s"] = time.perf_counter() - started
+
+        brute = VectorIndex.load(f"{tmp}/brute_force")
+        results["brute_force"], exact = time_queries(brute, queries, args.k)
+        for nprobe in args.nprobe:
+            ivf = VectorIndex.load(f"{tmp}/ivf", nprobe=nprobe)
+            stats, approx = time_queries(ivf, queries, args.k)
+            stats["recall_at_k"] = float(
+                np.mean([len(a & e) / len(e) for a, e in zip(approx, exact)])
+            )
+            results[f"ivf_nprobe_{nprobe}"] = stats
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the embedding index")
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[16])
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Rebuild the ``daily_stats`` rollup from the pictures and feedbacks tables.
+
+Run from backend/app once after ``alembic upgrade head`` (and again any
+time the rollup needs repairing):
+
+    python -m commands.backfill_daily_stats
+
+The aggregation runs in the database and only O(days) rows come back.
+The rollup is replaced in a single transaction.
+"""
+
+from service.daily_stats import rebuild_daily_stats
+
+
+def main():
+    days = rebuild_daily_stats()
+    print(f"[DONE] daily_stats rebuilt for {days} days")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Write the persisted embedding index that API processes map at startup.
+
+Run from backend/app, e.g. from cron every few minutes:
+
+    python -m commands.embedding_index
+    python -m commands.embedding_index --rebuild   # after re-embedding pictures
+
+Loads the current version from EMBEDDING_INDEX_PATH, adds the
+picture_embeddings rows written since, and saves the result as a new
+version. API processes switch to it on their next sync and only have to
+keep the rows added after it in memory. IVF lists are trained once the
+index reaches EMBEDDING_IVF_MIN_VECTORS and retrained whenever it has
+doubled in size since.
+
+``--rebuild`` starts from an empty index instead, e.g. after
+``commands.reclassify --embeddings`` replaced the vectors with a new
+model's.
+"""
+
+import argparse
+import time
+
+from AI.vector_index import VectorIndex
+from config import env
+from service.embeddings import sync_embedding_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Ignore the persisted index"
+    )
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    if args.rebuild:
+        index = VectorIndex(ivf_min_vectors=env.EMBEDDING_IVF_MIN_VECTORS)
+    else:
+        index = VectorIndex.load(
+            env.EMBEDDING_INDEX_PATH, ivf_min_vectors=env.EMBEDDING_IVF_MIN_VECTORS
+        )
+    added = sync_embedding_index(index)
+    print(f"[SYNC] {added} new vectors, {len(index)} in total")
+
+    if added == 0 and not args.rebuild and index.version is not None:
+        print("[DONE] Index is up to date")
+        return
+    version = index.save(env.EMBEDDING_INDEX_PATH)
+    saved = VectorIndex.load(env.EMBEDDING_INDEX_PATH)
+    kind = "IVF" if saved.is_ivf else "brute force"
+    print(
+        f"[DONE] Saved {version} ({len(saved)} vectors, {kind}) "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
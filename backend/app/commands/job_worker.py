@@ -0,0 +1,44 @@
+"""Drain the asynchronous classification job queue in a separate process.
+
+Run from backend/app, as many processes as inference capacity allows:
+
+    python -m commands.job_worker --concurrency 16
+
+Set JOB_WORKER_IN_PROCESS=false for the API processes when jobs are
+drained here instead. Workers claim jobs with FOR UPDATE SKIP LOCKED, so
+any number of them can share the queue. Stop with Ctrl+C or SIGTERM; jobs
+already claimed are finished first.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from config import env
+from service.jobs import JobWorker
+
+
+async def run(concurrency: int, poll_interval: float) -> None:
+    worker = JobWorker(concurrency, poll_interval)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    print(f"[WORKER] draining classification jobs, concurrency={worker.concurrency}")
+    await worker.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=env.JOB_WORKER_CONCURRENCY)
+    parser.add_argument(
+        "--poll-interval", type=float, default=env.JOB_POLL_INTERVAL_SECONDS
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.concurrency, args.poll_interval))
+    print("[DONE] worker stopped")
+
+
+if __name__ == "__main__":
+    main()
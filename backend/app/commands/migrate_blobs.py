@@ -0,0 +1,123 @@
+"""Move inline ``pictures.image`` bytes into the blob store.
+
+Run from backend/app after ``alembic upgrade head``:
+
+    python -m commands.migrate_blobs [--batch-size 200] [--keep-inline]
+    python -m commands.migrate_blobs --reverse   # before downgrading
+
+Rows are read in keyset-paginated batches of ``--batch-size``, so at most
+one batch of images is held in memory at a time. The command is idempotent
+and can be interrupted and re-run.
+
+Legacy rows hold the upload exactly as received, so their content_hash,
+storage sizes and stored_format are filled in from the same bytes, which
+makes them visible to duplicate detection and the storage statistics.
+"""
+
+import argparse
+
+from sqlalchemy import select, update
+
+from database.core import SessionLocal
+from entities.table import Picture
+from service.image import guess_mime_type
+from storage import content_key, get_blob_store
+
+
+def migrate(batch_size: int, keep_inline: bool = False) -> int:
+    """Write inline images to the blob store and point rows at them."""
+    store = get_blob_store()
+    moved = 0
+    last_id = None
+    with SessionLocal() as db:
+        while True:
+            stmt = (
+                select(Picture.id, Picture.image, Picture.content_hash)
+                .where(Picture.image_key.is_(None), Picture.image.is_not(None))
+                .order_by(Picture.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                stmt = stmt.where(Picture.id > last_id)
+            rows = db.execute(stmt).all()
+            if not rows:
+                break
+
+            values = []
+            for row in rows:
+                mime_type = guess_mime_type(row.image)
+                value = {
+                    "id": row.id,
+                    "image_key": store.put(row.image),
+                    "content_hash": row.content_hash or content_key(row.image),
+                    "stored_format": (
+                        mime_type.split("/")[1] if mime_type.startswith("image/") else None
+                    ),
+                    "original_size": len(row.image),
+                    "stored_size": len(row.image),
+                }
+                if not keep_inline:
+                    value["image"] = None
+                values.append(value)
+            db.execute(update(Picture), values)
+            db.commit()
+
+            moved += len(rows)
+            last_id = rows[-1].id
+            print(f"[MIGRATE] {moved} pictures moved to blob store")
+    return moved
+
+
+def reverse(batch_size: int) -> int:
+    """Copy blob-store images back inline (needed before a schema downgrade)."""
+    store = get_blob_store()
+    restored = 0
+    last_id = None
+    with SessionLocal() as db:
+        while True:
+            stmt = (
+                select(Picture.id, Picture.image_key)
+                .where(Picture.image_key.is_not(None), Picture.image.is_(None))
+                .order_by(Picture.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                stmt = stmt.where(Picture.id > last_id)
+            rows = db.execute(stmt).all()
+            if not rows:
+                break
+
+            db.execute(
+                update(Picture),
+                [{"id": row.id, "image": store.get(row.image_key)} for row in rows],
+            )
+            db.commit()
+
+            restored += len(rows)
+            last_id = rows[-1].id
+            print(f"[REVERSE] {restored} pictures inlined")
+    return restored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move picture bytes to the blob store")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument(
+        "--keep-inline",
+        action="store_true",
+        help="Leave pictures.image populated after copying it to the blob store",
+    )
+    parser.add_argument(
+        "--reverse", action="store_true", help="Copy blobs back into pictures.image"
+    )
+    args = parser.parse_args()
+
+    if args.reverse:
+        count = reverse(args.batch_size)
+    else:
+        count = migrate(args.batch_size, keep_inline=args.keep_inline)
+    print(f"[DONE] {count} pictures processed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""Re-run the current model over stored pictures and score it against feedback.
+
+Run from backend/app after shipping a new model to AI/model:
+
+    python -m commands.reclassify --workers 2 --report reclassify.json
+    python -m commands.reclassify --apply --max-rate 20   # also rewrite labels
+    python -m commands.reclassify --embeddings   # also store image embeddings
+
+Pictures are read in keyset-paginated chunks of ``--batch-size`` and
+classified by a pool of ``--workers`` processes, each loading the model
+once (INFERENCE_BACKEND selects it) and running one batched forward pass
+per chunk. Workers read images from the blob store themselves, so only
+keys cross the process boundary.
+
+The report compares the new predictions with the stored labels
+(agreement) and, for pictures with feedback, with the newest
+``feedbacks.correct_label`` (accuracy of the stored vs. the new label).
+With ``--apply``, changed labels and confidences are written back with one
+bulk UPDATE per chunk, and once the run completes the ``daily_stats``
+correct/incorrect feedback counts are recomputed against the new labels
+(as ``commands.backfill_daily_stats`` does). With ``--embeddings``, the embeddings captured
+during the same forward pass replace the chunk's picture_embeddings rows
+(backfilling pictures stored before embeddings existed); run
+``python -m commands.embedding_index --rebuild`` afterwards.
+
+Progress and the running report are checkpointed after every chunk, so an
+interrupted run continues where it stopped (``--restart`` starts over). To
+share a host with the API, keep ``--workers`` and ``--threads-per-worker``
+small, workers run at ``--nice`` priority, and ``--max-rate`` caps the
+images per second.
+
+The API caches live in each API process, so this command cannot clear
+them: the dashboard catches up within DASHBOARD_CACHE_TTL_SECONDS, and
+duplicate uploads keep getting the old classification until
+CLASSIFICATION_CACHE_TTL_SECONDS has passed. Restart the API after an
+``--apply`` run to drop them at once.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, delete, select, update
+
+from config import env
+from database.core import SessionLocal
+from entities.table import Feedback, Picture, PictureEmbedding
+from service.daily_stats import rebuild_daily_stats
+from service.embeddings import embedding_row
+
+# (image_key, inline bytes) for one picture; exactly one of them is set
+ImageRef = Tuple[Optional[str], Optional[bytes]]
+# (label, score) of the top prediction, or None if the image could not be read
+Prediction = Optional[Tuple[str, float]]
+
+# Per-process model, loaded by _init_worker
+_pipe: Any = None
+# Embedding capture on _pipe (see AI/embeddings.py), with --embeddings
+_embeddings: Any = None
+
+
+def _init_worker(niceness: int, threads: int, embeddings: bool = False) -> None:
+    global _pipe, _embeddings
+    if niceness:
+        os.nice(niceness)
+    from AI.pipeline import load_pipe
+
+    if threads and env.INFERENCE_BACKEND == "pytorch":
+        import torch
+
+        torch.set_num_threads(threads)
+    _pipe = load_pipe(env.INFERENCE_BACKEND, quantized=env.ONNX_QUANTIZED)
+    if embeddings:
+        from AI.embeddings import embedding_source
+
+        _embeddings = embedding_source(_pipe)
+        if _embeddings is None:
+            raise RuntimeError(
+                f"The {env.INFERENCE_BACKEND} backend does not expose embeddings"
+            )
+
+
+def _classify_chunk(
+    refs: List[ImageRef],
+) -> Tuple[List[Prediction], List[Optional[Any]]]:
+    """Decode and classify one chunk in a worker process with a single forward pass.
+
+    Returns the predictions and, with --embeddings, the embeddings (None
+    for images that could not be read, or without --embeddings).
+    """
+    from service.image import decode_for_inference
+    from storage import get_blob_store
+
+    store = get_blob_store()
+    images = []
+    positions = []
+    for i, (image_key, inline) in enumerate(refs):
+        try:
+            content = store.get(image_key) if image_key is not None else inline
+            if content is None:
+                continue
+            images.append(
+                decode_for_inference(
+                    content, env.INFERENCE_INPUT_SIZE, env.MAX_IMAGE_PIXELS
+                )
+            )
+            positions.append(i)
+        except Exception:
+            continue  # Missing blob or undecodable image; counted as failed
+
+    predictions: List[Prediction] = [None] * len(refs)
+    vectors: List[Optional[Any]] = [None] * len(refs)
+    if images:
+        for i, result in zip(positions, _pipe(images, batch_size=len(images))):
+            predictions[i] = (result[0]["label"], float(result[0]["score"]))
+        if _embeddings is not None:
+            for i, vector in zip(positions, _embeddings.take_embeddings()):
+                vectors[i] = vector
+    return predictions, vectors
+
+
+@dataclass
+class ReclassifyReport:
+    """Running totals; saved in the checkpoint so a resumed run reports on everything."""
+
+    processed: int = 0
+    failed: int = 0
+    unchanged: int = 0
+    changed: int = 0
+    updated: int = 0
+    with_feedback: int = 0
+    stored_correct: int = 0
+    new_correct: int = 0
+    fixed: int = 0  # stored label wrong, new label right
+    regressed: int = 0  # stored label right, new label wrong
+    changes: Dict[str, int] = field(default_factory=dict)  # "old -> new": count
+    per_label: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def add(self, stored: str, predicted: Prediction, correct: Optional[str]) -> None:
+        self.processed += 1
+        if predicted is None:
+            self.failed += 1
+            return
+        label = predicted[0]
+        if label == stored:
+            self.unchanged += 1
+        else:
+            self.changed += 1
+            key = f"{stored} -> {label}"
+            self.changes[key] = self.changes.get(key, 0) + 1
+        if correct is None:
+            return
+        self.with_feedback += 1
+        self.stored_correct += stored == correct
+        self.new_correct += label == correct
+        self.fixed += stored != correct and label == correct
+        self.regressed += stored == correct and label != correct
+        counts = self.per_label.setdefault(correct, {"feedback": 0, "new_correct": 0})
+        counts["feedback"] += 1
+        counts["new_correct"] += label == correct
+
+    def summary(self) -> Dict[str, Any]:
+        classified = self.processed - self.failed
+        return {
+            **asdict(self),
+            "changes": dict(Counter(self.changes).most_common()),
+            "agreement": self.unchanged / classified if classified else None,
+            "stored_accuracy": (
+                self.stored_correct / self.with_feedback if self.with_feedback else None
+            ),
+            "new_accuracy": (
+                self.new_correct / self.with_feedback if self.with_feedback else None
+            ),
+            "per_label_accuracy": {
+                label: counts["new_correct"] / counts["feedback"]
+                for label, counts in sorted(self.per_label.items())
+            },
+        }
+
+
+def model_fingerprint() -> str:
+    """Identify the model files, so a checkpoint is never resumed with another model."""
+    from AI.pipeline import MODEL_DIR
+
+    digest = hashlib.sha256(env.INFERENCE_BACKEND.encode())
+    if MODEL_DIR.exists():
+        for path in sorted(p for p in MODEL_DIR.rglob("*") if p.is_file()):
+            stat = path.stat()
+            rel = path.relative_to(MODEL_DIR).as_posix()
+            digest.update(f"{rel}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def load_checkpoint(
+    path: Path, fingerprint: str, apply: bool, embeddings: bool = False
+) -> Tuple[Optional[uuid.UUID], ReclassifyReport]:
+    if not path.exists():
+        return None, ReclassifyReport()
+    state = json.loads(path.read_text())
+    if (
+        state["model"] != fingerprint
+        or state["apply"] != apply
+        or state.get("embeddings", False) != embeddings
+    ):
+        raise SystemExit(
+            f"{path} was written for another model or --apply/--embeddings "
+            "setting; pass --restart to start over"
+        )
+    print(f"[RESUME] from picture {state['last_id']}")
+    return uuid.UUID(state["last_id"]), ReclassifyReport(**state["report"])
+
+
+def save_checkpoint(
+    path: Path,
+    fingerprint: str,
+    apply: bool,
+    last_id: uuid.UUID,
+    report: ReclassifyReport,
+    embeddings: bool = False,
+) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(
+        json.dumps(
+            {
+                "model": fingerprint,
+                "apply": apply,
+                "embeddings": embeddings,
+                "last_id": str(last_id),
+                "report": asdict(report),
+            }
+        )
+    )
+    os.replace(tmp, path)
+
+
+def read_chunks(batch_size: int, after: Optional[uuid.UUID]):
+    """Yield chunks of (id, label, confidence, image ref, newest feedback label) by id."""
+    last_id = after
+    with SessionLocal() as db:
+        while True:
+            stmt = (
+                select(
+                    Picture.id,
+                    Picture.label,
+                    Picture.confidence,
+                    Picture.image_key,
+                    # Inline bytes are only transferred for rows not yet migrated
+                    case((Picture.image_key.is_(None), Picture.image)),
+                )
+                .order_by(Picture.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                stmt = stmt.where(Picture.id > last_id)
+            rows = db.execute(stmt).all()
+            if not rows:
+                return
+
+            feedback: Dict[uuid.UUID, str] = {}
+            for picture_id, correct_label in db.execute(
+                select(Feedback.picture_id, Feedback.correct_label)
+                .where(Feedback.picture_id.in_([row[0] for row in rows]))
+                .order_by(Feedback.id)
+            ):
+                feedback[picture_id] = correct_label  # the newest one wins
+            db.rollback()  # Do not hold a snapshot open while the workers run
+
+            yield [
+                (
+                    picture_id,
+                    label,
+                    float(confidence),
+                    (image_key, inline),
+                    feedback.get(picture_id),
+                )
+                for picture_id, label, confidence, image_key, inline in rows
+            ]
+            last_id = rows[-1][0]
+
+
+def reclassify(args: argparse.Namespace) -> ReclassifyReport:
+    """Classify every stored picture, update the report and optionally the rows."""
+    checkpoint = Path(args.checkpoint)
+    fingerprint = model_fingerprint()
+    if args.restart and checkpoint.exists():
+        checkpoint.unlink()
+    after, report = load_checkpoint(
+        checkpoint, fingerprint, args.apply, args.embeddings
+    )
+
+    pool = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(args.nice, args.threads_per_worker, args.embeddings),
+    )
+    # Chunks are handled in submission order, so the checkpoint always marks
+    # a contiguous prefix; keeping two per worker in flight hides the reads
+    in_flight: Deque[Tuple[list, Future]] = deque()
+    started = time.monotonic()
+    done_this_run = 0
+
+    def finish_oldest() -> None:
+        nonlocal done_this_run
+        chunk, future = in_flight.popleft()
+        predictions, vectors = future.result()
+        values = []
+        for (picture_id, stored, confidence, _, correct), predicted in zip(
+            chunk, predictions
+        ):
+            report.add(stored, predicted, correct)
+            if args.apply and predicted is not None:
+                label, score = predicted[0], round(predicted[1], 2)
+                if (label, score) != (stored, confidence):
+                    values.append(
+                        {"id": picture_id, "label": label, "confidence": score}
+                    )
+        embedded = [
+            embedding_row(row[0], vector)
+            for row, vector in zip(chunk, vectors)
+            if vector is not None
+        ]
+        if values or embedded:
+            with SessionLocal() as db:
+                if values:
+                    db.execute(update(Picture), values)
+                if embedded:
+                    db.execute(
+                        delete(PictureEmbedding).where(
+                            PictureEmbedding.picture_id.in_(
+                                [row.picture_id for row in embedded]
+                            )
+                        )
+                    )
+                    db.add_all(embedded)
+                db.commit()
+            report.updated += len(values)
+        save_checkpoint(
+            checkpoint,
+            fingerprint,
+            args.apply,
+            chunk[-1][0],
+            report,
+            args.embeddings,
+        )
+
+        done_this_run += len(chunk)
+        elapsed = time.monotonic() - started
+        print(
+            f"[RECLASSIFY] {report.processed} pictures "
+            f"({done_this_run / elapsed:.1f}/s this run), {report.changed} changed"
+        )
+        if args.max_rate:
+            # Stay under --max-rate images per second on average
+            time.sleep(max(0.0, done_this_run / args.max_rate - elapsed))
+
+    try:
+        for chunk in read_chunks(args.batch_size, after):
+            if len(in_flight) >= 2 * args.workers:
+                finish_oldest()
+            in_flight.append(
+                (chunk, pool.submit(_classify_chunk, [row[3] for row in chunk]))
+            )
+        while in_flight:
+            finish_oldest()
+    finally:
+        pool.shutdown(cancel_futures=True)
+    # Complete: the next run starts from the beginning again
+    checkpoint.unlink(missing_ok=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--batch-size", type=int, default=32, help="Pictures per chunk and forward pass"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Inference processes")
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=1,
+        help="torch threads per worker (pytorch backend; 0 leaves the default)",
+    )
+    parser.add_argument(
+        "--nice", type=int, default=10, help="Niceness added to workers"
+    )
+    parser.add_argument(
+        "--max-rate", type=float, default=0.0, help="Images per second, 0 for unlimited"
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="Write the new labels and confidences back"
+    )
+    parser.add_argument(
+        "--embeddings",
+        action="store_true",
+        help="Store the image embeddings (replacing existing ones)",
+    )
+    parser.add_argument("--checkpoint", default="reclassify.checkpoint.json")
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore an existing checkpoint"
+    )
+    parser.add_argument(
+        "--report", help="Also write the final report to this JSON file"
+    )
+    args = parser.parse_args()
+
+    summary = reclassify(args).summary()
+    output = json.dumps(summary, indent=2)
+    print(output)
+    if args.report:
+        Path(args.report).write_text(output)
+    if args.apply and summary["updated"]:
+        # Feedback counts as correct or not against the label it is stored with
+        days = rebuild_daily_stats()
+        print(f"[STATS] daily_stats rebuilt for {days} days")
+        print(
+            "[NOTE] Running API processes serve cached classifications for up to "
+            f"{env.CLASSIFICATION_CACHE_TTL_SECONDS:.0f}s; restart them to drop the cache"
+        )
+    print(f"[DONE] {summary['processed']} pictures processed")
+
+
+if __name__ == "__main__":
+    main()
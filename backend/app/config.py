@@ -6,6 +6,94 @@ load_dotenv()
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Defaults to DATABASE_URL with the postgresql+asyncpg driver
+    ASYNC_DATABASE_URL: str | None = None
+
+    # Connection pool (applies to both the sync and the async engine)
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+
+    # Classifier backend: "pytorch", "onnx" (see AI/onnx_backend.py) or "stub" (benchmarks)
+    INFERENCE_BACKEND: str = "pytorch"
+    ONNX_QUANTIZED: bool = False
+    ONNX_INTRA_OP_THREADS: int = 0
+
+    # Decode stage: model input edge and decompression-bomb guard
+    INFERENCE_INPUT_SIZE: int = 224
+    MAX_IMAGE_PIXELS: int = 100_000_000
+
+    # Storage policy: keep JPEG/WebP originals up to this size, transcode the rest
+    STORAGE_MAX_PASSTHROUGH_BYTES: int = 8 * 1024 * 1024
+    STORAGE_TRANSCODE_FORMAT: str = "jpeg"  # "jpeg" or "webp"
+    STORAGE_TRANSCODE_QUALITY: int = 95
+
+    # Micro-batching of classification requests (see AI/batching.py)
+    INFERENCE_MAX_BATCH_SIZE: int = 16
+    INFERENCE_MAX_WAIT_MS: float = 10.0
+    INFERENCE_MAX_QUEUE: int = 256
+
+    # Executor for CPU-bound decode/encode work ("thread" or "process")
+    CPU_EXECUTOR_KIND: str = "thread"
+    CPU_EXECUTOR_WORKERS: int = 0  # 0 means os.cpu_count()
+    CPU_EXECUTOR_MAX_QUEUE: int = 64
+
+    # Content-hash classification cache (see service/classification_cache.py)
+    CLASSIFICATION_CACHE_SIZE: int = 1024
+    CLASSIFICATION_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Blob store for image bytes (see storage/)
+    BLOB_STORE_BACKEND: str = "local"
+    BLOB_STORE_PATH: str = "data/blobs"
+
+    # Downscaled image renditions served via /picture/{id}/image?size=...
+    IMAGE_THUMB_SIZE: int = 160
+    IMAGE_MEDIUM_SIZE: int = 640
+    IMAGE_VARIANT_QUALITY: int = 85
+    IMAGE_VARIANTS_EAGER: bool = False  # generate at upload instead of first request
+
+    # In-process cache of /dashboard responses, invalidated on writes
+    DASHBOARD_CACHE_TTL_SECONDS: float = 5.0
+
+    # POST /pictures/batch: files per request (after zip expansion) and total bytes
+    BATCH_UPLOAD_MAX_FILES: int = 64
+    BATCH_UPLOAD_MAX_BYTES: int = 100 * 1024 * 1024
+
+    # POST /feedback/batch: feedback items per request
+    FEEDBACK_BATCH_MAX_ITEMS: int = 1000
+
+    # Async classification jobs (POST /picture?mode=async)
+    JOB_WORKER_IN_PROCESS: bool = True  # drain the queue inside the API process
+    # Jobs claimed and processed at once per worker; the in-process worker is
+    # capped to a third of the connection pool it shares with API requests
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_TIMEOUT_SECONDS: float = 300.0  # running jobs older than this are reclaimed
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 2.0  # doubled after each failed attempt
+    JOB_CALLBACK_TIMEOUT_SECONDS: float = 10.0
+    # Comma-separated callback hosts; empty accepts any host with only public addresses
+    JOB_CALLBACK_ALLOWED_HOSTS: str = ""
+
+    # Embedding index for similar-picture lookup (see AI/vector_index.py)
+    EMBEDDINGS_ENABLED: bool = True  # capture embeddings during inference
+    EMBEDDING_INDEX_PATH: str = "data/embedding_index"
+    EMBEDDING_IVF_MIN_VECTORS: int = 50_000  # below this, search is brute force
+    EMBEDDING_IVF_NPROBE: int = 16  # IVF lists scanned per query
+    EMBEDDING_SYNC_INTERVAL_SECONDS: float = 1.0  # poll for other processes' adds
+    # Label new uploads like a near-identical stored picture (cosine similarity)
+    EMBEDDING_NEAR_DUPLICATE_REUSE: bool = False
+    EMBEDDING_NEAR_DUPLICATE_THRESHOLD: float = 0.97
+
+    # Load the model and run a dummy forward pass before accepting traffic;
+    # when false the model loads in the background after startup
+    MODEL_WARMUP: bool = True
+
+    # Prometheus /metrics, request latency middleware and upload stage timers
+    METRICS_ENABLED: bool = True
 
     class Config:
         env_file = ".env"
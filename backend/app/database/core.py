@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from config import env
@@ -6,7 +8,39 @@ from typing import Annotated
 from fastapi import Depends
 
 
-engine = create_engine(env.DATABASE_URL, echo=True)
+def _pool_options() -> dict:
+    return {
+        "echo": env.DB_ECHO,
+        "pool_size": env.DB_POOL_SIZE,
+        "max_overflow": env.DB_MAX_OVERFLOW,
+        "pool_timeout": env.DB_POOL_TIMEOUT,
+        "pool_pre_ping": env.DB_POOL_PRE_PING,
+        "pool_recycle": env.DB_POOL_RECYCLE,
+    }
+
+
+# Async driver to use for each sync DATABASE_URL backend (aiosqlite comes with
+# the "bench" extra: uv sync --extra bench)
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """Derive the async driver URL (asyncpg, or aiosqlite for local runs) from DATABASE_URL."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is not None:
+        parsed = parsed.set(drivername=driver)
+    return parsed.render_as_string(hide_password=False)
+
+
+# Sync engine: Alembic, maintenance commands and scripts
+engine = create_engine(env.DATABASE_URL, **_pool_options())
+
+# Async engine: API request handlers
+async_engine = create_async_engine(
+    env.ASYNC_DATABASE_URL or async_database_url(env.DATABASE_URL),
+    **_pool_options(),
+)
 
 
 # Setup pgcrypto extension for UUID support (SQLAlchemy 2.0+ compatible)
@@ -19,6 +53,9 @@ def setup_database():
 
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 Base = declarative_base()
 
 
@@ -30,4 +67,10 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 DbSession = Annotated[Session, Depends(get_db)]
+AsyncDbSession = Annotated[AsyncSession, Depends(get_async_db)]
@@ -1,3 +1,3 @@
-from .table import Picture, Feedback
+from .table import Picture, Feedback, DailyStats, ClassificationJob, PictureEmbedding
 
-__all__ = ["Picture", "Feedback"]
+__all__ = ["Picture", "Feedback", "DailyStats", "ClassificationJob", "PictureEmbedding"]
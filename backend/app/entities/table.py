@@ -5,13 +5,16 @@ from sqlalchemy import (
     DECIMAL,
     Boolean,
     Column,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     LargeBinary,
 )
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 
@@ -27,7 +30,12 @@ class Picture(Base):
         label (str): AI-generated classification label for the image content, indexed
         confidence (Decimal): Classification confidence score (0.00 to 99.99)
         feedback_given (bool): Flag indicating if human feedback has been provided, defaults to False
-        image (bytes): Binary data of the actual image file
+        image (bytes): Legacy inline image bytes; deferred so queries never load it implicitly
+        image_key (str): Key of the image bytes in the blob store (see storage/)
+        stored_format (str): Format of the stored bytes ("jpeg" or "webp")
+        original_size (int): Size in bytes of the upload as received
+        stored_size (int): Size in bytes of what was stored (original_size - stored_size is the saving)
+        content_hash (str): SHA-256 hex digest of the uploaded bytes, indexed for duplicate lookups
         created_at (datetime): Timestamp when the record was created, auto-generated
     """
 
@@ -38,9 +46,40 @@ class Picture(Base):
     label = Column(String, index=True, nullable=False)
     confidence = Column(DECIMAL(4, 2), nullable=False)
     feedback_given = Column(Boolean, default=False)
-    image = Column(LargeBinary, nullable=False)
+    image = deferred(Column(LargeBinary, nullable=True))
+    image_key = Column(String(64), index=True, nullable=True)
+    stored_format = Column(String(10), nullable=True)
+    original_size = Column(Integer, nullable=True)
+    stored_size = Column(Integer, nullable=True)
+    content_hash = Column(String(64), index=True, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
+    # Keyset pagination of GET /pictures walks (created_at, id); the leading
+    # label / feedback_given columns serve the common filters, and INCLUDE
+    # covers the listed metadata so Postgres can answer with index-only scans
+    __table_args__ = (
+        Index(
+            "ix_pictures_created_at_id",
+            "created_at",
+            "id",
+            postgresql_include=["label", "confidence", "feedback_given", "filename"],
+        ),
+        Index(
+            "ix_pictures_label_created_at_id",
+            "label",
+            "created_at",
+            "id",
+            postgresql_include=["confidence", "feedback_given", "filename"],
+        ),
+        Index(
+            "ix_pictures_feedback_given_created_at_id",
+            "feedback_given",
+            "created_at",
+            "id",
+            postgresql_include=["label", "confidence", "filename"],
+        ),
+    )
+
 
 class Feedback(Base):
     """
@@ -70,3 +109,101 @@ class Feedback(Base):
     created_at = Column(DateTime, server_default=func.now())
     message = Column(String, nullable=False)
     correct_label = Column(String, nullable=False)
+
+
+class DailyStats(Base):
+    """
+    Pre-aggregated per-day counters backing the dashboard.
+    One row per calendar date, incremented in the same transaction as the
+    picture or feedback insert it accounts for, so the dashboard reads
+    O(days) rows instead of scanning pictures and feedbacks.
+
+    Attributes:
+        date (Date): Primary key, the day the counted rows were created
+        picture_count (int): Pictures uploaded that day
+        feedback_count (int): Feedback entries submitted that day
+        correct_count (int): Feedback that day whose correct_label matched the picture's label
+        incorrect_count (int): Feedback that day whose correct_label differed from the picture's label
+    """
+
+    __tablename__ = "daily_stats"
+
+    date = Column(Date, primary_key=True)
+    picture_count = Column(Integer, nullable=False, default=0, server_default="0")
+    feedback_count = Column(Integer, nullable=False, default=0, server_default="0")
+    correct_count = Column(Integer, nullable=False, default=0, server_default="0")
+    incorrect_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class ClassificationJob(Base):
+    """
+    Queue of uploads waiting to be classified asynchronously.
+    POST /picture?mode=async stores the raw upload in the blob store and
+    inserts a row here; workers claim rows with SELECT ... FOR UPDATE SKIP
+    LOCKED, so any number of them can drain the queue without a broker.
+
+    Attributes:
+        id (UUID): Primary key, returned to the client as the job id
+        status (str): "queued", "running", "done" or "failed"
+        filename (str): Original filename of the upload
+        upload_key (str): Blob store key of the raw uploaded bytes
+        content_hash (str): SHA-256 hex digest of the uploaded bytes
+        callback_url (str): Optional URL POSTed the job status once it finishes
+        attempts (int): Number of attempts a worker has made at the job
+        error (str): Reason the job failed, if it did
+        error_status (int): HTTP status a synchronous upload would have returned for the error
+        picture_id (UUID): Foreign key to the resulting picture once done
+        created_at (datetime): Timestamp when the job was enqueued
+        started_at (datetime): UTC time the current attempt was claimed
+        next_attempt_at (datetime): UTC time before which a requeued job is not claimed
+        finished_at (datetime): UTC time the job reached done or failed
+    """
+
+    __tablename__ = "classification_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String(16), nullable=False, default="queued", server_default="queued")
+    filename = Column(String, nullable=False)
+    upload_key = Column(String(64), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    callback_url = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(String, nullable=True)
+    error_status = Column(Integer, nullable=True)
+    picture_id = Column(UUID(as_uuid=True), ForeignKey("pictures.id"), nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Workers claim the oldest queued (or stale running) jobs first
+    __table_args__ = (
+        Index("ix_classification_jobs_status_created_at", "status", "created_at"),
+    )
+
+
+class PictureEmbedding(Base):
+    """
+    Image embedding of a picture, captured from the classifier's forward pass.
+    The in-process vector index (AI/vector_index.py) is built from this table
+    and follows it incrementally: rows are read in id order, so the highest id
+    an index has seen is its watermark. Rows created shortly before the
+    watermark row are re-checked by created_at, for late commits.
+
+    Attributes:
+        id (int): Primary key, insertion sequence used as the index watermark
+        picture_id (UUID): Foreign key to pictures.id, one embedding per picture
+        dim (int): Number of dimensions of the vector
+        vector (bytes): L2-normalised float16 vector, ``dim * 2`` bytes
+        created_at (datetime): Timestamp when the embedding was stored
+    """
+
+    __tablename__ = "picture_embeddings"
+
+    id = Column(Integer, primary_key=True)
+    picture_id = Column(
+        UUID(as_uuid=True), ForeignKey("pictures.id"), nullable=False, unique=True
+    )
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config import env
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a bounded queue rejects new work (mapped to HTTP 503)."""
+
+
+class BoundedExecutor:
+    """Thread or process pool with a hard cap on queued plus running tasks.
+
+    CPU-bound work (image decode/encode) is submitted here so it never runs on
+    the asyncio event loop. Once ``max_workers + max_queue`` tasks are in
+    flight, ``submit`` raises QueueFullError instead of queueing unboundedly.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 0, max_queue: int = 64):
+        workers = max_workers or os.cpu_count() or 1
+        if kind == "process":
+            self._executor: Executor = ProcessPoolExecutor(max_workers=workers)
+        elif kind == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="cpu-worker"
+            )
+        else:
+            raise ValueError(f"Unknown executor kind: {kind!r}")
+        self.kind = kind
+        self.max_workers = workers
+        self.capacity = workers + max(max_queue, 0)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise QueueFullError("CPU executor queue is full")
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` in the pool and await its result without blocking the loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "rejected_total": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+
+# Singleton holder for the CPU executor
+_executor: Optional[BoundedExecutor] = None
+
+
+def get_executor() -> BoundedExecutor:
+    """Return the singleton executor configured from settings."""
+    global _executor
+    if _executor is None:
+        _executor = BoundedExecutor(
+            kind=env.CPU_EXECUTOR_KIND,
+            max_workers=env.CPU_EXECUTOR_WORKERS,
+            max_queue=env.CPU_EXECUTOR_MAX_QUEUE,
+        )
+    return _executor
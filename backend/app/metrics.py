@@ -0,0 +1,286 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from starlette.requests import Request
+from starlette.responses import Response
+
+from config import env
+
+# Upload stages timed by ``stage_timer``
+UPLOAD_STAGES = (
+    "read",
+    "cache_lookup",
+    "decode",
+    "inference",
+    "near_duplicate_lookup",
+    "encode",
+    "blob_write",
+    "db_commit",
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+UPLOAD_STAGE_LATENCY = Histogram(
+    "upload_stage_duration_seconds",
+    "Time spent in each stage of an upload",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+INFERENCE_BATCH_LATENCY = Histogram(
+    "inference_batch_duration_seconds",
+    "Duration of one batched forward pass",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+INFERENCE_BATCH_SIZE = Histogram(
+    "inference_batch_size",
+    "Images per batched forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total", "Connections checked out of the pool", ["engine"]
+)
+DB_POOL_HOLD_TIME = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "How long a connection stays checked out",
+    ["engine"],
+)
+DB_POOL_WAIT_TIME = Histogram(
+    "db_pool_wait_duration_seconds",
+    "Time to get a pooled connection, including opening a new one and the pre-ping",
+    ["engine"],
+    # Up to the default DB_POOL_TIMEOUT, where checkouts give up
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 30.0),
+)
+
+# Registry served at /metrics (see install)
+_registry: CollectorRegistry = REGISTRY
+
+# Label children resolved once, so the hot path is a dict lookup + observe
+_stage_histograms = {stage: UPLOAD_STAGE_LATENCY.labels(stage) for stage in UPLOAD_STAGES}
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Time the enclosed block as one upload stage (no-op when metrics are off)."""
+    if not env.METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage_histograms[stage].observe(time.perf_counter() - start)
+
+
+def observe_inference_batch(size: int, seconds: float) -> None:
+    if env.METRICS_ENABLED:
+        INFERENCE_BATCH_SIZE.observe(size)
+        INFERENCE_BATCH_LATENCY.observe(seconds)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template.
+
+    The route template (e.g. /api/picture/{picture_id}) is read from the scope
+    after routing, so path parameters never become label values.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status["code"]),
+            ).observe(time.perf_counter() - start)
+
+
+class RuntimeCollector:
+    """Read queue, cache and pool state from the existing stats() helpers at scrape time.
+
+    Nothing is recorded on the request path; the values are only gathered
+    when /metrics is scraped.
+    """
+
+    def __init__(self, engines: Dict[str, Any]):
+        self.engines = engines
+
+    def describe(self):
+        # Skip the registration-time collect() so nothing is instantiated early
+        return []
+
+    def collect(self):
+        from AI.pipeline import get_batcher
+        from executor import get_executor
+        from service.classification_cache import get_classification_cache
+        from service.dashboard import get_dashboard_cache
+
+        batcher = get_batcher().stats()
+        yield GaugeMetricFamily(
+            "inference_queue_depth",
+            "Requests waiting for the batching thread",
+            value=batcher["queue_depth"],
+        )
+        yield CounterMetricFamily(
+            "inference_rejected",
+            "Requests rejected because the inference queue was full",
+            value=batcher["rejected_total"],
+        )
+
+        executor = get_executor().stats()
+        yield GaugeMetricFamily(
+            "cpu_executor_in_flight",
+            "Decode/encode tasks queued or running",
+            value=executor["in_flight"],
+        )
+        yield CounterMetricFamily(
+            "cpu_executor_rejected",
+            "Tasks rejected because the CPU executor was full",
+            value=executor["rejected_total"],
+        )
+
+        lookups = CounterMetricFamily(
+            "classification_cache_lookups",
+            "Content-hash cache lookups by result",
+            labels=["result"],
+        )
+        cache = get_classification_cache().stats()
+        for result in ("hits", "db_hits", "misses"):
+            lookups.add_metric([result], cache[result])
+        yield lookups
+
+        dashboard = CounterMetricFamily(
+            "dashboard_cache_lookups",
+            "Dashboard response cache lookups by result",
+            labels=["result"],
+        )
+        dashboard_stats = get_dashboard_cache().stats()
+        for result in ("hits", "misses", "coalesced"):
+            dashboard.add_metric([result], dashboard_stats[result])
+        yield dashboard
+
+        pool_gauges = {
+            name: GaugeMetricFamily(
+                f"db_pool_{name}", description, labels=["engine"]
+            )
+            for name, description in (
+                ("size", "Configured pool size"),
+                ("checked_out", "Connections currently checked out"),
+                ("overflow", "Connections open beyond pool_size"),
+            )
+        }
+        for label, engine in self.engines.items():
+            # Read the pool at scrape time: dispose() (e.g. after fork) replaces it
+            pool = engine.pool
+            for name, method in (
+                ("size", "size"),
+                ("checked_out", "checkedout"),
+                ("overflow", "overflow"),
+            ):
+                if hasattr(pool, method):
+                    pool_gauges[name].add_metric([label], getattr(pool, method)())
+        yield from pool_gauges.values()
+
+
+def _time_connects(engine, wait_time) -> None:
+    # Pools fire no event when a checkout is requested, only once it has a
+    # connection, so time the public Engine.connect that sessions and
+    # commands go through: queueing for a connection (or opening one) plus
+    # the pre-ping. Timeouts are observed too.
+    connect = engine.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            wait_time.observe(time.perf_counter() - started)
+
+    engine.connect = timed_connect
+
+
+def _instrument_pool(label: str, engine) -> None:
+    checkouts = DB_POOL_CHECKOUTS.labels(label)
+    hold_time = DB_POOL_HOLD_TIME.labels(label)
+    wait_time = DB_POOL_WAIT_TIME.labels(label)
+
+    _time_connects(engine, wait_time)
+
+    # Listening on the engine keeps the hooks when its pool is recreated
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts.inc()
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            hold_time.observe(time.perf_counter() - checked_out_at)
+
+
+def install(app) -> None:
+    """Add the latency middleware, pool listeners and the /metrics endpoint.
+
+    Does nothing when METRICS_ENABLED is false. Process metrics (RSS, CPU,
+    open fds) come from prometheus_client's default process collector.
+
+    Under gunicorn (PROMETHEUS_MULTIPROC_DIR set by gunicorn.conf.py) every
+    worker writes its counters and histograms to that directory and a scrape
+    sums them across workers. Process metrics are then unavailable, and the
+    scrape-time queue, cache and pool values describe the worker that
+    answered the scrape.
+    """
+    global _registry
+    if not env.METRICS_ENABLED:
+        return
+    from database.core import async_engine, engine
+
+    engines = {"sync": engine, "async": async_engine.sync_engine}
+    for label, instrumented in engines.items():
+        _instrument_pool(label, instrumented)
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        _registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(_registry)
+    _registry.register(RuntimeCollector(engines))
+
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus text exposition of every registered metric."""
+    return Response(generate_latest(_registry), media_type=CONTENT_TYPE_LATEST)
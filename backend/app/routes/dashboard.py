@@ -1,56 +1,44 @@
-from fastapi import APIRouter
-from database.core import DbSession
-from entities.table import Feedback, Picture
-from sqlalchemy import func, case
+from datetime import date
+from email.utils import format_datetime
+
+from fastapi import APIRouter, Header
+from fastapi.responses import JSONResponse, Response
+from database.core import AsyncDbSession
+from service.dashboard import compute_dashboard, get_dashboard_cache
+from service.response_cache import is_not_modified
 
 dashboard_route = APIRouter()
 
 
 @dashboard_route.get("/dashboard")
-async def get_dashboard(db: DbSession):
+async def get_dashboard(
+    db: AsyncDbSession,
+    start: date | None = None,
+    end: date | None = None,
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+):
     """
     Get dashboard statistics including:
     - Total pictures uploaded
     - Total feedback received
     - Feedback grouped by date with correct/incorrect counts
-    """
-
-    # Get total pictures
-    total_pictures = db.query(func.count(Picture.id)).scalar()
 
-    # Get total feedback
-    total_feedback = db.query(func.count(Feedback.id)).scalar()
-
-    # Get feedback by date with correct/incorrect counts
-    # A feedback is "correct" if the correct_label matches the picture's label
-    feedback_by_date = (
-        db.query(
-            func.date(Feedback.created_at).label("date"),
-            func.sum(case((Feedback.correct_label == Picture.label, 1), else_=0)).label(
-                "correct"
-            ),
-            func.sum(case((Feedback.correct_label != Picture.label, 1), else_=0)).label(
-                "incorrect"
-            ),
-        )
-        .join(Picture, Feedback.picture_id == Picture.id)
-        .group_by(func.date(Feedback.created_at))
-        .order_by(func.date(Feedback.created_at))
-        .all()
+    Reads the pre-aggregated daily_stats rollup (one row per day). Optional
+    start/end dates (inclusive) restrict both the totals and the chart.
+    Responses are cached briefly in-process and carry ETag/Last-Modified,
+    so polling clients get 304 Not Modified while nothing has changed.
+    """
+    entry = await get_dashboard_cache().get_or_compute(
+        (start, end), lambda: compute_dashboard(db, start, end)
     )
 
-    # Format the data for the frontend
-    chart_data = [
-        {
-            "date": str(row.date),
-            "correct": int(row.correct) if row.correct else 0,
-            "incorrect": int(row.incorrect) if row.incorrect else 0,
-        }
-        for row in feedback_by_date
-    ]
-
-    return {
-        "total_pictures": total_pictures or 0,
-        "total_feedback": total_feedback or 0,
-        "feedback_by_date": chart_data,
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": format_datetime(entry.last_modified, usegmt=True),
+        # Let browsers keep the body but revalidate on every poll
+        "Cache-Control": "no-cache",
     }
+    if is_not_modified(entry, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=entry.value, headers=headers)
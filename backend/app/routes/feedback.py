@@ -1,63 +1,45 @@
 from fastapi import APIRouter, HTTPException
-from schemas.feedback import FeedbackCreate, FeedbackResponse
-from database.core import DbSession
-from service.feedback import save_feedback
-from entities.table import Picture
+from config import env
+from schemas.feedback import (
+    FeedbackBatchCreate,
+    FeedbackCreate,
+    FeedbackResponse,
+)
+from database.core import AsyncDbSession
+from entities.table import Feedback
+from service.feedback import FeedbackItem, save_feedback, save_feedbacks
 import uuid
 
 
 feedback_route = APIRouter(tags=["Feedback"])
 
 
-@feedback_route.post(
-    "/feedback/{picture_id}",
-    response_model=FeedbackResponse,
-    summary="Submit user feedback for a picture classification",
-)
-async def submit_feedback(
-    picture_id: str,
-    feedback: FeedbackCreate,
-    db: DbSession,
-):
-    """
-    Submit feedback for a picture classification.
+def _feedback_item(picture_id: str, feedback: FeedbackCreate) -> FeedbackItem:
+    """Validate a submission and turn it into a FeedbackItem.
 
-    - If is_correct=True, just saves confirmation feedback
-    - If is_correct=False, saves the correct label and message
-    - Updates the picture's feedback_given flag
+    Raises:
+        HTTPException: 400 for a malformed picture ID or a missing correct_label
     """
     try:
-        # Validate UUID
         pic_uuid = uuid.UUID(picture_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid picture ID format")
 
-    # Check if picture exists
-    picture = db.query(Picture).filter(Picture.id == pic_uuid).first()
-    if not picture:
-        raise HTTPException(status_code=404, detail="Picture not found")
-
     # Determine message and correct label based on feedback
     if feedback.is_correct:
-        message = feedback.message or "Classification confirmed as correct"
-        correct_label = str(picture.label)  # Keep the AI's label
-    else:
-        if not feedback.correct_label:
-            raise HTTPException(
-                status_code=400,
-                detail="correct_label is required when is_correct=False",
-            )
-        message = feedback.message
-        correct_label = feedback.correct_label
+        # correct_label=None keeps the AI's label, read while saving
+        return FeedbackItem(
+            pic_uuid, feedback.message or "Classification confirmed as correct"
+        )
+    if not feedback.correct_label:
+        raise HTTPException(
+            status_code=400,
+            detail="correct_label is required when is_correct=False",
+        )
+    return FeedbackItem(pic_uuid, feedback.message, feedback.correct_label)
 
-    # Save feedback using service
-    feedback_record = save_feedback(
-        db=db,
-        picture_id=picture_id,
-        message=message,
-        correct_label=correct_label,
-    )
 
+def _feedback_response(feedback_record: Feedback) -> FeedbackResponse:
     return FeedbackResponse(
         id=feedback_record.id,  # type: ignore
         picture_id=str(feedback_record.picture_id),
@@ -67,3 +49,86 @@ async def submit_feedback(
         if feedback_record.created_at is not None
         else "",  # type: ignore
     )
+
+
+@feedback_route.post(
+    "/feedback/batch",
+    summary="Submit feedback for many pictures at once",
+)
+async def submit_feedback_batch(
+    batch: FeedbackBatchCreate,
+    db: AsyncDbSession,
+):
+    """
+    Submit many feedback items in one request (reviewer tooling).
+
+    Valid items are saved together in a single transaction. An invalid item
+    does not fail the request: results hold, in input order, either the
+    feedback record or an error with the status code a single submission
+    would have returned.
+    """
+    if len(batch.items) > env.FEEDBACK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {env.FEEDBACK_BATCH_MAX_ITEMS} feedback items per batch",
+        )
+
+    results: list[dict | None] = []
+    valid: list[tuple[int, FeedbackItem]] = []
+    for item in batch.items:
+        try:
+            valid.append((len(results), _feedback_item(item.picture_id, item)))
+            results.append(None)
+        except HTTPException as exc:
+            results.append(
+                {
+                    "picture_id": item.picture_id,
+                    "error": exc.detail,
+                    "status_code": exc.status_code,
+                }
+            )
+
+    saved = await save_feedbacks(db, [item for _, item in valid]) if valid else []
+    for (index, item), feedback_record in zip(valid, saved):
+        if feedback_record is None:
+            results[index] = {
+                "picture_id": str(item.picture_id),
+                "error": "Picture not found",
+                "status_code": 404,
+            }
+        else:
+            results[index] = _feedback_response(feedback_record).model_dump()
+
+    return {"results": results}
+
+
+@feedback_route.post(
+    "/feedback/{picture_id}",
+    response_model=FeedbackResponse,
+    summary="Submit user feedback for a picture classification",
+)
+async def submit_feedback(
+    picture_id: str,
+    feedback: FeedbackCreate,
+    db: AsyncDbSession,
+):
+    """
+    Submit feedback for a picture classification.
+
+    - If is_correct=True, just saves confirmation feedback
+    - If is_correct=False, saves the correct label and message
+    - Updates the picture's feedback_given flag
+    """
+    # Save feedback using service; the picture row is checked, flagged and
+    # its label read in one UPDATE, without loading the image
+    item = _feedback_item(picture_id, feedback)
+    feedback_record = await save_feedback(
+        db=db,
+        picture_id=item.picture_id,
+        message=item.message,
+        correct_label=item.correct_label,
+    )
+    if feedback_record is None:
+        raise HTTPException(status_code=404, detail="Picture not found")
+
+    return _feedback_response(feedback_record)
@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from database.core import AsyncDbSession
+from AI.pipeline import is_ready
+
+
+health_route = APIRouter(tags=["Health"])
+
+
+@health_route.get("/ready")
+async def ready(db: AsyncDbSession):
+    """
+    Readiness probe: 200 once this worker has loaded the model and can
+    reach the database, 503 otherwise.
+    """
+    checks = {"model": is_ready(), "database": True}
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception:
+        checks["database"] = False
+
+    status_code = 200 if all(checks.values()) else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"ready": status_code == 200, "checks": checks},
+    )
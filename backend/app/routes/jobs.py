@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException
+from database.core import AsyncDbSession
+from service.jobs import describe_job
+import uuid
+
+
+jobs_route = APIRouter(tags=["Jobs"])
+
+
+@jobs_route.get("/jobs/{job_id}", name="get_job")
+async def get_job(job_id: str, db: AsyncDbSession):
+    """
+    Get the status of an asynchronous classification job.
+
+    status is one of queued, running, done or failed. Once done, picture_id,
+    label and confidence are set; once failed, error holds the status code
+    and detail a synchronous upload would have returned.
+    """
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+
+    job = await describe_job(db, job_uuid)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
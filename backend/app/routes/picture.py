@@ -1,83 +1,542 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
-from database.core import DbSession
+from fastapi import (
+    APIRouter,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import JSONResponse
+from config import env
+from database.core import AsyncDbSession
+from sqlalchemy.ext.asyncio import AsyncSession
+from AI.pipeline import get_batcher
+from executor import QueueFullError, get_executor
+from metrics import stage_timer
+from service.classification_cache import (
+    CachedClassification,
+    get_classification_cache,
+)
+from service.http import etag_matches, parse_byte_range
+from service.archive import ArchiveTooLargeError, extract_zip, is_zip
+from service.image import StoredImage, guess_mime_type
 from PIL import Image
-from io import BytesIO
-from AI.pipeline import get_pipe
-from service.picture import save_picture
+import asyncio
+from service.jobs import check_callback_url, enqueue_job
+from service.embeddings import find_near_duplicate, find_similar
+from service.picture import (
+    get_listing_items,
+    list_pictures,
+    load_image_bytes,
+    render_variant,
+    save_pictures,
+    variant_name,
+)
+from service.upload import (
+    UPLOAD_ERRORS,
+    classify_upload,
+    decode_upload,
+    near_duplicate_result,
+    upload_error_status,
+)
+from storage import get_blob_store
+from datetime import datetime
+from typing import Any, Literal
 from entities.table import Picture
 import base64
+import hashlib
+import logging
 import uuid
+import zipfile
+
+logger = logging.getLogger(__name__)
 
 picture_route = APIRouter()
 
+ImageSize = Literal["original", "medium", "thumb"]
+
+
+def _upload_error(exc: Exception) -> HTTPException:
+    """Turn an exception from UPLOAD_ERRORS into the HTTPException to raise."""
+    status_code, detail = upload_error_status(exc)
+    headers = {"Retry-After": "1"} if status_code == 503 else None
+    return HTTPException(status_code=status_code, detail=detail, headers=headers)
+
 
 @picture_route.post("/picture")
 async def upload_picture(
-    db: DbSession,
+    request: Request,
+    db: AsyncDbSession,
     file: UploadFile = File(...),
+    mode: Literal["sync", "async"] = "sync",
+    callback_url: str | None = Form(default=None),
 ):
+    """Upload and classify an image.
+
+    With mode=async the upload is stored and queued instead, and the response
+    is 202 with a job id; poll status_url (GET /jobs/{job_id}) for the result,
+    or pass callback_url to have the final job status POSTed to it.
+    Duplicates of an already classified image are answered immediately in
+    either mode.
+    """
     if not file:
         return {"error": "No file uploaded"}
-    content = await file.read()
-
-    image = Image.open(BytesIO(content)).convert("RGB")
-    pipe = get_pipe()
-    result = pipe(image)[0]
-
-    # Convert image to JPEG bytes for storage
-    img_byte_arr = BytesIO()
-    image.save(img_byte_arr, format="JPEG", quality=95)
-    img_bytes = img_byte_arr.getvalue()
-
-    # Save to database using service helper, return the persisted instance
-    filename = file.filename or "unknown"
-    picture = save_picture(
-        db=db,
-        filename=filename,
-        image_bytes=img_bytes,  # Save as JPEG bytes, not raw pixels
-        label=result["label"],
-        confidence=float(result["score"]),
-    )
+    with stage_timer("read"):
+        content = await file.read()
 
-    return {
+    # Duplicate uploads reuse the prior classification without re-inference
+    with stage_timer("cache_lookup"):
+        content_hash = hashlib.sha256(content).hexdigest()
+        cached = await get_classification_cache().lookup(db, content_hash)
+    if cached is not None:
+        return {
+            "id": str(cached.picture_id),
+            "confidence": str(cached.confidence),
+            "label": cached.label,
+            "filename": file.filename,
+            "cached": True,
+        }
+    # End the lookup's transaction so no pooled connection is held through
+    # decode and inference; saving the picture starts a new one
+    await db.commit()
+
+    if mode == "async":
+        if callback_url is not None:
+            try:
+                await check_callback_url(callback_url)
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+        job = await enqueue_job(
+            db, file.filename or "unknown", content, content_hash, callback_url
+        )
+        status_url = str(request.url_for("get_job", job_id=str(job.id)))
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": str(job.id), "status": job.status, "status_url": status_url},
+            headers={"Location": status_url},
+        )
+
+    try:
+        picture, result = await classify_upload(
+            db, file.filename or "unknown", content, content_hash
+        )
+    except UPLOAD_ERRORS as exc:
+        raise _upload_error(exc)
+
+    response = {
         "id": str(picture.id),
         "confidence": str(result["score"]),
         "label": result["label"],
         "filename": file.filename,
+        "cached": False,
     }
+    if "near_duplicate_of" in result:
+        response["near_duplicate_of"] = result["near_duplicate_of"]
+    return response
 
 
-@picture_route.get("/picture/{picture_id}")
-async def get_picture(picture_id: str, db: DbSession):
-    """Retrieve a picture by ID including image data (base64 encoded)"""
+@picture_route.get("/pictures")
+async def get_pictures(
+    request: Request,
+    db: AsyncDbSession,
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    label: str | None = None,
+    min_confidence: float | None = None,
+    max_confidence: float | None = None,
+    feedback_given: bool | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+):
+    """List picture metadata, newest first, with cursor pagination.
+
+    Pass the returned next_cursor back as cursor to fetch the following page;
+    it is null on the last page. Filters combine with AND. Image bytes are
+    never read; each item links to its thumbnail instead.
+    """
+    try:
+        items, next_cursor = await list_pictures(
+            db,
+            limit=limit,
+            cursor=cursor,
+            label=label,
+            min_confidence=min_confidence,
+            max_confidence=max_confidence,
+            feedback_given=feedback_given,
+            created_after=created_after,
+            created_before=created_before,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    for item in items:
+        image_url = request.url_for("get_picture_image", picture_id=item["id"])
+        item["thumbnail_url"] = str(image_url.include_query_params(size="thumb"))
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@picture_route.post("/pictures/batch")
+async def upload_pictures_batch(
+    db: AsyncDbSession,
+    files: list[UploadFile] = File(...),
+):
+    """Upload and classify many images in one request.
+
+    Accepts any number of image files and/or zip archives of images (limited
+    by BATCH_UPLOAD_MAX_FILES and BATCH_UPLOAD_MAX_BYTES after expansion).
+    All images are decoded concurrently, classified together so the model
+    sees full batches, and saved with a single bulk insert. A failing file
+    does not fail the request: results hold, in input order, either the
+    classification or an error with the status code a single upload would
+    have returned.
+    """
+    uploads: list[tuple[str, bytes]] = []
+    results: list[dict | None] = []
+    total_bytes = 0
+    for file in files:
+        content = await file.read()
+        filename = file.filename or "unknown"
+        if is_zip(content):
+            try:
+                entries = await get_executor().run(
+                    extract_zip,
+                    content,
+                    env.BATCH_UPLOAD_MAX_FILES - len(uploads),
+                    env.BATCH_UPLOAD_MAX_BYTES - total_bytes,
+                )
+            except QueueFullError as exc:
+                raise _upload_error(exc)
+            except ArchiveTooLargeError as exc:
+                raise HTTPException(status_code=413, detail=str(exc))
+            except zipfile.BadZipFile:
+                results.append(
+                    {"filename": filename, "error": "Corrupt zip archive", "status_code": 400}
+                )
+                continue
+        else:
+            entries = [(filename, content)]
+        for entry in entries:
+            uploads.append(entry)
+            results.append(None)
+            total_bytes += len(entry[1])
+        if len(uploads) > env.BATCH_UPLOAD_MAX_FILES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {env.BATCH_UPLOAD_MAX_FILES} images per batch",
+            )
+        if total_bytes > env.BATCH_UPLOAD_MAX_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch exceeds {env.BATCH_UPLOAD_MAX_BYTES} bytes",
+            )
+
+    # Identical files in the batch (or already stored) are classified once
+    hashes = [hashlib.sha256(content).hexdigest() for _, content in uploads]
+    cache = get_classification_cache()
+    known = await cache.lookup_many(db, hashes)
+    # Release the connection while the batch is decoded and classified
+    await db.commit()
+    pending: dict[str, tuple[str, bytes]] = {}
+    for content_hash, upload in zip(hashes, uploads):
+        if content_hash not in known:
+            pending.setdefault(content_hash, upload)
+
+    # Bound decode concurrency to the pool size so a large batch waits here
+    # rather than filling the shared executor queue and starving other uploads
+    semaphore = asyncio.Semaphore(get_executor().max_workers)
+
+    async def decode(content: bytes) -> tuple[StoredImage, Image.Image]:
+        async with semaphore:
+            return await decode_upload(content)
+
+    decoded = dict(
+        zip(
+            pending,
+            await asyncio.gather(
+                *(decode(content) for _, content in pending.values()),
+                return_exceptions=True,
+            ),
+        )
+    )
+
+    # Submit every decoded image at once so the batcher forms full batches
+    batcher = get_batcher()
+    errors: dict[str, BaseException] = {}
+    futures: dict[str, asyncio.Future] = {}
+    for content_hash, outcome in decoded.items():
+        if isinstance(outcome, BaseException):
+            errors[content_hash] = outcome
+            continue
+        try:
+            futures[content_hash] = asyncio.wrap_future(batcher.submit(outcome[1]))
+        except QueueFullError as exc:
+            errors[content_hash] = exc
+    predictions = await asyncio.gather(*futures.values(), return_exceptions=True)
+
+    # One bulk insert for every newly classified image
+    new_uploads: list[dict[str, Any]] = []
+    near_duplicates: dict[str, str] = {}
+    for content_hash, prediction in zip(futures, predictions):
+        if isinstance(prediction, BaseException):
+            errors[content_hash] = prediction
+            continue
+        stored = decoded[content_hash][0]  # type: ignore[index]
+        result = prediction.predictions[0]
+        if env.EMBEDDING_NEAR_DUPLICATE_REUSE and prediction.embedding is not None:
+            match = await find_near_duplicate(db, prediction.embedding)
+            if match is not None:
+                result = near_duplicate_result(match)
+                near_duplicates[content_hash] = result["near_duplicate_of"]
+        new_uploads.append(
+            {
+                "filename": pending[content_hash][0],
+                "image_bytes": stored.data,
+                "label": result["label"],
+                "confidence": float(result["score"]),
+                "content_hash": content_hash,
+                "stored_format": stored.format,
+                "original_size": stored.original_size,
+                "embedding": prediction.embedding,
+            }
+        )
+    pictures = await save_pictures(db, new_uploads)
+    created = set()
+    for upload, picture in zip(new_uploads, pictures):
+        known[upload["content_hash"]] = CachedClassification(
+            picture_id=picture.id,  # type: ignore[arg-type]
+            label=upload["label"],
+            confidence=upload["confidence"],
+        )
+        cache.put(upload["content_hash"], known[upload["content_hash"]])
+        created.add(upload["content_hash"])
+
+    # Fill in per-file results, in input order, around the zip errors
+    remaining = iter(zip(uploads, hashes))
+    for position, result in enumerate(results):
+        if result is not None:
+            continue
+        (filename, _), content_hash = next(remaining)
+        classification = known.get(content_hash)
+        if classification is not None:
+            results[position] = {
+                "filename": filename,
+                "id": str(classification.picture_id),
+                "label": classification.label,
+                "confidence": str(classification.confidence),
+                # Only the first copy of a new image is a fresh classification
+                "cached": content_hash not in created,
+            }
+            if content_hash in near_duplicates:
+                results[position]["near_duplicate_of"] = near_duplicates[content_hash]
+            created.discard(content_hash)
+            continue
+        error = errors[content_hash]
+        if not isinstance(error, UPLOAD_ERRORS):
+            # The rest of the batch is already saved, so its ids must still
+            # reach the client rather than being lost to a 500
+            logger.error("Batch upload of %s failed", filename, exc_info=error)
+            results[position] = {
+                "filename": filename,
+                "error": "Internal error while classifying the image",
+                "status_code": 500,
+            }
+            continue
+        http_error = _upload_error(error)
+        results[position] = {
+            "filename": filename,
+            "error": http_error.detail,
+            "status_code": http_error.status_code,
+        }
+
+    return {
+        "results": results,
+        "succeeded": sum(1 for r in results if r and "error" not in r),
+        "failed": sum(1 for r in results if r and "error" in r),
+    }
+
+
+# Image bytes for a picture id never change, so clients may cache them forever
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Renditions depend on IMAGE_*_SIZE / IMAGE_VARIANT_QUALITY, which may change
+# between deploys; clients revalidate them against the ETag after a day
+VARIANT_CACHE_CONTROL = "public, max-age=86400"
+
+
+async def _get_picture_or_404(db: AsyncSession, picture_id: str) -> Picture:
     try:
         # Parse UUID
         pic_uuid = uuid.UUID(picture_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid picture ID format")
 
-    # Query the database
-    picture: Picture | None = db.query(Picture).filter(Picture.id == pic_uuid).first()
+    # Query the database (the legacy inline image column is deferred)
+    picture: Picture | None = await db.get(Picture, pic_uuid)
 
     if not picture:
         raise HTTPException(status_code=404, detail="Picture not found")
+    return picture
+
+
+@picture_route.get("/picture/{picture_id}/image", name="get_picture_image")
+async def get_picture_image(
+    picture_id: str,
+    db: AsyncDbSession,
+    range_header: str | None = Header(default=None, alias="Range"),
+    if_none_match: str | None = Header(default=None),
+    if_range: str | None = Header(default=None),
+    size: ImageSize = "original",
+):
+    """Serve the raw image bytes with ETag, Cache-Control and Range support.
+
+    size=thumb or size=medium returns a downscaled JPEG rendition, generated
+    on first request and cached in the blob store. Renditions carry their
+    size and quality in the ETag and are only cached by clients for a day.
+    """
+    picture = await _get_picture_or_404(db, picture_id)
+
+    # The blob key is the SHA-256 of the bytes, which makes a strong validator
+    # and lets revalidations be answered without reading the blob
+    image_data: bytes | None = None
+    key = picture.image_key
+    if key is None:
+        image_data = await load_image_bytes(db, picture)
+        if not image_data:
+            raise HTTPException(status_code=404, detail="Image not found")
+        key = hashlib.sha256(image_data).hexdigest()
+    variant = None if size == "original" else variant_name(size)
+    etag = f'"{key}"' if variant is None else f'"{key}-{variant}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMAGE_CACHE_CONTROL if variant is None else VARIANT_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if variant is not None:
+        try:
+            image_data = await get_blob_store().aget_variant(key, variant)
+        except KeyError:
+            image_data = image_data or await load_image_bytes(db, picture)
+            if not image_data:
+                raise HTTPException(status_code=404, detail="Image not found")
+            try:
+                image_data = await render_variant(key, image_data, size)
+            except QueueFullError:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Server is busy, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+    elif image_data is None:
+        image_data = await load_image_bytes(db, picture)
+        if not image_data:
+            raise HTTPException(status_code=404, detail="Image not found")
+
+    media_type = guess_mime_type(image_data)
+    length = len(image_data)
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_byte_range(range_header, length)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{length}"},
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            return Response(
+                content=image_data[start : end + 1],
+                status_code=206,
+                media_type=media_type,
+                headers={**headers, "Content-Range": f"bytes {start}-{end}/{length}"},
+            )
+
+    return Response(content=image_data, media_type=media_type, headers=headers)
+
+
+@picture_route.get("/picture/{picture_id}/similar")
+async def get_similar_pictures(
+    picture_id: str,
+    request: Request,
+    db: AsyncDbSession,
+    limit: int = Query(default=10, ge=1, le=100),
+):
+    """List the pictures that look most like this one, most similar first.
+
+    Similarity is the cosine similarity (up to 1.0) of the classifier's image
+    embeddings; near-identical shots of the same item score close to 1.
+    Returns 404 for pictures stored without an embedding.
+    """
+    try:
+        pic_uuid = uuid.UUID(picture_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid picture ID format")
+
+    matches = await find_similar(db, pic_uuid, limit)
+    if matches is None:
+        if await db.get(Picture, pic_uuid) is None:
+            raise HTTPException(status_code=404, detail="Picture not found")
+        raise HTTPException(status_code=404, detail="Picture has no embedding")
+
+    rows = await get_listing_items(db, [match_id for match_id, _ in matches])
+    items = []
+    for match_id, similarity in matches:
+        item = rows.get(match_id)
+        if item is None:
+            continue
+        image_url = request.url_for("get_picture_image", picture_id=item["id"])
+        item["thumbnail_url"] = str(image_url.include_query_params(size="thumb"))
+        item["similarity"] = round(similarity, 4)
+        items.append(item)
+
+    return {"items": items}
+
+
+@picture_route.get("/picture/{picture_id}")
+async def get_picture(
+    picture_id: str,
+    request: Request,
+    db: AsyncDbSession,
+    include_image: bool = False,
+):
+    """Retrieve a picture's metadata and the URL of its image.
+
+    Pass include_image=true to also get the image inline (base64 encoded).
+    """
+    picture = await _get_picture_or_404(db, picture_id)
 
     # Extract values with explicit type hints to help Pylance
-    image_data: bytes | None = picture.image  # type: ignore[assignment]
     confidence_value: float = float(picture.confidence)  # type: ignore[arg-type]
     created_timestamp = picture.created_at  # type: ignore[assignment]
+    image_url = request.url_for("get_picture_image", picture_id=str(picture.id))
 
-    # Encode image bytes to base64 for JSON transmission
-    image_base64 = base64.b64encode(image_data).decode("utf-8") if image_data else ""
-
-    return {
+    response = {
         "id": str(picture.id),
         "filename": picture.filename,
         "label": picture.label,
         "confidence": confidence_value,
         "feedback_given": picture.feedback_given,
-        "image": image_base64,  # Base64 encoded image
+        "stored_format": picture.stored_format,
+        "original_size": picture.original_size,
+        "stored_size": picture.stored_size,
+        "image_url": str(image_url),
+        "medium_url": str(image_url.include_query_params(size="medium")),
+        "thumbnail_url": str(image_url.include_query_params(size="thumb")),
         "created_at": created_timestamp.isoformat()
         if created_timestamp is not None
         else None,
     }
+
+    if include_image:
+        # Encode image bytes to base64 for JSON transmission
+        image_data = await load_image_bytes(db, picture)
+        response["image"] = (
+            base64.b64encode(image_data).decode("utf-8") if image_data else ""
+        )
+
+    return response
@@ -0,0 +1,39 @@
+from fastapi import APIRouter
+from database.core import AsyncDbSession
+from AI.pipeline import get_batcher
+from executor import get_executor
+from service.classification_cache import get_classification_cache
+from service.dashboard import get_dashboard_cache
+from service.jobs import job_counts
+
+stats_route = APIRouter(tags=["Stats"])
+
+
+@stats_route.get("/stats/inference")
+async def get_inference_stats():
+    """Queue depth and batch-size metrics of the micro-batching scheduler"""
+    return get_batcher().stats()
+
+
+@stats_route.get("/stats/executor")
+async def get_executor_stats():
+    """Occupancy of the bounded CPU executor used for decode/encode"""
+    return get_executor().stats()
+
+
+@stats_route.get("/stats/cache")
+async def get_cache_stats():
+    """Hit/miss counters of the content-hash classification cache"""
+    return get_classification_cache().stats()
+
+
+@stats_route.get("/stats/dashboard-cache")
+async def get_dashboard_cache_stats():
+    """Hit/miss/coalesced counters of the dashboard response cache"""
+    return get_dashboard_cache().stats()
+
+
+@stats_route.get("/stats/jobs")
+async def get_job_stats(db: AsyncDbSession):
+    """Number of asynchronous classification jobs per status"""
+    return await job_counts(db)
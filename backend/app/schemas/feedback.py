@@ -17,3 +17,13 @@ class FeedbackResponse(BaseModel):
     message: str = Field(..., description="Feedback message from the user")
     correct_label: str = Field(..., description="The correct label provided by user")
     created_at: str = Field(..., description="Timestamp when the feedback was created")
+
+
+class FeedbackBatchItem(FeedbackCreate):
+    picture_id: str = Field(..., description="ID of the picture this feedback is for")
+
+
+class FeedbackBatchCreate(BaseModel):
+    items: list[FeedbackBatchItem] = Field(
+        ..., description="Feedback to record, at most FEEDBACK_BATCH_MAX_ITEMS"
+    )
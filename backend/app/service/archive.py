@@ -0,0 +1,61 @@
+import io
+import posixpath
+import zipfile
+from typing import List, Tuple
+
+
+class ArchiveTooLargeError(ValueError):
+    """Raised when an archive holds more files or bytes than allowed."""
+
+
+def is_zip(content: bytes) -> bool:
+    """Whether ``content`` looks like a zip archive (local file header magic)."""
+    return content[:4] == b"PK\x03\x04"
+
+
+def extract_zip(
+    content: bytes, max_files: int, max_total_bytes: int
+) -> List[Tuple[str, bytes]]:
+    """Return the (name, bytes) of every regular file in a zip archive.
+
+    Directories and hidden or macOS resource-fork entries are skipped. Limits
+    are checked against the sizes declared in the central directory before
+    anything is decompressed, and reads are capped at those sizes, so a zip
+    bomb cannot expand past ``max_total_bytes``.
+
+    Args:
+        content: raw bytes of the archive
+        max_files: maximum number of files to extract
+        max_total_bytes: maximum combined uncompressed size
+
+    Returns:
+        List of (name, bytes) pairs in archive order.
+
+    Raises:
+        zipfile.BadZipFile: if the archive is corrupt
+        ArchiveTooLargeError: if either limit is exceeded
+    """
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        members = [
+            info
+            for info in archive.infolist()
+            if not info.is_dir()
+            and not posixpath.basename(info.filename).startswith(".")
+            and not info.filename.startswith("__MACOSX/")
+        ]
+        if len(members) > max_files:
+            raise ArchiveTooLargeError(
+                f"Archive contains {len(members)} files, the limit is {max_files}"
+            )
+        if sum(info.file_size for info in members) > max_total_bytes:
+            raise ArchiveTooLargeError(
+                f"Archive expands past the {max_total_bytes} byte limit"
+            )
+
+        files = []
+        for info in members:
+            with archive.open(info) as member:
+                files.append(
+                    (posixpath.basename(info.filename), member.read(info.file_size))
+                )
+        return files
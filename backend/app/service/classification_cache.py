@@ -0,0 +1,162 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import env
+from entities.table import Picture
+
+
+@dataclass(frozen=True)
+class CachedClassification:
+    picture_id: uuid.UUID
+    label: str
+    confidence: float
+
+
+class ClassificationCache:
+    """Bounded LRU cache of classifications keyed by upload content hash.
+
+    Entries expire after ``ttl_seconds``. On a local miss the indexed
+    ``pictures.content_hash`` column is consulted, so duplicates are detected
+    across restarts and worker processes.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, CachedClassification]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._db_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, content_hash: str) -> Optional[CachedClassification]:
+        """Return the in-memory entry for ``content_hash`` if present and fresh."""
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[content_hash]
+                return None
+            self._entries.move_to_end(content_hash)
+            return value
+
+    def put(self, content_hash: str, value: CachedClassification) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[content_hash] = (time.monotonic(), value)
+            self._entries.move_to_end(content_hash)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    async def lookup(self, db: AsyncSession, content_hash: str) -> Optional[CachedClassification]:
+        """Find a prior classification for ``content_hash`` in memory, then in the DB."""
+        value = self.get(content_hash)
+        if value is not None:
+            with self._lock:
+                self._hits += 1
+            return value
+
+        # Only the classification columns, never the image blob
+        row = (
+            await db.execute(
+                select(Picture.id, Picture.label, Picture.confidence)
+                .where(Picture.content_hash == content_hash)
+                .order_by(Picture.created_at)
+                .limit(1)
+            )
+        ).first()
+        if row is None:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        value = CachedClassification(
+            picture_id=row.id, label=row.label, confidence=float(row.confidence)
+        )
+        self.put(content_hash, value)
+        with self._lock:
+            self._db_hits += 1
+        return value
+
+    async def lookup_many(
+        self, db: AsyncSession, content_hashes: Iterable[str]
+    ) -> Dict[str, CachedClassification]:
+        """Batch form of ``lookup``: one DB query for all in-memory misses.
+
+        Returns only the hashes that were found.
+        """
+        found: Dict[str, CachedClassification] = {}
+        missing = []
+        for content_hash in set(content_hashes):
+            value = self.get(content_hash)
+            if value is not None:
+                found[content_hash] = value
+            else:
+                missing.append(content_hash)
+        with self._lock:
+            self._hits += len(found)
+        if not missing:
+            return found
+
+        rows = (
+            await db.execute(
+                select(Picture.content_hash, Picture.id, Picture.label, Picture.confidence)
+                .where(Picture.content_hash.in_(missing))
+                .order_by(Picture.created_at)
+            )
+        ).all()
+        db_hits = 0
+        for row in rows:
+            # Keep the oldest picture per hash, as ``lookup`` does
+            if row.content_hash in found:
+                continue
+            value = CachedClassification(
+                picture_id=row.id, label=row.label, confidence=float(row.confidence)
+            )
+            self.put(row.content_hash, value)
+            found[row.content_hash] = value
+            db_hits += 1
+        with self._lock:
+            self._db_hits += db_hits
+            self._misses += len(missing) - db_hits
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._db_hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "db_hits": self._db_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_ratio": (self._hits + self._db_hits) / lookups if lookups else 0.0,
+            }
+
+
+# Singleton holder for the classification cache
+_cache: Optional[ClassificationCache] = None
+
+
+def get_classification_cache() -> ClassificationCache:
+    global _cache
+    if _cache is None:
+        _cache = ClassificationCache(
+            max_size=env.CLASSIFICATION_CACHE_SIZE,
+            ttl_seconds=env.CLASSIFICATION_CACHE_TTL_SECONDS,
+        )
+    return _cache
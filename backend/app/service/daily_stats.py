@@ -0,0 +1,105 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict
+
+from sqlalchemy import case, delete, func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.core import SessionLocal
+from entities.table import DailyStats, Feedback, Picture
+
+COUNTERS = ("picture_count", "feedback_count", "correct_count", "incorrect_count")
+
+
+def upsert_daily_stats(dialect_name: str, **deltas: int):
+    """Build an INSERT ... ON CONFLICT DO UPDATE adding ``deltas`` to today's row.
+
+    The row is keyed by the database's CURRENT_DATE, which matches
+    ``date(created_at)`` of rows inserted in the same transaction.
+    """
+    insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+    stmt = insert(DailyStats).values(
+        date=func.current_date(),
+        **{name: deltas.get(name, 0) for name in COUNTERS},
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyStats.date],
+        set_={
+            name: getattr(DailyStats, name) + getattr(stmt.excluded, name)
+            for name in COUNTERS
+        },
+    )
+
+
+async def increment_daily_stats(db: AsyncSession, **deltas: int) -> None:
+    """Add ``deltas`` to today's counters within the caller's transaction.
+
+    Every writer upserts the same row, and its lock is held until commit:
+    call this as the last statement, right before committing, so writers
+    only serialize on the commit itself.
+
+    Args:
+        db: SQLAlchemy AsyncSession; the caller commits
+        deltas: amounts keyed by counter name (picture_count, feedback_count,
+            correct_count, incorrect_count)
+    """
+    await db.execute(upsert_daily_stats(db.get_bind().dialect.name, **deltas))
+
+
+def _as_date(value) -> date:
+    # SQLite returns date() results as ISO strings
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def rebuild_daily_stats() -> int:
+    """Recompute every day's counters from pictures and feedbacks; blocking.
+
+    Feedback counts as correct when it matches the label the picture is
+    stored with now. The rollup is replaced in a single transaction that
+    blocks uploads and feedback from incrementing it meanwhile, so it is
+    safe to run against a live API: their increments land on the new rows.
+
+    Returns:
+        The number of days written.
+    """
+    counts: Dict[date, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    with SessionLocal() as db:
+        if db.get_bind().dialect.name == "postgresql":
+            # Still readable; increment_daily_stats waits for the commit
+            db.execute(text("LOCK TABLE daily_stats IN EXCLUSIVE MODE"))
+        # Deleting before counting also takes SQLite's write lock first
+        db.execute(delete(DailyStats))
+
+        picture_day = func.date(Picture.created_at)
+        for day, total in db.execute(
+            select(picture_day, func.count(Picture.id))
+            .where(Picture.created_at.is_not(None))
+            .group_by(picture_day)
+        ):
+            counts[_as_date(day)]["picture_count"] = total
+
+        feedback_day = func.date(Feedback.created_at)
+        for day, total, correct, incorrect in db.execute(
+            select(
+                feedback_day,
+                func.count(Feedback.id),
+                func.sum(case((Feedback.correct_label == Picture.label, 1), else_=0)),
+                func.sum(case((Feedback.correct_label != Picture.label, 1), else_=0)),
+            )
+            .join(Picture, Feedback.picture_id == Picture.id)
+            .where(Feedback.created_at.is_not(None))
+            .group_by(feedback_day)
+        ):
+            row = counts[_as_date(day)]
+            row["feedback_count"] = total
+            row["correct_count"] = int(correct or 0)
+            row["incorrect_count"] = int(incorrect or 0)
+
+        if counts:
+            db.execute(
+                insert(DailyStats),
+                [{"date": day, **values} for day, values in sorted(counts.items())],
+            )
+        db.commit()
+    return len(counts)
@@ -0,0 +1,66 @@
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import env
+from entities.table import DailyStats
+from service.response_cache import ResponseCache
+
+
+async def compute_dashboard(
+    db: AsyncSession,
+    start: date | None = None,
+    end: date | None = None,
+) -> Dict[str, Any]:
+    """Build the dashboard payload from the daily_stats rollup.
+
+    Args:
+        db: SQLAlchemy AsyncSession
+        start: first day to include (inclusive), or None for no lower bound
+        end: last day to include (inclusive), or None for no upper bound
+
+    Returns:
+        Totals over the selected days and per-day correct/incorrect feedback.
+    """
+    query = select(DailyStats).order_by(DailyStats.date)
+    if start is not None:
+        query = query.where(DailyStats.date >= start)
+    if end is not None:
+        query = query.where(DailyStats.date <= end)
+    days = (await db.scalars(query)).all()
+
+    # Format the data for the frontend
+    # A feedback is "correct" if the correct_label matches the picture's label
+    chart_data = [
+        {
+            "date": str(day.date),
+            "correct": day.correct_count,
+            "incorrect": day.incorrect_count,
+        }
+        for day in days
+        if day.feedback_count
+    ]
+
+    return {
+        "total_pictures": sum(day.picture_count for day in days),
+        "total_feedback": sum(day.feedback_count for day in days),
+        "feedback_by_date": chart_data,
+    }
+
+
+# Singleton holder for the dashboard response cache
+_cache: Optional[ResponseCache] = None
+
+
+def get_dashboard_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(ttl_seconds=env.DASHBOARD_CACHE_TTL_SECONDS)
+    return _cache
+
+
+def invalidate_dashboard() -> None:
+    """Drop cached dashboard responses; call after committing a picture or feedback."""
+    get_dashboard_cache().invalidate()
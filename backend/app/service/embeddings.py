@@ -0,0 +1,215 @@
+import asyncio
+import threading
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from AI.vector_index import VectorIndex, current_version
+from config import env
+from database.core import SessionLocal
+from entities.table import Picture, PictureEmbedding
+from service.classification_cache import CachedClassification
+
+# Rows fetched per query while catching up with picture_embeddings
+SYNC_BATCH_SIZE = 5000
+# Rows created this long before the watermark row are re-checked on sync, for
+# transactions that committed after a later one had already been indexed;
+# must exceed how long a transaction inserting embeddings stays open
+SYNC_LOOKBACK = timedelta(minutes=15)
+
+# Singleton holder for this process's index (see get_embedding_index)
+_index: Optional[VectorIndex] = None
+_index_lock = threading.Lock()
+_sync_lock = threading.Lock()
+_last_sync = 0.0
+
+
+def embedding_row(picture_id: uuid.UUID, vector: Any) -> PictureEmbedding:
+    """Build the (unsaved) PictureEmbedding row for a float16 vector."""
+    vector = np.asarray(vector, dtype=np.float16).reshape(-1)
+    return PictureEmbedding(picture_id=picture_id, dim=len(vector), vector=vector.tobytes())
+
+
+def to_vector(data: bytes) -> np.ndarray:
+    """Decode the ``vector`` column of a picture_embeddings row."""
+    return np.frombuffer(data, dtype=np.float16)
+
+
+def get_embedding_index() -> VectorIndex:
+    """Return this process's index, mapping the persisted one on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VectorIndex.load(
+                    env.EMBEDDING_INDEX_PATH,
+                    nprobe=env.EMBEDDING_IVF_NPROBE,
+                    ivf_min_vectors=env.EMBEDDING_IVF_MIN_VECTORS,
+                )
+    return _index
+
+
+def sync_embedding_index(index: Optional[VectorIndex] = None) -> int:
+    """Add picture_embeddings rows the index has not seen yet; blocking.
+
+    Reads rows above the watermark in id order, plus rows below it created
+    within SYNC_LOOKBACK of the watermark row that are not indexed yet
+    (transactions that committed late). When called for the process-wide
+    index, a newer persisted version (written by
+    ``python -m commands.embedding_index``) is mapped first.
+
+    Returns:
+        The number of vectors added.
+    """
+    global _index
+    if index is None:
+        index = get_embedding_index()
+        version = current_version(env.EMBEDDING_INDEX_PATH)
+        if version is not None and version != index.version:
+            index = VectorIndex.load(
+                env.EMBEDDING_INDEX_PATH,
+                nprobe=env.EMBEDDING_IVF_NPROBE,
+                ivf_min_vectors=env.EMBEDDING_IVF_MIN_VECTORS,
+            )
+            # Searches keep the old index until the new one has caught up
+            sync_embedding_index(index)
+            _index = index
+            return len(index)
+
+    columns = (PictureEmbedding.id, PictureEmbedding.picture_id, PictureEmbedding.vector)
+    added = 0
+    with SessionLocal() as db:
+        watermark_created_at = db.scalar(
+            select(PictureEmbedding.created_at)
+            .where(PictureEmbedding.id <= index.watermark)
+            .order_by(PictureEmbedding.id.desc())
+            .limit(1)
+        )
+        late = []
+        if watermark_created_at is not None:
+            late = index.missing(
+                db.scalars(
+                    select(PictureEmbedding.id).where(
+                        PictureEmbedding.created_at >= watermark_created_at - SYNC_LOOKBACK,
+                        PictureEmbedding.id <= index.watermark,
+                    )
+                )
+            )
+        if late:
+            added += _add_rows(
+                index, db.execute(select(*columns).where(PictureEmbedding.id.in_(late)))
+            )
+        while True:
+            rows = db.execute(
+                select(*columns)
+                .where(PictureEmbedding.id > index.watermark)
+                .order_by(PictureEmbedding.id)
+                .limit(SYNC_BATCH_SIZE)
+            ).all()
+            added += _add_rows(index, rows)
+            if len(rows) < SYNC_BATCH_SIZE:
+                return added
+
+
+def _add_rows(index: VectorIndex, rows: Any) -> int:
+    # Vectors of another model's size wait for a rebuild of the index
+    rows = [row for row in rows if index.dim is None or len(row[2]) == 2 * index.dim]
+    if not rows:
+        return 0
+    return index.add(
+        [seq for seq, _, _ in rows],
+        [picture_id for _, picture_id, _ in rows],
+        np.stack([to_vector(vector) for _, _, vector in rows]),
+    )
+
+
+async def refresh_embedding_index() -> VectorIndex:
+    """Bring the index up to date, at most every EMBEDDING_SYNC_INTERVAL_SECONDS.
+
+    Other requests do not wait for a sync that is already running; they
+    search the index as it is.
+    """
+    global _last_sync
+    if time.monotonic() - _last_sync >= env.EMBEDDING_SYNC_INTERVAL_SECONDS:
+        if _sync_lock.acquire(blocking=False):
+            try:
+                await asyncio.to_thread(sync_embedding_index)
+                _last_sync = time.monotonic()
+            finally:
+                _sync_lock.release()
+    return get_embedding_index()
+
+
+def index_embeddings(rows: List[PictureEmbedding]) -> None:
+    """Add freshly committed embeddings to this process's index, if it is loaded.
+
+    Makes a new upload findable by the next request without waiting for a
+    sync; other processes pick it up from the table.
+    """
+    if _index is None or not rows:
+        return
+    _index.add(
+        [row.id for row in rows],  # type: ignore[misc]
+        [row.picture_id for row in rows],  # type: ignore[misc]
+        np.stack([to_vector(row.vector) for row in rows]),  # type: ignore[arg-type]
+    )
+
+
+async def find_similar(
+    db: AsyncSession, picture_id: uuid.UUID, limit: int
+) -> Optional[List[Tuple[uuid.UUID, float]]]:
+    """Find the pictures most similar to a stored one.
+
+    Args:
+        db: SQLAlchemy AsyncSession
+        picture_id: UUID of the query picture
+        limit: maximum number of results
+
+    Returns:
+        (picture UUID, cosine similarity) pairs, most similar first, excluding
+        the picture itself; None if the picture has no embedding.
+    """
+    vector = await db.scalar(
+        select(PictureEmbedding.vector).where(PictureEmbedding.picture_id == picture_id)
+    )
+    if vector is None:
+        return None
+    vector = to_vector(vector)
+    index = await refresh_embedding_index()
+    if index.dim != len(vector):
+        return []  # Embedded by another model than the indexed pictures
+    return await asyncio.to_thread(index.search, vector, limit, [picture_id])
+
+
+async def find_near_duplicate(
+    db: AsyncSession, vector: Any
+) -> Optional[CachedClassification]:
+    """Return the classification of a stored picture nearly identical to ``vector``.
+
+    The nearest indexed picture counts when its cosine similarity reaches
+    EMBEDDING_NEAR_DUPLICATE_THRESHOLD. Its current label is used, so
+    corrections applied to it (e.g. by ``commands.reclassify --apply``)
+    carry over.
+    """
+    index = await refresh_embedding_index()
+    if len(index) == 0 or index.dim != len(vector):
+        return None
+    matches = await asyncio.to_thread(index.search, vector, 1)
+    if not matches or matches[0][1] < env.EMBEDDING_NEAR_DUPLICATE_THRESHOLD:
+        return None
+    row = (
+        await db.execute(
+            select(Picture.label, Picture.confidence).where(Picture.id == matches[0][0])
+        )
+    ).first()
+    if row is None:
+        return None
+    return CachedClassification(
+        picture_id=matches[0][0], label=row.label, confidence=float(row.confidence)
+    )
+
@@ -1,43 +1,126 @@
-from sqlalchemy.orm import Session
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from entities.table import Feedback, Picture
+from service.daily_stats import increment_daily_stats
+from service.dashboard import invalidate_dashboard
 import uuid
 
 
-def save_feedback(
-    db: Session,
-    picture_id: str,
+@dataclass(frozen=True)
+class FeedbackItem:
+    """One piece of feedback to record.
+
+    Attributes:
+        picture_id: UUID of the picture
+        message: User's feedback message
+        correct_label: The correct label according to the user, or None to
+            confirm the picture's own label
+    """
+
+    picture_id: uuid.UUID
+    message: str
+    correct_label: Optional[str] = None
+
+
+async def _mark_feedback_given(
+    db: AsyncSession, picture_ids: Sequence[uuid.UUID]
+) -> Dict[uuid.UUID, str]:
+    # Existence check and flag update in one statement; only id and label
+    # come back, so the image columns are never read
+    rows = await db.execute(
+        update(Picture)
+        .where(Picture.id.in_(set(picture_ids)))
+        .values(feedback_given=True)
+        .returning(Picture.id, Picture.label)
+        .execution_options(synchronize_session=False)
+    )
+    return {picture_id: label for picture_id, label in rows}
+
+
+async def save_feedback(
+    db: AsyncSession,
+    picture_id: uuid.UUID,
     message: str,
-    correct_label: str,
-) -> Feedback:
+    correct_label: Optional[str] = None,
+) -> Optional[Feedback]:
     """Save user feedback for a picture classification and mark picture as having feedback.
 
+    Runs as one transaction of three statements: an UPDATE ... RETURNING on
+    the picture (flag and existence check), an INSERT ... RETURNING for the
+    feedback row and the daily_stats upsert.
+
     Args:
-        db: SQLAlchemy Session
+        db: SQLAlchemy AsyncSession
         picture_id: UUID of the picture
         message: User's feedback message
-        correct_label: The correct label according to the user
+        correct_label: The correct label according to the user, or None to
+            confirm the AI's label
 
     Returns:
-        The created Feedback ORM instance
+        The created Feedback ORM instance, or None if the picture does not exist
     """
-    # Parse UUID
-    pic_uuid = uuid.UUID(picture_id)
-
-    # Create feedback record
-    feedback = Feedback(
-        picture_id=pic_uuid,
-        message=message,
-        correct_label=correct_label,
+    saved = await save_feedbacks(
+        db, [FeedbackItem(picture_id, message, correct_label)]
     )
+    return saved[0]
 
-    db.add(feedback)
 
-    # Update the picture to mark that feedback has been given
-    picture = db.query(Picture).filter(Picture.id == pic_uuid).first()
-    if picture:
-        picture.feedback_given = True  # type: ignore
+async def save_feedbacks(
+    db: AsyncSession, items: Sequence[FeedbackItem]
+) -> List[Optional[Feedback]]:
+    """Save many pieces of feedback in a single transaction.
+
+    All referenced pictures are flagged with one UPDATE ... RETURNING, the
+    feedback rows are written with one bulk INSERT ... RETURNING and the
+    daily_stats rollup is bumped once with the totals.
+
+    Args:
+        db: SQLAlchemy AsyncSession
+        items: feedback to record; several items may refer to the same picture
+
+    Returns:
+        One entry per item, in input order: the created Feedback, or None if
+        its picture does not exist.
+    """
+    labels = await _mark_feedback_given(db, [item.picture_id for item in items])
+
+    found = [item for item in items if item.picture_id in labels]
+    if not found:
+        await db.rollback()
+        return [None] * len(items)
+
+    rows = [
+        {
+            "picture_id": item.picture_id,
+            "message": item.message,
+            "correct_label": item.correct_label or labels[item.picture_id],
+        }
+        for item in found
+    ]
+    created = iter(
+        list(
+            await db.scalars(
+                insert(Feedback).returning(Feedback, sort_by_parameter_order=True),
+                rows,
+            )
+        )
+    )
+
+    correct = sum(row["correct_label"] == labels[row["picture_id"]] for row in rows)
+    # Keep the dashboard rollup in step within the same transaction; last,
+    # as the rollup row stays locked until the commit
+    await increment_daily_stats(
+        db,
+        feedback_count=len(rows),
+        correct_count=correct,
+        incorrect_count=len(rows) - correct,
+    )
 
-    db.commit()
-    db.refresh(feedback)
+    await db.commit()
+    invalidate_dashboard()
 
-    return feedback
+    return [
+        next(created) if item.picture_id in labels else None for item in items
+    ]
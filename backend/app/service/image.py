@@ -0,0 +1,224 @@
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+
+from PIL import ExifTags, Image, ImageOps
+
+
+class ImageTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured pixel limit."""
+
+
+def open_checked(content: bytes, max_pixels: int) -> Image.Image:
+    """Open image bytes lazily and reject decompression bombs.
+
+    Only the header is parsed here, so oversized images are refused before
+    any pixel data is decoded.
+    """
+    image = Image.open(BytesIO(content))
+    width, height = image.size
+    if max_pixels and width * height > max_pixels:
+        raise ImageTooLargeError(
+            f"Image is {width}x{height} pixels, the limit is {max_pixels} pixels"
+        )
+    return image
+
+
+def decode_for_inference(content: bytes, target_size: int, max_pixels: int) -> Image.Image:
+    """Decode uploaded bytes into an RGB image near the model's input size.
+
+    JPEGs are decoded with ``draft()`` so libjpeg produces a 1/2, 1/4 or 1/8
+    scale image directly; other formats are shrunk with ``reduce()``. Either
+    way the shorter edge stays >= ``target_size``, so the image processor's
+    final resize sees the same detail. EXIF orientation is applied.
+    Module-level so it can be shipped to a process pool.
+    """
+    image = open_checked(content, max_pixels)
+    image.draft("RGB", (target_size, target_size))
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    factor = min(image.size) // target_size
+    if factor >= 2:
+        image = image.reduce(factor)
+    return image
+
+
+# Already-compressed formats whose original bytes can be stored as-is
+PASSTHROUGH_FORMATS = {"JPEG", "WEBP"}
+
+# Metadata dropped from passthrough originals, which are served publicly:
+# JPEG APP1 (EXIF, XMP), APP13 (IPTC) and comments, and WebP EXIF/XMP
+# chunks. JFIF, ICC profiles and Adobe markers affect decoding and are kept
+_JPEG_METADATA_MARKERS = {0xE1, 0xED, 0xFE}
+_WEBP_METADATA_CHUNKS = {b"EXIF", b"XMP "}
+# VP8X flags announcing EXIF and XMP chunks
+_WEBP_METADATA_FLAGS = 0x08 | 0x04
+
+
+@dataclass(frozen=True)
+class StoredImage:
+    data: bytes
+    format: str  # "jpeg" or "webp"
+    original_size: int
+    transcoded: bool
+
+
+def prepare_for_storage(
+    content: bytes,
+    max_pixels: int,
+    max_passthrough_bytes: int,
+    transcode_format: str = "jpeg",
+    quality: int = 95,
+) -> StoredImage:
+    """Choose the bytes to persist for an upload.
+
+    JPEG and WebP uploads under ``max_passthrough_bytes`` keep their
+    compressed image data untouched (no decode, no generational loss); only
+    metadata such as EXIF GPS positions and camera serials is dropped (see
+    strip_metadata). Anything else (PNG, BMP, GIF, oversized files) is
+    decoded, EXIF-oriented and transcoded to ``transcode_format``; an
+    oversized original is still kept if transcoding would not make it
+    smaller.
+    """
+    image = open_checked(content, max_pixels)
+    source_format = image.format or ""
+    original = None
+    if source_format in PASSTHROUGH_FORMATS:
+        orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+        original = strip_metadata(content, source_format, orientation)
+    if original is not None and len(content) <= max_passthrough_bytes:
+        return StoredImage(
+            data=original,
+            format=source_format.lower(),
+            original_size=len(content),
+            transcoded=False,
+        )
+
+    image = ImageOps.exif_transpose(image)
+    target = transcode_format.upper()
+    if target == "WEBP":
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        out = BytesIO()
+        image.save(out, format="WEBP", quality=quality, method=4)
+        data = out.getvalue()
+    else:
+        target = "JPEG"
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        data = encode_jpeg(image, quality=quality)
+
+    if original is not None and len(data) >= len(original):
+        return StoredImage(
+            data=original,
+            format=source_format.lower(),
+            original_size=len(content),
+            transcoded=False,
+        )
+    return StoredImage(
+        data=data, format=target.lower(), original_size=len(content), transcoded=True
+    )
+
+
+def strip_metadata(content: bytes, source_format: str, orientation: int = 1) -> Optional[bytes]:
+    """Drop privacy-sensitive metadata from JPEG or WebP bytes without re-encoding.
+
+    A JPEG keeps a minimal EXIF block holding only ``orientation`` so it
+    still displays upright. Returns None when that cannot be done losslessly
+    (malformed files, rotated WebP), in which case the image is transcoded.
+    """
+    try:
+        if source_format == "JPEG":
+            return _strip_jpeg(content, orientation)
+        if source_format == "WEBP" and orientation == 1:
+            return _strip_webp(content)
+    except ValueError:
+        pass
+    return None
+
+
+def _strip_jpeg(content: bytes, orientation: int) -> bytes:
+    kept = [content[:2]]  # SOI
+    pos = 2
+    while True:
+        if pos + 4 > len(content) or content[pos] != 0xFF:
+            raise ValueError("Malformed JPEG")
+        marker = content[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        if marker in (0xDA, 0xD9):  # Start of scan: entropy-coded data follows
+            break
+        end = pos + 2 + int.from_bytes(content[pos + 2 : pos + 4], "big")
+        if marker not in _JPEG_METADATA_MARKERS:
+            kept.append(content[pos:end])
+        pos = end
+    if orientation != 1:
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = orientation
+        payload = exif.tobytes()
+        # After SOI and the JFIF APP0 segment, if any
+        at = 2 if len(kept) > 1 and kept[1][1] == 0xE0 else 1
+        kept.insert(at, b"\xff\xe1" + (len(payload) + 2).to_bytes(2, "big") + payload)
+    kept.append(content[pos:])
+    return b"".join(kept)
+
+
+def _strip_webp(content: bytes) -> bytes:
+    if content[:4] != b"RIFF" or content[8:12] != b"WEBP":
+        raise ValueError("Malformed WebP")
+    chunks = []
+    pos = 12
+    while pos + 8 <= len(content):
+        fourcc = content[pos : pos + 4]
+        size = int.from_bytes(content[pos + 4 : pos + 8], "little")
+        end = pos + 8 + size + (size & 1)  # Chunks are padded to even sizes
+        if end > len(content):
+            raise ValueError("Malformed WebP")
+        chunk = content[pos:end]
+        if fourcc == b"VP8X":
+            chunk = chunk[:8] + bytes([chunk[8] & ~_WEBP_METADATA_FLAGS]) + chunk[9:]
+        if fourcc not in _WEBP_METADATA_CHUNKS:
+            chunks.append(chunk)
+        pos = end
+    body = b"WEBP" + b"".join(chunks)
+    return b"RIFF" + len(body).to_bytes(4, "little") + body
+
+
+def encode_jpeg(image: Image.Image, quality: int = 95) -> bytes:
+    """Encode an image as JPEG bytes for storage."""
+    img_byte_arr = BytesIO()
+    image.save(img_byte_arr, format="JPEG", quality=quality)
+    return img_byte_arr.getvalue()
+
+
+def make_variant(data: bytes, max_side: int, quality: int = 85) -> bytes:
+    """Render a JPEG no larger than ``max_side`` on either edge.
+
+    JPEG sources are decoded with ``draft()`` so libjpeg scales by 1/2, 1/4 or
+    1/8 during decode, then ``reduce()`` (via ``reducing_gap``) shrinks by an
+    integer factor before the final high-quality resample.
+    """
+    image = Image.open(BytesIO(data))
+    image.draft("RGB", (max_side, max_side))
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    return encode_jpeg(image, quality=quality)
+
+
+def guess_mime_type(data: bytes) -> str:
+    """Sniff the MIME type of stored image bytes from their magic number."""
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if data.startswith(b"BM"):
+        return "image/bmp"
+    return "application/octet-stream"
@@ -0,0 +1,362 @@
+import asyncio
+import ipaddress
+import logging
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import env
+from database.core import AsyncSessionLocal
+from entities.table import ClassificationJob, Picture
+from executor import QueueFullError
+from service.classification_cache import get_classification_cache
+from service.upload import UPLOAD_ERRORS, classify_upload, upload_error_status
+from storage import get_blob_store
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def _utcnow() -> datetime:
+    # started_at/finished_at are naive UTC, written and compared app-side
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def check_callback_url(url: str) -> None:
+    """Refuse callback URLs that would make the worker reach internal services.
+
+    Only http(s) URLs qualify. When JOB_CALLBACK_ALLOWED_HOSTS is set, the
+    host must be one of them; otherwise every address it resolves to must
+    be public, which rules out loopback, private, link-local and other
+    reserved ranges.
+
+    Raises:
+        ValueError: if the URL is not an acceptable callback target
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("callback_url must be http(s)")
+    host = parsed.hostname.lower()
+    allowed = {
+        name.strip().lower()
+        for name in env.JOB_CALLBACK_ALLOWED_HOSTS.split(",")
+        if name.strip()
+    }
+    if allowed:
+        if host not in allowed:
+            raise ValueError("callback_url host is not allowed")
+        return
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+    except (OSError, ValueError):
+        raise ValueError("callback_url host cannot be resolved") from None
+    for *_, sockaddr in addresses:
+        if not ipaddress.ip_address(sockaddr[0]).is_global:
+            raise ValueError("callback_url must resolve to a public address")
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    filename: str,
+    content: bytes,
+    content_hash: str,
+    callback_url: str | None = None,
+) -> ClassificationJob:
+    """Persist a raw upload and queue it for classification.
+
+    Args:
+        db: SQLAlchemy AsyncSession
+        filename: original filename
+        content: raw uploaded bytes, written to the blob store
+        content_hash: SHA-256 hex digest of content
+        callback_url: optional URL to POST the job status to once it finishes
+
+    Returns:
+        The created ClassificationJob (committed).
+    """
+    job = ClassificationJob(
+        id=uuid.uuid4(),
+        status=JOB_QUEUED,
+        filename=filename,
+        upload_key=await get_blob_store().aput(content),
+        content_hash=content_hash,
+        callback_url=callback_url,
+    )
+    db.add(job)
+    await db.commit()
+    return job
+
+
+async def claim_jobs(db: AsyncSession, limit: int) -> List[uuid.UUID]:
+    """Atomically mark up to ``limit`` jobs as running and return their ids.
+
+    Takes the oldest queued jobs whose backoff has elapsed plus running
+    jobs whose worker has not finished them within JOB_TIMEOUT_SECONDS (it
+    presumably died). On Postgres the candidate rows are locked with FOR
+    UPDATE SKIP LOCKED, so concurrent workers each claim a disjoint set
+    without blocking.
+    """
+    now = _utcnow()
+    stale = now - timedelta(seconds=env.JOB_TIMEOUT_SECONDS)
+    claimable = (
+        select(ClassificationJob.id)
+        .where(
+            or_(
+                and_(
+                    ClassificationJob.status == JOB_QUEUED,
+                    or_(
+                        ClassificationJob.next_attempt_at.is_(None),
+                        ClassificationJob.next_attempt_at <= now,
+                    ),
+                ),
+                and_(
+                    ClassificationJob.status == JOB_RUNNING,
+                    ClassificationJob.started_at < stale,
+                ),
+            )
+        )
+        .order_by(ClassificationJob.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = await db.scalars(
+        update(ClassificationJob)
+        .where(ClassificationJob.id.in_(claimable.scalar_subquery()))
+        .values(
+            status=JOB_RUNNING,
+            started_at=now,
+            attempts=ClassificationJob.attempts + 1,
+        )
+        .returning(ClassificationJob.id)
+    )
+    job_ids = list(claimed)
+    await db.commit()
+    return job_ids
+
+
+async def run_job(job_id: uuid.UUID) -> bool:
+    """Classify a claimed job, record the outcome and fire its callback.
+
+    Unexpected failures put the job back in the queue, waiting
+    JOB_RETRY_BACKOFF_SECONDS doubled per attempt, until it has used
+    JOB_MAX_ATTEMPTS; invalid images fail immediately. A full inference
+    queue is not the job's fault: it is retried after
+    JOB_RETRY_BACKOFF_SECONDS without using up an attempt.
+
+    Returns:
+        True if the job was put back because the inference queue was full.
+    """
+    # Each step uses its own short session, so no pooled connection is held
+    # through decode and inference or while the callback is sent
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ClassificationJob, job_id)
+    if job is None:
+        return False
+    attempts = job.attempts
+    callback_url = job.callback_url
+
+    values: Dict[str, Any]
+    deferred = False
+    if attempts > env.JOB_MAX_ATTEMPTS:
+        # Reclaimed after its last attempt timed out
+        values = _failed(504, f"Gave up after {env.JOB_MAX_ATTEMPTS} attempts")
+    else:
+        try:
+            async with AsyncSessionLocal() as db:
+                picture_id = await _classify(db, job)
+            values = {
+                "status": JOB_DONE,
+                "picture_id": picture_id,
+                "finished_at": _utcnow(),
+            }
+        except UPLOAD_ERRORS as exc:
+            status_code, detail = upload_error_status(exc)
+            if isinstance(exc, QueueFullError):
+                deferred = True
+                values = _requeued(env.JOB_RETRY_BACKOFF_SECONDS)
+                values["attempts"] = ClassificationJob.attempts - 1
+            else:
+                values = _failed(status_code, detail)
+        except Exception:
+            logger.exception("Classification job %s failed", job_id)
+            if attempts < env.JOB_MAX_ATTEMPTS:
+                values = _requeued(env.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+            else:
+                values = _failed(500, "Classification failed")
+
+    payload = None
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(ClassificationJob)
+            .where(ClassificationJob.id == job_id)
+            .values(**values)
+        )
+        await db.commit()
+        if values["status"] in (JOB_DONE, JOB_FAILED) and callback_url:
+            payload = await describe_job(db, job_id)
+    if payload is not None:
+        await _notify(str(callback_url), payload)
+    return deferred
+
+
+def _requeued(delay: float) -> Dict[str, Any]:
+    return {
+        "status": JOB_QUEUED,
+        "next_attempt_at": _utcnow() + timedelta(seconds=delay),
+    }
+
+
+def _failed(status_code: int, detail: str) -> Dict[str, Any]:
+    return {
+        "status": JOB_FAILED,
+        "error": detail,
+        "error_status": status_code,
+        "finished_at": _utcnow(),
+    }
+
+
+async def _classify(db: AsyncSession, job: ClassificationJob) -> uuid.UUID:
+    # An identical upload may have been classified since this job was queued
+    cached = await get_classification_cache().lookup(db, str(job.content_hash))
+    if cached is not None:
+        return cached.picture_id
+    # End the lookup's transaction: classify_upload only needs a connection
+    # again once inference is done
+    await db.commit()
+
+    upload_key = str(job.upload_key)
+    store = get_blob_store()
+    content = await store.aget(upload_key)
+    picture, _ = await classify_upload(
+        db, str(job.filename), content, str(job.content_hash)
+    )
+
+    # The raw upload is only kept when it was stored as-is (a passthrough
+    # original without metadata); otherwise it is an unreferenced blob
+    if picture.image_key != upload_key:
+        referenced = await db.scalar(
+            select(Picture.id).where(Picture.image_key == upload_key).limit(1)
+        )
+        if referenced is None:
+            await store.adelete(upload_key)
+    return picture.id  # type: ignore[return-value]
+
+
+async def describe_job(db: AsyncSession, job_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+    """Return the public status of a job, or None if it does not exist."""
+    row = (
+        await db.execute(
+            select(ClassificationJob, Picture.label, Picture.confidence)
+            .outerjoin(Picture, ClassificationJob.picture_id == Picture.id)
+            .where(ClassificationJob.id == job_id)
+            # The worker's session may hold the job from before its final UPDATE
+            .execution_options(populate_existing=True)
+        )
+    ).first()
+    if row is None:
+        return None
+    job, label, confidence = row
+    return {
+        "job_id": str(job.id),
+        "status": job.status,
+        "filename": job.filename,
+        "attempts": job.attempts,
+        "picture_id": str(job.picture_id) if job.picture_id is not None else None,
+        "label": label,
+        "confidence": float(confidence) if confidence is not None else None,
+        "error": {"status_code": job.error_status, "detail": job.error}
+        if job.status == JOB_FAILED
+        else None,
+        "created_at": job.created_at.isoformat() if job.created_at is not None else None,
+        "finished_at": job.finished_at.isoformat()
+        if job.finished_at is not None
+        else None,
+    }
+
+
+async def job_counts(db: AsyncSession) -> Dict[str, int]:
+    """Number of jobs per status."""
+    rows = await db.execute(
+        select(ClassificationJob.status, func.count()).group_by(ClassificationJob.status)
+    )
+    counts = dict.fromkeys((JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED), 0)
+    counts.update({status: count for status, count in rows})
+    return counts
+
+
+async def _notify(callback_url: str, payload: Dict[str, Any]) -> None:
+    # Best effort: clients can always fall back to polling the status endpoint.
+    # httpx is only needed here, so it is not imported at startup
+    import httpx
+
+    # Checked again at send time: the host may resolve elsewhere by now
+    try:
+        await check_callback_url(callback_url)
+    except ValueError as exc:
+        logger.warning("Callback for job %s to %s refused: %s", payload["job_id"], callback_url, exc)
+        return
+    try:
+        async with httpx.AsyncClient(timeout=env.JOB_CALLBACK_TIMEOUT_SECONDS) as client:
+            response = await client.post(callback_url, json=payload)
+            response.raise_for_status()
+    except httpx.HTTPError as exc:
+        logger.warning("Callback for job %s to %s failed: %s", payload["job_id"], callback_url, exc)
+
+
+class JobWorker:
+    """Drain the classification job queue.
+
+    Each round claims up to ``concurrency`` jobs and runs them concurrently,
+    so their images reach the micro-batcher together and share forward
+    passes. When the queue is empty, or every claimed job found the
+    inference queue full, the worker sleeps ``poll_interval`` seconds.
+    Several workers, in one or many processes, can run side by side.
+    """
+
+    def __init__(self, concurrency: int = 4, poll_interval: float = 1.0):
+        self.concurrency = max(concurrency, 1)
+        self.poll_interval = poll_interval
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                async with AsyncSessionLocal() as db:
+                    job_ids = await claim_jobs(db, self.concurrency)
+            except Exception:
+                logger.exception("Claiming classification jobs failed")
+                job_ids = []
+
+            if job_ids:
+                results = await asyncio.gather(
+                    *(run_job(job_id) for job_id in job_ids), return_exceptions=True
+                )
+                deferred = 0
+                for job_id, result in zip(job_ids, results):
+                    if isinstance(result, Exception):
+                        # Left running; reclaimed after JOB_TIMEOUT_SECONDS
+                        logger.error("Classification job %s crashed: %r", job_id, result)
+                    elif result:
+                        deferred += 1
+                if deferred < len(job_ids):
+                    continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        """Ask ``run`` to return once the jobs it is processing have finished."""
+        self._stopping.set()
@@ -0,0 +1,25 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, picture_id: uuid.UUID) -> str:
+    """Encode the (created_at, id) of the last row on a page as an opaque cursor."""
+    payload = json.dumps([created_at.isoformat(), str(picture_id)])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, picture_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), uuid.UUID(picture_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
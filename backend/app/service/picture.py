@@ -1,47 +1,299 @@
-from sqlalchemy.orm import Session
-from entities.table import Picture
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
 
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import env
+from entities.table import Picture, PictureEmbedding
+from executor import get_executor
+from metrics import stage_timer
+from service.daily_stats import increment_daily_stats
+from service.dashboard import invalidate_dashboard
+from service.embeddings import embedding_row, index_embeddings
+from service.image import make_variant
+from service.pagination import decode_cursor, encode_cursor
+from storage import get_blob_store
 
-def save_picture(
-    db: Session,
+# Longest edge, in pixels, of each downscaled rendition
+IMAGE_VARIANTS = {"thumb": env.IMAGE_THUMB_SIZE, "medium": env.IMAGE_MEDIUM_SIZE}
+
+
+def variant_name(size: str) -> str:
+    """Blob store name (and ETag suffix) of a rendition under the current settings.
+
+    The pixel size and JPEG quality are part of the name, so changing them
+    renders fresh variants instead of serving ones made with old settings.
+    """
+    return f"{size}_{IMAGE_VARIANTS[size]}_q{env.IMAGE_VARIANT_QUALITY}"
+
+
+async def save_picture(
+    db: AsyncSession,
     filename: str,
     image_bytes: bytes,
     label: str,
     confidence: float,
+    content_hash: str | None = None,
+    stored_format: str | None = None,
+    original_size: int | None = None,
+    embedding: Any = None,
 ) -> Picture:
     """Save an image and its classification into the database.
 
     Args:
-        db: SQLAlchemy Session
+        db: SQLAlchemy AsyncSession
         filename: original filename
-        image_bytes: raw image bytes to store
+        image_bytes: raw image bytes, written to the blob store
         label: classification label
         confidence: classification confidence (0-100 scale expected)
+        content_hash: SHA-256 hex digest of the uploaded bytes
+        stored_format: format of image_bytes ("jpeg" or "webp")
+        original_size: size in bytes of the upload before any transcoding
+        embedding: float16 image embedding from the classification, if any;
+            stored in picture_embeddings in the same transaction
 
     Returns:
         The created Picture ORM instance (committed and refreshed).
     """
 
-    picture = Picture(
+    with stage_timer("blob_write"):
+        picture = await _new_picture(
+            filename=filename,
+            image_bytes=image_bytes,
+            label=label,
+            confidence=confidence,
+            content_hash=content_hash,
+            stored_format=stored_format,
+            original_size=original_size,
+        )
+
+    db.add(picture)
+    embeddings = _add_embeddings(db, [(picture, embedding)])
+    with stage_timer("db_commit"):
+        await db.flush()
+        # Last: the rollup row stays locked until the commit
+        await increment_daily_stats(db, picture_count=1)
+        await db.commit()
+    invalidate_dashboard()
+    index_embeddings(embeddings)
+    await db.refresh(picture)
+
+    return picture
+
+
+async def save_pictures(db: AsyncSession, uploads: List[Dict[str, Any]]) -> List[Picture]:
+    """Save many classified images with one bulk INSERT and a single commit.
+
+    Args:
+        db: SQLAlchemy AsyncSession
+        uploads: one dict per picture with the keyword arguments of ``save_picture``
+            (including the optional ``embedding``)
+
+    Returns:
+        The created Picture ORM instances, in input order. They are not
+        refreshed, so server-side defaults such as created_at are not loaded.
+    """
+    if not uploads:
+        return []
+    vectors = [upload.get("embedding") for upload in uploads]
+    # Blob writes run in worker threads, concurrently
+    pictures = list(
+        await asyncio.gather(
+            *(
+                _new_picture(**{k: v for k, v in upload.items() if k != "embedding"})
+                for upload in uploads
+            )
+        )
+    )
+
+    # Primary keys are generated client-side, so the unit of work can send
+    # all rows in one multi-row INSERT
+    db.add_all(pictures)
+    embeddings = _add_embeddings(db, list(zip(pictures, vectors)))
+    await db.flush()
+    # Last: the rollup row stays locked until the commit
+    await increment_daily_stats(db, picture_count=len(pictures))
+    await db.commit()
+    invalidate_dashboard()
+    index_embeddings(embeddings)
+
+    return pictures
+
+
+def _add_embeddings(
+    db: AsyncSession, pictures: List[Tuple[Picture, Any]]
+) -> List[PictureEmbedding]:
+    """Add a picture_embeddings row for every picture that has an embedding."""
+    rows = [
+        embedding_row(picture.id, vector)  # type: ignore[arg-type]
+        for picture, vector in pictures
+        if vector is not None
+    ]
+    db.add_all(rows)
+    return rows
+
+
+async def _new_picture(
+    filename: str,
+    image_bytes: bytes,
+    label: str,
+    confidence: float,
+    content_hash: str | None = None,
+    stored_format: str | None = None,
+    original_size: int | None = None,
+) -> Picture:
+    """Write the image bytes to the blob store and build the (unsaved) Picture row."""
+    image_key = await get_blob_store().aput(image_bytes)
+    return Picture(
+        id=uuid.uuid4(),
         filename=filename,
-        image=image_bytes,
+        image_key=image_key,
         label=label,
         confidence=confidence,
+        content_hash=content_hash,
+        stored_format=stored_format,
+        original_size=original_size,
+        stored_size=len(image_bytes),
     )
 
-    db.add(picture)
-    db.commit()
-    db.refresh(picture)
 
-    return picture
+async def render_variant(key: str, original: bytes, size: str) -> bytes:
+    """Render a downscaled variant off the event loop and cache it in the blob store."""
+    data = await get_executor().run(
+        make_variant, original, IMAGE_VARIANTS[size], env.IMAGE_VARIANT_QUALITY
+    )
+    await get_blob_store().aput_variant(key, variant_name(size), data)
+    return data
+
+
+async def load_image_bytes(db: AsyncSession, picture: Picture) -> bytes | None:
+    """Return the stored image bytes of a picture.
+
+    Reads from the blob store, falling back to the legacy inline column for
+    rows that have not been migrated yet. That column is deferred, so it is
+    fetched explicitly rather than via a lazy load.
+    """
+    if picture.image_key is not None:
+        try:
+            return await get_blob_store().aget(str(picture.image_key))
+        except KeyError:
+            return None
+    return await db.scalar(select(Picture.image).where(Picture.id == picture.id))
+
+
+# Metadata returned by the listing; every column is covered by the
+# ix_pictures_*_created_at_id indexes so Postgres can use index-only scans
+LISTING_COLUMNS = (
+    Picture.id,
+    Picture.filename,
+    Picture.label,
+    Picture.confidence,
+    Picture.feedback_given,
+    Picture.created_at,
+)
+
+
+async def list_pictures(
+    db: AsyncSession,
+    limit: int,
+    cursor: str | None = None,
+    label: str | None = None,
+    min_confidence: float | None = None,
+    max_confidence: float | None = None,
+    feedback_given: bool | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+) -> Tuple[List[Dict[str, Any]], str | None]:
+    """List picture metadata, newest first, one keyset page at a time.
+
+    Pages are ordered by (created_at, id) descending and continue strictly
+    after the row encoded in ``cursor``, so the cost of a page does not grow
+    with how deep the client has paged (unlike OFFSET).
+
+    Args:
+        db: SQLAlchemy AsyncSession
+        limit: maximum number of rows to return
+        cursor: opaque cursor from a previous page, or None for the first page
+        label: only pictures with this predicted label
+        min_confidence: only pictures with confidence >= this value
+        max_confidence: only pictures with confidence <= this value
+        feedback_given: only pictures with (True) or without (False) feedback
+        created_after: only pictures created at or after this time
+        created_before: only pictures created before this time
+
+    Returns:
+        The rows of the page and the cursor of the next page (None on the last page).
+
+    Raises:
+        ValueError: if ``cursor`` is malformed
+    """
+    query = select(*LISTING_COLUMNS).order_by(
+        Picture.created_at.desc(), Picture.id.desc()
+    )
+    if cursor is not None:
+        after_created_at, after_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(Picture.created_at, Picture.id) < (after_created_at, after_id)
+        )
+    if label is not None:
+        query = query.where(Picture.label == label)
+    if min_confidence is not None:
+        query = query.where(Picture.confidence >= min_confidence)
+    if max_confidence is not None:
+        query = query.where(Picture.confidence <= max_confidence)
+    if feedback_given is not None:
+        query = query.where(Picture.feedback_given == feedback_given)
+    if created_after is not None:
+        query = query.where(Picture.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(Picture.created_at < created_before)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return [_listing_item(row) for row in rows], next_cursor
+
+
+async def get_listing_items(
+    db: AsyncSession, picture_ids: Sequence[uuid.UUID]
+) -> Dict[uuid.UUID, Dict[str, Any]]:
+    """Fetch the listing metadata of the given pictures, keyed by id.
+
+    Pictures that do not exist are left out.
+    """
+    if not picture_ids:
+        return {}
+    rows = await db.execute(
+        select(*LISTING_COLUMNS).where(Picture.id.in_(picture_ids))
+    )
+    return {row.id: _listing_item(row) for row in rows}
+
+
+def _listing_item(row: Any) -> Dict[str, Any]:
+    return {
+        "id": str(row.id),
+        "filename": row.filename,
+        "label": row.label,
+        "confidence": float(row.confidence),
+        "feedback_given": row.feedback_given,
+        "created_at": row.created_at.isoformat()
+        if row.created_at is not None
+        else None,
+    }
 
 
-def upload_picture_deprecated(image: bytes, db: Session):
+async def upload_picture_deprecated(image: bytes, db: AsyncSession):
     """Backward-compatible helper (kept for older callers).
 
     This mirrors the previous simple upload behaviour but returns the created
     Picture instance instead of a dict.
     """
-    return save_picture(
+    return await save_picture(
         db=db, filename="unknown", image_bytes=image, label="unknown", confidence=0.0
     )
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from service.http import etag_matches
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    value: Any
+    etag: str
+    last_modified: datetime
+    expires_at: float
+    version: int
+
+
+class ResponseCache:
+    """In-process TTL cache for JSON-able responses with single-flight misses.
+
+    Concurrent misses for the same key share one computation. ``invalidate``
+    stops every entry from being served and also discards results of
+    computations that were already running, so a write is never followed by
+    a stale read from this process. Other worker processes converge within
+    ``ttl_seconds``. At most ``max_entries`` keys are kept, least recently
+    used first out.
+    """
+
+    def __init__(self, ttl_seconds: float = 5.0, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Future[CachedResponse]"] = {}
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    def invalidate(self) -> None:
+        # Outdated entries stay until replaced so the next computation can
+        # tell whether its result changed (see _last_modified)
+        self._version += 1
+
+    async def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]]
+    ) -> CachedResponse:
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry.version == self._version
+            and entry.expires_at > time.monotonic()
+        ):
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._coalesced += 1
+            return await asyncio.shield(pending)
+
+        self._misses += 1
+        future: "asyncio.Future[CachedResponse]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        version = self._version
+        try:
+            value = await compute()
+            etag = self.etag_for(value)
+            entry = CachedResponse(
+                value=value,
+                etag=etag,
+                last_modified=self._last_modified(self._entries.get(key), etag),
+                expires_at=time.monotonic() + self.ttl_seconds,
+                version=version,
+            )
+            if version == self._version and self.ttl_seconds > 0:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # Mark as retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _last_modified(previous: Optional[CachedResponse], etag: str) -> datetime:
+        # HTTP dates only have 1 s resolution. An unchanged result keeps its
+        # date, and a changed one always gets a later date than the result it
+        # replaces, even within the same second, so If-Modified-Since alone
+        # never revalidates a stale copy
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        if previous is None:
+            return now
+        if previous.etag == etag:
+            return previous.last_modified
+        return max(now, previous.last_modified + timedelta(seconds=1))
+
+    @staticmethod
+    def etag_for(value: Any) -> str:
+        payload = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+        return f'W/"{hashlib.sha256(payload).hexdigest()[:32]}"'
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "evictions": self._evictions,
+            "version": self._version,
+        }
+
+
+def is_not_modified(
+    entry: CachedResponse,
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+) -> bool:
+    """Evaluate conditional request headers against a cached response."""
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        return etag_matches(if_none_match, entry.etag)
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return entry.last_modified <= since
+    return False
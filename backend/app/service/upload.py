@@ -0,0 +1,154 @@
+import asyncio
+from typing import Any, Dict, Tuple
+
+from PIL import Image, UnidentifiedImageError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from AI.pipeline import get_batcher
+from config import env
+from entities.table import Picture
+from executor import QueueFullError, get_executor
+from service.classification_cache import (
+    CachedClassification,
+    get_classification_cache,
+)
+from service.embeddings import find_near_duplicate
+from service.image import (
+    ImageTooLargeError,
+    StoredImage,
+    decode_for_inference,
+    prepare_for_storage,
+)
+from metrics import stage_timer
+from service.picture import IMAGE_VARIANTS, render_variant, save_picture
+
+# Failures of a single upload that are the client's or capacity's fault
+UPLOAD_ERRORS = (
+    QueueFullError,
+    ImageTooLargeError,
+    UnidentifiedImageError,
+    Image.DecompressionBombError,
+)
+
+
+def upload_error_status(exc: Exception) -> Tuple[int, str]:
+    """Map an exception from UPLOAD_ERRORS to the HTTP status and detail reported for it."""
+    if isinstance(exc, QueueFullError):
+        return 503, "Server is busy, please retry shortly"
+    if isinstance(exc, ImageTooLargeError):
+        return 413, str(exc)
+    return 400, "Unsupported or corrupt image"
+
+
+def near_duplicate_result(match: CachedClassification) -> Dict[str, Any]:
+    """The prediction to store for an upload that reuses a near-duplicate's label."""
+    return {
+        "label": match.label,
+        "score": match.confidence,
+        "near_duplicate_of": str(match.picture_id),
+    }
+
+
+def _prepare_for_storage(content: bytes) -> "asyncio.Future[StoredImage]":
+    # Started as a task so it overlaps the inference decode (and inference)
+    return asyncio.ensure_future(_encode(content))
+
+
+async def _encode(content: bytes) -> StoredImage:
+    with stage_timer("encode"):
+        return await get_executor().run(
+            prepare_for_storage,
+            content,
+            env.MAX_IMAGE_PIXELS,
+            env.STORAGE_MAX_PASSTHROUGH_BYTES,
+            env.STORAGE_TRANSCODE_FORMAT,
+            env.STORAGE_TRANSCODE_QUALITY,
+        )
+
+
+async def _decode(content: bytes) -> Image.Image:
+    with stage_timer("decode"):
+        return await get_executor().run(
+            decode_for_inference,
+            content,
+            env.INFERENCE_INPUT_SIZE,
+            env.MAX_IMAGE_PIXELS,
+        )
+
+
+async def decode_upload(content: bytes) -> Tuple[StoredImage, Image.Image]:
+    """Prepare the stored bytes and the inference image of one upload concurrently."""
+    storage_task = _prepare_for_storage(content)
+    try:
+        image = await _decode(content)
+    finally:
+        stored = await storage_task
+    return stored, image
+
+
+async def classify_upload(
+    db: AsyncSession, filename: str, content: bytes, content_hash: str
+) -> Tuple[Picture, Dict[str, Any]]:
+    """Decode, classify and save one uploaded image.
+
+    Decode, inference and encode all run off the event loop. Inference gets
+    a cheap reduced-size decode; JPEG/WebP originals are stored without
+    re-encoding, minus their EXIF/XMP metadata.
+
+    Args:
+        db: SQLAlchemy AsyncSession
+        filename: original filename
+        content: raw uploaded bytes
+        content_hash: SHA-256 hex digest of content
+
+    Returns:
+        The saved Picture and the top prediction ({"label", "score"}). With
+        EMBEDDING_NEAR_DUPLICATE_REUSE, the prediction of a near-identical
+        stored picture is used instead and names it in "near_duplicate_of".
+
+    Raises:
+        Any of UPLOAD_ERRORS.
+    """
+    storage_task = _prepare_for_storage(content)
+    try:
+        image = await _decode(content)
+        with stage_timer("inference"):
+            classification = await get_batcher().classify(image)
+    finally:
+        # Always await the storage task so its errors are not left unobserved
+        stored = await storage_task
+
+    result = classification.predictions[0]
+    if env.EMBEDDING_NEAR_DUPLICATE_REUSE and classification.embedding is not None:
+        with stage_timer("near_duplicate_lookup"):
+            match = await find_near_duplicate(db, classification.embedding)
+        if match is not None:
+            result = near_duplicate_result(match)
+
+    picture = await save_picture(
+        db=db,
+        filename=filename,
+        image_bytes=stored.data,
+        label=result["label"],
+        confidence=float(result["score"]),
+        content_hash=content_hash,
+        stored_format=stored.format,
+        original_size=stored.original_size,
+        embedding=classification.embedding,
+    )
+    if env.IMAGE_VARIANTS_EAGER:
+        try:
+            for size in IMAGE_VARIANTS:
+                await render_variant(str(picture.image_key), stored.data, size)
+        except QueueFullError:
+            pass  # Rendered lazily on first request instead
+
+    get_classification_cache().put(
+        content_hash,
+        CachedClassification(
+            picture_id=picture.id,  # type: ignore[arg-type]
+            label=result["label"],
+            confidence=float(result["score"]),
+        ),
+    )
+    return picture, result
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from config import env
+from .base import BlobStore, content_key
+from .local import LocalBlobStore
+
+__all__ = ["BlobStore", "LocalBlobStore", "content_key", "get_blob_store"]
+
+# Singleton holder for the configured blob store
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Return the blob store selected by BLOB_STORE_BACKEND."""
+    global _store
+    if _store is None:
+        if env.BLOB_STORE_BACKEND == "local":
+            _store = LocalBlobStore(env.BLOB_STORE_PATH)
+        else:
+            raise ValueError(f"Unknown blob store backend: {env.BLOB_STORE_BACKEND!r}")
+    return _store
@@ -0,0 +1,58 @@
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+
+
+def content_key(data: bytes) -> str:
+    """Content address of a blob: SHA-256 hex digest of its bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(ABC):
+    """Content-addressed storage for image bytes.
+
+    ``put`` returns the blob's key, which is derived from its content, so
+    storing the same bytes twice keeps a single copy.
+
+    The methods block on I/O; async code uses the ``a``-prefixed variants,
+    which run them in a worker thread so the event loop keeps serving.
+    """
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """Store ``data`` and return its key."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Return the bytes stored under ``key`` (KeyError if missing)."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether a blob is stored under ``key``."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the blob stored under ``key`` if present."""
+
+    @abstractmethod
+    def put_variant(self, key: str, variant: str, data: bytes) -> None:
+        """Store a derived rendition (e.g. a thumbnail) of blob ``key``."""
+
+    @abstractmethod
+    def get_variant(self, key: str, variant: str) -> bytes:
+        """Return a derived rendition of blob ``key`` (KeyError if missing)."""
+
+    async def aput(self, data: bytes) -> str:
+        return await asyncio.to_thread(self.put, data)
+
+    async def aget(self, key: str) -> bytes:
+        return await asyncio.to_thread(self.get, key)
+
+    async def adelete(self, key: str) -> None:
+        await asyncio.to_thread(self.delete, key)
+
+    async def aput_variant(self, key: str, variant: str, data: bytes) -> None:
+        await asyncio.to_thread(self.put_variant, key, variant, data)
+
+    async def aget_variant(self, key: str, variant: str) -> bytes:
+        return await asyncio.to_thread(self.get_variant, key, variant)
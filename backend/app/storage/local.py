@@ -0,0 +1,78 @@
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from storage.base import BlobStore, content_key
+
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+_VARIANT_RE = re.compile(r"^[a-z0-9_]+$")
+
+
+class LocalBlobStore(BlobStore):
+    """Blob store on the local filesystem, sharded by hash prefix.
+
+    A blob with key ``abcdef...`` lives at ``<root>/ab/cd/abcdef...`` so no
+    single directory grows unboundedly. Writes go to a temp file that is
+    atomically renamed into place. Derived renditions sit next to their
+    source as ``<key>.<variant>``.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        if not _KEY_RE.match(key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return self.root / key[:2] / key[2:4] / key
+
+    def variant_path_for(self, key: str, variant: str) -> Path:
+        if not _VARIANT_RE.match(variant):
+            raise ValueError(f"Invalid variant name: {variant!r}")
+        path = self.path_for(key)
+        return path.with_name(f"{path.name}.{variant}")
+
+    def put(self, data: bytes) -> str:
+        key = content_key(data)
+        path = self.path_for(key)
+        if not path.exists():
+            self._write_atomic(path, data)
+        return key
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self.path_for(key).read_bytes()
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def exists(self, key: str) -> bool:
+        return self.path_for(key).exists()
+
+    def delete(self, key: str) -> None:
+        path = self.path_for(key)
+        for variant in path.parent.glob(f"{key}.*"):
+            variant.unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+
+    def put_variant(self, key: str, variant: str, data: bytes) -> None:
+        self._write_atomic(self.variant_path_for(key, variant), data)
+
+    def get_variant(self, key: str, variant: str) -> bytes:
+        try:
+            return self.variant_path_for(key, variant).read_bytes()
+        except FileNotFoundError:
+            raise KeyError(f"{key}.{variant}") from None
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
@@ -21,6 +21,10 @@ uv run python -c "from app.database.core import setup_database; setup_database()
 echo "Running database migrations..."
 uv run alembic upgrade head
 
-# Start the application
+# Start the application; WEB_WORKERS > 1 forks gunicorn workers that share
+# the model weights loaded once in the master
 echo "Starting application..."
+if [ "${WEB_WORKERS:-1}" -gt 1 ]; then
+    exec uv run gunicorn -c gunicorn.conf.py app:app
+fi
 exec uv run uvicorn app.app:app --host 0.0.0.0 --port 8080
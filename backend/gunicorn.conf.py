@@ -0,0 +1,63 @@
+"""Gunicorn settings for the multi-worker launch mode (WEB_WORKERS > 1).
+
+    uv run gunicorn -c gunicorn.conf.py app:app
+
+The master process imports the app and loads the model weights once, then
+forks the workers. Tensor storage is never written after loading, so the
+workers share those pages copy-on-write instead of each holding its own
+copy. Each worker still runs its own warm-up forward pass in the app
+lifespan: thread pools created before fork do not survive it.
+"""
+
+import gc
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Same import layout as alembic/env.py: modules live under app/, so the
+# application is app:app (app/app.py), not app.app:app
+sys.path.insert(0, str(Path(__file__).resolve().parent / "app"))
+
+# Prometheus multiprocess mode: each worker writes its metrics to files here
+# and /metrics sums them. Must be set before prometheus_client is imported
+# (by the app, below), and start empty so dead processes are not counted
+_metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "prometheus_multiproc")
+)
+shutil.rmtree(_metrics_dir, ignore_errors=True)
+os.makedirs(_metrics_dir)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = int(os.environ.get("WEB_WORKERS", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Model load plus warm-up can take a while on a cold container
+timeout = 120
+
+
+def when_ready(server):
+    """Load the weights in the master, right before the workers are forked."""
+    from AI.pipeline import get_pipe
+
+    get_pipe()
+    # Move everything allocated so far out of the GC's view so collections in
+    # the workers do not touch (and un-share) those pages
+    gc.freeze()
+    server.log.info("Model loaded in master; forking %s workers", workers)
+
+
+def child_exit(server, worker):
+    """Let the metrics of a worker that exited stop counting as live."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master."""
+    from database.core import async_engine, engine
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when `config` is first imported, so the test environment
+# is set up before any test module imports the app
+_tmp = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("BLOB_STORE_PATH", f"{_tmp}/blobs")
+os.environ.setdefault("EMBEDDING_INDEX_PATH", f"{_tmp}/embedding_index")
+os.environ.setdefault("INFERENCE_BACKEND", "stub")
+os.environ.setdefault("EMBEDDINGS_ENABLED", "false")
+os.environ.setdefault("JOB_WORKER_IN_PROCESS", "false")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def database():
+    """Empty tables for one test, created from the models (no migrations)."""
+    from database.core import Base, async_engine, engine
+    import entities.table  # noqa: F401  (registers the models)
+
+    # Pooled aiosqlite connections belong to the event loop that opened them
+    await async_engine.dispose()
+    Base.metadata.create_all(engine)
+    yield
+    await async_engine.dispose()
+    Base.metadata.drop_all(engine)
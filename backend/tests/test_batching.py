@@ -0,0 +1,95 @@
+import threading
+from concurrent.futures import wait
+
+import pytest
+
+from AI.batching import MicroBatcher
+from executor import QueueFullError
+
+
+def test_concurrent_submits_share_one_batch():
+    batches = []
+
+    def predict_batch(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    # A long wait lets every submit below land in the first batch
+    batcher = MicroBatcher(predict_batch, max_batch_size=4, max_wait_ms=500)
+    futures = [batcher.submit(i) for i in range(4)]
+
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6]
+    assert batches == [[0, 1, 2, 3]]
+    stats = batcher.stats()
+    assert stats["batches_total"] == 1
+    assert stats["items_total"] == 4
+    assert stats["batch_size_histogram"] == {"4": 1}
+
+
+def test_batches_are_capped_at_max_batch_size():
+    release = threading.Event()
+    batches = []
+
+    def predict_batch(items):
+        release.wait(5)
+        batches.append(len(items))
+        return items
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=3, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(7)]
+    release.set()
+    wait(futures, timeout=5)
+
+    assert [future.result() for future in futures] == list(range(7))
+    assert sum(batches) == 7
+    assert max(batches) <= 3
+
+
+def test_batch_failure_reaches_every_caller():
+    def predict_batch(items):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=2, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(2)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model crashed"):
+            future.result(timeout=5)
+    assert batcher.stats()["failed_batches_total"] == 1
+
+
+def test_result_count_mismatch_is_an_error():
+    batcher = MicroBatcher(lambda items: items[:1], max_batch_size=2, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(2)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="1 results for 2 inputs"):
+            future.result(timeout=5)
+
+
+def test_full_queue_rejects_submits():
+    release = threading.Event()
+    started = threading.Event()
+
+    def predict_batch(items):
+        started.set()
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=1, max_wait_ms=0, max_queue_size=2)
+    running = batcher.submit("running")
+    started.wait(5)
+    queued = [batcher.submit("a"), batcher.submit("b")]
+
+    with pytest.raises(QueueFullError):
+        batcher.submit("c")
+    assert batcher.stats()["rejected_total"] == 1
+
+    release.set()
+    assert running.result(timeout=5) == "running"
+    assert [future.result(timeout=5) for future in queued] == ["a", "b"]
+
+
+def test_rejects_invalid_batch_size():
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda items: items, max_batch_size=0)
@@ -0,0 +1,174 @@
+import asyncio
+import uuid
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from app import app
+from database.core import AsyncSessionLocal
+from service import dashboard
+from service.classification_cache import CachedClassification, ClassificationCache
+from service.picture import save_picture
+from service.response_cache import ResponseCache, is_not_modified
+
+pytestmark = pytest.mark.anyio
+
+
+def classification(label: str = "glass") -> CachedClassification:
+    return CachedClassification(picture_id=uuid.uuid4(), label=label, confidence=0.9)
+
+
+def test_classification_cache_evicts_least_recently_used():
+    cache = ClassificationCache(max_size=2)
+    first, second, third = classification(), classification(), classification()
+    cache.put("a", first)
+    cache.put("b", second)
+    assert cache.get("a") == first  # "b" is now the least recently used
+    cache.put("c", third)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == first
+    assert cache.get("c") == third
+    assert cache.stats()["evictions"] == 1
+
+
+def test_classification_cache_entries_expire(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("service.classification_cache.time.monotonic", lambda: now)
+    cache = ClassificationCache(ttl_seconds=60)
+    cache.put("a", classification())
+
+    now += 61
+    assert cache.get("a") is None
+
+
+async def test_classification_cache_falls_back_to_the_database(database):
+    cache = ClassificationCache()
+    async with AsyncSessionLocal() as db:
+        picture = await save_picture(db, "a.jpg", b"bytes", "glass", 0.75, content_hash="h" * 64)
+
+        found = await cache.lookup(db, "h" * 64)
+        assert found == CachedClassification(picture.id, "glass", 0.75)
+        assert await cache.lookup(db, "0" * 64) is None
+        # Served from memory from now on
+        assert await cache.lookup_many(db, ["h" * 64, "0" * 64]) == {"h" * 64: found}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["db_hits"], stats["misses"]) == (1, 1, 2)
+
+
+async def test_response_cache_coalesces_concurrent_misses():
+    cache = ResponseCache(ttl_seconds=60)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"total": calls}
+
+    entries = await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(5)))
+
+    assert calls == 1
+    assert {entry.value["total"] for entry in entries} == {1}
+    assert cache.stats()["coalesced"] == 4
+
+
+async def test_response_cache_invalidate_discards_running_computations():
+    cache = ResponseCache(ttl_seconds=60)
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await release.wait()
+        return {"total": 1}
+
+    task = asyncio.create_task(cache.get_or_compute("key", slow))
+    await started.wait()
+    cache.invalidate()  # A write lands while the old result is computed
+    release.set()
+    await task
+
+    async def fresh():
+        return {"total": 2}
+
+    assert (await cache.get_or_compute("key", fresh)).value == {"total": 2}
+
+
+async def test_response_cache_is_bounded():
+    cache = ResponseCache(ttl_seconds=60, max_entries=2)
+
+    async def compute():
+        return {}
+
+    for key in ("a", "b", "a", "c"):
+        await cache.get_or_compute(key, compute)
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    await cache.get_or_compute("a", compute)
+    assert cache.stats()["hits"] == 2
+
+
+async def test_last_modified_only_moves_forward():
+    cache = ResponseCache(ttl_seconds=60)
+    value = {"total": 1}
+
+    async def compute():
+        return dict(value)
+
+    first = await cache.get_or_compute("key", compute)
+    cache.invalidate()
+    unchanged = await cache.get_or_compute("key", compute)
+    value["total"] = 2
+    cache.invalidate()
+    changed = await cache.get_or_compute("key", compute)
+
+    assert unchanged.last_modified == first.last_modified
+    # A client revalidating with the old date, even within the same second,
+    # must get the new body
+    assert changed.last_modified > first.last_modified
+    since = format_datetime(first.last_modified, usegmt=True)
+    assert is_not_modified(unchanged, None, since)
+    assert not is_not_modified(changed, None, since)
+
+
+async def test_conditional_headers():
+    cache = ResponseCache(ttl_seconds=60)
+
+    async def compute():
+        return {"total": 1}
+
+    entry = await cache.get_or_compute("key", compute)
+    since = format_datetime(entry.last_modified, usegmt=True)
+
+    assert is_not_modified(entry, entry.etag, None)
+    assert is_not_modified(entry, f'"other", {entry.etag}', None)
+    assert not is_not_modified(entry, '"other"', None)
+    # If-None-Match wins over If-Modified-Since
+    assert not is_not_modified(entry, '"other"', since)
+    assert not is_not_modified(entry, None, "not a date")
+    assert not is_not_modified(entry, None, None)
+
+
+async def test_dashboard_revalidation(database, monkeypatch):
+    monkeypatch.setattr(dashboard, "_cache", None)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/dashboard")
+        assert response.status_code == 200
+        assert response.json()["total_pictures"] == 0
+        etag = response.headers["ETag"]
+
+        response = await client.get("/api/dashboard", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        # An upload invalidates the cached response right away
+        async with AsyncSessionLocal() as db:
+            await save_picture(db, "a.jpg", b"bytes", "glass", 0.9)
+        response = await client.get("/api/dashboard", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["total_pictures"] == 1
+        assert response.headers["ETag"] != etag
@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+from executor import BoundedExecutor, QueueFullError
+
+
+def test_submit_beyond_capacity_is_rejected():
+    release = threading.Event()
+    executor = BoundedExecutor(kind="thread", max_workers=1, max_queue=1)
+    try:
+        running = executor.submit(release.wait, 5)
+        queued = executor.submit(release.wait, 5)
+
+        with pytest.raises(QueueFullError):
+            executor.submit(release.wait, 5)
+        assert executor.stats()["in_flight"] == 2
+        assert executor.stats()["rejected_total"] == 1
+
+        release.set()
+        assert running.result(timeout=5) and queued.result(timeout=5)
+    finally:
+        executor.shutdown()
+
+    # Finished tasks free their slots
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_failed_tasks_free_their_slot():
+    executor = BoundedExecutor(kind="thread", max_workers=1, max_queue=0)
+    try:
+        with pytest.raises(ZeroDivisionError):
+            executor.submit(lambda: 1 / 0).result(timeout=5)
+        assert executor.submit(lambda: 42).result(timeout=5) == 42
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.anyio
+async def test_run_awaits_the_result():
+    executor = BoundedExecutor(kind="thread", max_workers=2, max_queue=0)
+    try:
+        assert await executor.run(sum, [1, 2, 3]) == 6
+    finally:
+        executor.shutdown()
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        BoundedExecutor(kind="fiber")
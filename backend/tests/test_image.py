@@ -0,0 +1,69 @@
+import io
+
+import pytest
+from PIL import ExifTags, Image
+
+from service.image import ImageTooLargeError, prepare_for_storage
+
+LIMIT = 10 * 1024 * 1024
+
+
+def encode(fmt: str, orientation: int = 1, **params) -> bytes:
+    exif = Image.Exif()
+    exif[ExifTags.Base.Make] = "Camera"
+    exif[ExifTags.Base.BodySerialNumber] = "SERIAL-1234"
+    exif.get_ifd(ExifTags.IFD.GPSInfo)[ExifTags.GPS.GPSLatitude] = (48.0, 51.0, 24.0)
+    if orientation != 1:
+        exif[ExifTags.Base.Orientation] = orientation
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 30), (10, 120, 200)).save(buffer, fmt, exif=exif, **params)
+    return buffer.getvalue()
+
+
+def pixels(data: bytes) -> bytes:
+    return Image.open(io.BytesIO(data)).convert("RGB").tobytes()
+
+
+def test_jpeg_passthrough_drops_metadata_but_keeps_pixels_and_orientation():
+    original = encode("JPEG", orientation=6, comment=b"private note")
+
+    stored = prepare_for_storage(original, 10**8, LIMIT, "webp", 80)
+
+    assert (stored.format, stored.transcoded) == ("jpeg", False)
+    assert stored.original_size == len(original)
+    assert b"SERIAL-1234" not in stored.data and b"private note" not in stored.data
+    exif = Image.open(io.BytesIO(stored.data)).getexif()
+    assert dict(exif) == {ExifTags.Base.Orientation: 6}
+    assert not exif.get_ifd(ExifTags.IFD.GPSInfo)
+    # The compressed image data is untouched, so it decodes identically
+    assert pixels(stored.data) == pixels(original)
+
+
+def test_webp_passthrough_drops_metadata():
+    original = encode("WEBP", xmp=b"<x:xmpmeta>private</x:xmpmeta>")
+
+    stored = prepare_for_storage(original, 10**8, LIMIT, "webp", 80)
+
+    assert (stored.format, stored.transcoded) == ("webp", False)
+    assert b"SERIAL-1234" not in stored.data and b"private" not in stored.data
+    assert not Image.open(io.BytesIO(stored.data)).getexif()
+    assert pixels(stored.data) == pixels(original)
+
+
+def test_rotated_webp_is_transcoded_upright():
+    stored = prepare_for_storage(encode("WEBP", orientation=6), 10**8, LIMIT, "webp", 80)
+
+    assert stored.transcoded
+    assert b"SERIAL-1234" not in stored.data
+    assert Image.open(io.BytesIO(stored.data)).size == (30, 40)
+
+
+def test_other_formats_are_transcoded():
+    stored = prepare_for_storage(encode("PNG"), 10**8, LIMIT, "webp", 80)
+
+    assert (stored.format, stored.transcoded) == ("webp", True)
+
+
+def test_pixel_limit():
+    with pytest.raises(ImageTooLargeError):
+        prepare_for_storage(encode("JPEG"), 100, LIMIT, "webp", 80)
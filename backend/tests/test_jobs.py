@@ -0,0 +1,169 @@
+import hashlib
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image
+
+from config import env
+from database.core import AsyncSessionLocal
+from entities.table import ClassificationJob
+from executor import QueueFullError
+from service import classification_cache, jobs
+from service.jobs import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    check_callback_url,
+    claim_jobs,
+    enqueue_job,
+    run_job,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def png(color=(200, 30, 30)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+async def enqueue(content: bytes = b"raw upload") -> ClassificationJob:
+    async with AsyncSessionLocal() as db:
+        return await enqueue_job(
+            db, "a.png", content, hashlib.sha256(content).hexdigest()
+        )
+
+
+async def get_job(job_id) -> ClassificationJob:
+    async with AsyncSessionLocal() as db:
+        return await db.get(ClassificationJob, job_id)
+
+
+async def claim(limit: int = 10) -> list:
+    async with AsyncSessionLocal() as db:
+        return await claim_jobs(db, limit)
+
+
+async def test_claims_oldest_jobs_once(database):
+    queued = [(await enqueue(bytes([i]))).id for i in range(3)]
+    # Oldest last in insertion order, so the claim order comes from created_at
+    queued.reverse()
+    async with AsyncSessionLocal() as db:
+        for age, job_id in enumerate(queued):
+            job = await db.get(ClassificationJob, job_id)
+            job.created_at = datetime(2026, 1, 1) + timedelta(seconds=age)
+        await db.commit()
+
+    assert set(await claim(2)) == set(queued[:2])
+    assert await claim(2) == queued[2:]
+    assert await claim(2) == []
+
+    job = await get_job(queued[0])
+    assert (job.status, job.attempts) == (JOB_RUNNING, 1)
+
+
+async def test_reclaims_jobs_whose_worker_died(database, monkeypatch):
+    job_id = (await enqueue()).id
+    assert await claim() == [job_id]
+
+    monkeypatch.setattr(env, "JOB_TIMEOUT_SECONDS", -1.0)
+    assert await claim() == [job_id]
+    assert (await get_job(job_id)).attempts == 2
+
+
+async def test_runs_a_job_to_completion(database, monkeypatch):
+    monkeypatch.setattr(classification_cache, "_cache", None)
+    job_id = (await enqueue(png())).id
+    await claim()
+
+    assert await run_job(job_id) is False
+    job = await get_job(job_id)
+    assert job.status == JOB_DONE
+    assert job.picture_id is not None
+    async with AsyncSessionLocal() as db:
+        status = await jobs.describe_job(db, job_id)
+    assert status["label"] and status["error"] is None
+
+
+async def test_failures_back_off_then_give_up(database, monkeypatch):
+    async def crash(db, job):
+        raise RuntimeError("inference crashed")
+
+    monkeypatch.setattr(jobs, "_classify", crash)
+    monkeypatch.setattr(env, "JOB_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(env, "JOB_RETRY_BACKOFF_SECONDS", 60.0)
+    job_id = (await enqueue()).id
+
+    await claim()
+    await run_job(job_id)
+    job = await get_job(job_id)
+    assert job.status == JOB_QUEUED
+    assert job.next_attempt_at - job.started_at >= timedelta(seconds=59)
+    # Not claimable again until the backoff has elapsed
+    assert await claim() == []
+
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ClassificationJob, job_id)
+        job.next_attempt_at = job.started_at
+        await db.commit()
+    assert await claim() == [job_id]
+    await run_job(job_id)
+    job = await get_job(job_id)
+    assert (job.status, job.error_status, job.attempts) == (JOB_FAILED, 500, 2)
+
+
+async def test_invalid_images_fail_at_once(database, monkeypatch):
+    monkeypatch.setattr(classification_cache, "_cache", None)
+    job_id = (await enqueue(b"not an image")).id
+    await claim()
+
+    await run_job(job_id)
+    job = await get_job(job_id)
+    assert (job.status, job.error_status, job.attempts) == (JOB_FAILED, 400, 1)
+
+
+async def test_full_inference_queue_does_not_use_an_attempt(database, monkeypatch):
+    async def busy(db, job):
+        raise QueueFullError("Inference queue is full")
+
+    monkeypatch.setattr(jobs, "_classify", busy)
+    job_id = (await enqueue()).id
+    await claim()
+
+    assert await run_job(job_id) is True
+    job = await get_job(job_id)
+    assert (job.status, job.attempts) == (JOB_QUEUED, 0)
+    assert job.next_attempt_at is not None
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "ftp://93.184.216.34/hook",
+        "http:///hook",
+        "http://127.0.0.1/hook",
+        "http://10.0.0.5:8080/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+    ],
+)
+async def test_callback_url_refuses_internal_targets(url, monkeypatch):
+    monkeypatch.setattr(env, "JOB_CALLBACK_ALLOWED_HOSTS", "")
+    with pytest.raises(ValueError):
+        await check_callback_url(url)
+
+
+async def test_callback_url_accepts_public_addresses(monkeypatch):
+    monkeypatch.setattr(env, "JOB_CALLBACK_ALLOWED_HOSTS", "")
+    await check_callback_url("https://93.184.216.34/hook")
+
+
+async def test_callback_allowlist(monkeypatch):
+    monkeypatch.setattr(env, "JOB_CALLBACK_ALLOWED_HOSTS", "hooks.internal, 127.0.0.1")
+    await check_callback_url("http://127.0.0.1:9000/hook")
+    await check_callback_url("http://HOOKS.internal/hook")
+    with pytest.raises(ValueError):
+        await check_callback_url("https://93.184.216.34/hook")
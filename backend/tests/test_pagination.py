@@ -0,0 +1,100 @@
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app import app
+from database.core import AsyncSessionLocal, SessionLocal
+from entities.table import Picture
+from service.pagination import decode_cursor, encode_cursor
+from service.picture import list_pictures
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def seed(count: int, same_time: int = 0) -> list[Picture]:
+    """Insert pictures one minute apart; the first ``same_time`` share a timestamp."""
+    pictures = [
+        Picture(
+            id=uuid.uuid4(),
+            filename=f"{i}.jpg",
+            label="glass" if i % 2 else "paper",
+            confidence=0.5 + i / 100,
+            created_at=START + timedelta(minutes=max(i - same_time + 1, 0)),
+        )
+        for i in range(count)
+    ]
+    with SessionLocal() as db:
+        db.add_all(pictures)
+        db.commit()
+        # Newest first, ties broken by id, as the listing orders them
+        return sorted(pictures, key=lambda p: (p.created_at, str(p.id)), reverse=True)
+
+
+def test_cursor_round_trip():
+    picture_id = uuid.uuid4()
+    cursor = encode_cursor(START, picture_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (START, picture_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor(START, uuid.uuid4())[:-4]])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+async def test_pages_cover_every_row_once(database):
+    # Rows sharing a created_at must not be skipped or repeated at page edges
+    expected = [str(p.id) for p in seed(8, same_time=4)]
+
+    seen = []
+    cursor = None
+    async with AsyncSessionLocal() as db:
+        while True:
+            items, cursor = await list_pictures(db, limit=3, cursor=cursor)
+            seen.extend(item["id"] for item in items)
+            if cursor is None:
+                break
+
+    assert seen == expected
+
+
+async def test_filters_apply_across_pages(database):
+    expected = [str(p.id) for p in seed(9) if p.label == "glass" and p.confidence >= 0.535]
+
+    seen = []
+    cursor = None
+    async with AsyncSessionLocal() as db:
+        while True:
+            items, cursor = await list_pictures(
+                db, limit=2, cursor=cursor, label="glass", min_confidence=0.535
+            )
+            seen.extend(item["id"] for item in items)
+            if cursor is None:
+                break
+
+    assert seen == expected
+
+
+async def test_listing_route(database):
+    seed(3)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/pictures", params={"limit": 2})
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["items"]) == 2
+        assert body["items"][0]["thumbnail_url"].endswith("/image?size=thumb")
+
+        response = await client.get(
+            "/api/pictures", params={"limit": 2, "cursor": body["next_cursor"]}
+        )
+        assert len(response.json()["items"]) == 1
+        assert response.json()["next_cursor"] is None
+
+        response = await client.get("/api/pictures", params={"cursor": "garbage"})
+        assert response.status_code == 400
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from AI import pipeline
+from app import app
+from config import env
+
+
+def wait_for_ready(client: TestClient, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/api/ready")
+        if response.status_code == 200 or time.monotonic() > deadline:
+            return response
+        time.sleep(0.01)
+
+
+def test_ready_once_model_loads_without_warmup(monkeypatch):
+    release = threading.Event()
+    load_pipe = pipeline.load_pipe
+
+    def slow_load_pipe(*args, **kwargs):
+        release.wait(5)
+        return load_pipe(*args, **kwargs)
+
+    monkeypatch.setattr(env, "MODEL_WARMUP", False)
+    monkeypatch.setattr(pipeline, "load_pipe", slow_load_pipe)
+    monkeypatch.setattr(pipeline, "_pipe", None)
+    monkeypatch.setattr(pipeline, "_ready", False)
+
+    with TestClient(app) as client:
+        # Startup does not wait for the model...
+        response = client.get("/api/ready")
+        assert response.status_code == 503
+        assert response.json()["checks"] == {"model": False, "database": True}
+
+        # ...which loads in the background without any request needing it
+        release.set()
+        response = wait_for_ready(client)
+        assert response.status_code == 200
+        assert response.json() == {
+            "ready": True,
+            "checks": {"model": True, "database": True},
+        }
+
+
+def test_ready_after_warmup(monkeypatch):
+    monkeypatch.setattr(env, "MODEL_WARMUP", True)
+    monkeypatch.setattr(pipeline, "_pipe", None)
+    monkeypatch.setattr(pipeline, "_ready", False)
+
+    with TestClient(app) as client:
+        response = client.get("/api/ready")
+        assert response.status_code == 200
+        assert response.json()["checks"]["model"] is True
@@ -0,0 +1,56 @@
+import hashlib
+
+import pytest
+
+from storage import LocalBlobStore, content_key
+
+
+def test_blobs_are_content_addressed(tmp_path):
+    store = LocalBlobStore(tmp_path)
+
+    key = store.put(b"image bytes")
+
+    assert key == content_key(b"image bytes") == hashlib.sha256(b"image bytes").hexdigest()
+    assert store.put(b"image bytes") == key
+    assert store.get(key) == b"image bytes"
+    assert store.path_for(key) == tmp_path / key[:2] / key[2:4] / key
+    # Writes go through a temp file that is renamed into place
+    assert not list(tmp_path.rglob(".tmp-*"))
+
+
+def test_variants_are_deleted_with_their_blob(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    key = store.put(b"image bytes")
+    store.put_variant(key, "thumb_256", b"thumbnail")
+    assert store.get_variant(key, "thumb_256") == b"thumbnail"
+
+    store.delete(key)
+
+    assert not store.exists(key)
+    with pytest.raises(KeyError):
+        store.get(key)
+    with pytest.raises(KeyError):
+        store.get_variant(key, "thumb_256")
+
+
+@pytest.mark.parametrize("key", ["../../etc/passwd", "ABC", "a" * 63])
+def test_rejects_invalid_keys(tmp_path, key):
+    store = LocalBlobStore(tmp_path)
+    with pytest.raises(ValueError):
+        store.get(key)
+
+
+def test_rejects_invalid_variant_names(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    key = store.put(b"image bytes")
+    with pytest.raises(ValueError):
+        store.put_variant(key, "../thumb", b"x")
+
+
+@pytest.mark.anyio
+async def test_async_methods(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    key = await store.aput(b"image bytes")
+    assert await store.aget(key) == b"image bytes"
+    await store.adelete(key)
+    assert not store.exists(key)
@@ -0,0 +1,91 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from AI.vector_index import VectorIndex, current_version
+
+
+def unit_vectors(count: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dim))
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def filled_index(count: int, **kwargs) -> tuple[VectorIndex, list[uuid.UUID], np.ndarray]:
+    index = VectorIndex(**kwargs)
+    ids = [uuid.uuid4() for _ in range(count)]
+    vectors = unit_vectors(count)
+    index.add(list(range(1, count + 1)), ids, vectors)
+    return index, ids, vectors
+
+
+def test_search_returns_most_similar_first():
+    index, ids, vectors = filled_index(50)
+
+    results = index.search(vectors[7], k=5)
+
+    assert results[0][0] == ids[7]
+    assert results[0][1] == pytest.approx(1.0, abs=1e-3)
+    similarities = [similarity for _, similarity in results]
+    assert similarities == sorted(similarities, reverse=True)
+    assert all(similarity <= 1.0 for similarity in similarities)
+
+
+def test_search_excludes_pictures():
+    index, ids, vectors = filled_index(20)
+
+    results = index.search(vectors[3], k=3, exclude=[ids[3]])
+
+    assert ids[3] not in [picture_id for picture_id, _ in results]
+    assert len(results) == 3
+
+
+def test_seqs_are_added_once_in_any_order():
+    index, ids, vectors = filled_index(10)
+    assert index.watermark == 10
+
+    # A late commit below the watermark is still added, a repeat is not
+    assert index.add([10, 4], [ids[9], ids[3]], vectors[[9, 3]]) == 0
+    late = uuid.uuid4()
+    assert index.add([0], [late], unit_vectors(1, seed=1)) == 1
+    assert len(index) == 11
+    assert index.watermark == 10
+    assert index.missing([0, 5, 11, 12]) == [11, 12]
+
+
+def test_dimension_mismatch_is_rejected():
+    index, _, _ = filled_index(3)
+    with pytest.raises(ValueError):
+        index.add([99], [uuid.uuid4()], unit_vectors(1, dim=8))
+    with pytest.raises(ValueError):
+        index.search(unit_vectors(1, dim=8)[0])
+
+
+def test_save_and_load(tmp_path):
+    index, ids, vectors = filled_index(30)
+    version = index.save(tmp_path)
+    assert current_version(tmp_path) == version
+
+    loaded = VectorIndex.load(tmp_path)
+    assert len(loaded) == 30
+    assert loaded.watermark == 30
+    assert loaded.search(vectors[12], k=1)[0][0] == ids[12]
+    # Seqs persisted in the base are known without scanning the table again
+    assert loaded.missing(range(1, 32)) == [31]
+
+
+def test_ivf_finds_exact_matches(tmp_path):
+    index, ids, vectors = filled_index(400, ivf_min_vectors=100, nprobe=4)
+    index.save(tmp_path)
+
+    loaded = VectorIndex.load(tmp_path, nprobe=4, ivf_min_vectors=100)
+    assert loaded.is_ivf
+    # An indexed vector always lies in its own nearest list, which is probed
+    for position in (0, 123, 399):
+        assert loaded.search(vectors[position], k=1)[0][0] == ids[position]
+
+
+def test_load_without_saved_version(tmp_path):
+    index = VectorIndex.load(tmp_path / "missing")
+    assert len(index) == 0
+    assert index.search(unit_vectors(1)[0]) == []
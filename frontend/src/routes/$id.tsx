@@ -38,21 +38,12 @@ function RouteComponent() {
         const response = await api.get(`/picture/${id}`);
         const data = response.data;
 
-        // Convert base64 image to File object
-        const binaryString = atob(data.image);
-        const bytes = new Uint8Array(binaryString.length);
-        for (let i = 0; i < binaryString.length; i++) {
-          bytes[i] = binaryString.charCodeAt(i);
-        }
-        const blob = new Blob([bytes], { type: "image/jpeg" });
-        const file = new File([blob], data.filename, { type: "image/jpeg" });
-
         setPictureData({
           id: data.id,
           filename: data.filename,
           label: data.label,
           confidence: data.confidence,
-          imageFile: file,
+          imageUrl: data.medium_url,
           feedback_given: data.feedback_given,
         });
       } catch (err: any) {
@@ -68,8 +59,8 @@ function RouteComponent() {
   const imageUrl = useMemo(() => {
     return pictureData?.imageFile
       ? URL.createObjectURL(pictureData.imageFile)
-      : null;
-  }, [pictureData?.imageFile]);
+      : pictureData?.imageUrl ?? null;
+  }, [pictureData?.imageFile, pictureData?.imageUrl]);
 
   const handleCorrectClassification = async () => {
     try {
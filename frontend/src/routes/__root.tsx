@@ -11,7 +11,8 @@ type PictureData = {
   filename: string;
   label: string;
   confidence: number;
-  imageFile: File; // The actual File object
+  imageFile?: File; // The uploaded File object, when we have it locally
+  imageUrl?: string; // URL of the stored image served by the API
   feedback_given?: boolean; // Optional flag for feedback status
 } | null;
 
@@ -23,6 +23,8 @@ export const Route = createFileRoute("/dashboard")({
   component: DashboardComponent,
 });
 
+const DASHBOARD_POLL_INTERVAL_MS = 30_000;
+
 type FeedbackData = {
   date: string;
   correct: number;
@@ -70,6 +72,10 @@ function DashboardComponent() {
     };
 
     fetchDashboardData();
+    // The backend answers unchanged polls with 304 Not Modified, which the
+    // browser serves from its HTTP cache.
+    const interval = setInterval(fetchDashboardData, DASHBOARD_POLL_INTERVAL_MS);
+    return () => clearInterval(interval);
   }, []);
 
   if (loading) {
@@ -29,22 +29,12 @@ function RouteComponent() {
         .get(`/picture/${id}`)
         .then((response) => {
           const data = response.data;
-          // Convert base64 image to Blob, then to File
-          const byteCharacters = atob(data.image);
-          const byteNumbers = new Array(byteCharacters.length);
-          for (let i = 0; i < byteCharacters.length; i++) {
-            byteNumbers[i] = byteCharacters.charCodeAt(i);
-          }
-          const byteArray = new Uint8Array(byteNumbers);
-          const blob = new Blob([byteArray], { type: "image/jpeg" });
-          const file = new File([blob], data.filename, { type: "image/jpeg" });
-
           setPictureData({
             id: data.id,
             filename: data.filename,
             label: data.label,
             confidence: data.confidence,
-            imageFile: file,
+            imageUrl: data.medium_url,
           });
         })
         .catch((err) => {
@@ -106,8 +96,8 @@ function RouteComponent() {
   const imageUrl = useMemo(() => {
     return pictureData?.imageFile
       ? URL.createObjectURL(pictureData.imageFile)
-      : null;
-  }, [pictureData?.imageFile]);
+      : pictureData?.imageUrl ?? null;
+  }, [pictureData?.imageFile, pictureData?.imageUrl]);
 
   if (loading && !pictureData) {
     return (